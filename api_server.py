@@ -0,0 +1,249 @@
+"""
+Local HTTP/JSON API exposing the simulation engines to other services.
+
+Endpoints (POST a JSON object of keyword arguments):
+    /calculate_growth   {"params": {...dashboard.py params...}}
+    /find_req_amt       find_req_amt keyword arguments
+    /get_req_sip        get_req_sip keyword arguments
+    /rolling_returns    {"ticker": "^BSESN", "num_years": 10}
+    GET /metrics        per-endpoint latency histograms and cache counters
+    GET /health
+
+CPU-bound work runs on a process pool so the event loop stays responsive. Identical
+requests that arrive while one is already running share its result, and finished
+results are cached by a hash of (endpoint, parameters).
+
+Usage:
+    python api_server.py --port 8765 --workers 4
+
+For local testing without sockets, StubClient calls the request handler directly:
+    service = SimulationService(executor=ThreadPoolExecutor())
+    status, body = asyncio.run(StubClient(service).post('/find_req_amt', {...}))
+"""
+import argparse
+import asyncio
+import bisect
+import functools
+import json
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from growth_core import analyse_rolling_returns, calculate_growth, find_req_amt, get_req_sip
+from growth_core.history import available_tickers
+from growth_core.result_store import params_key
+
+def run_calculate_growth(params):
+    return calculate_growth(params)
+
+def run_find_req_amt(**kwargs):
+    amt, corpus_history = find_req_amt(**kwargs)
+    return {'amt': amt, 'corpus_history': corpus_history}
+
+def run_get_req_sip(**kwargs):
+    sip, corpus_history, sip_history = get_req_sip(**kwargs)
+    return {'sip': sip, 'corpus_history': corpus_history, 'sip_history': sip_history}
+
+def run_rolling_returns(ticker, num_years):
+    return analyse_rolling_returns(ticker, num_years)
+
+def validate(path, params):
+    """Reject parameters that would reach the filesystem unchecked"""
+    if path == '/rolling_returns':
+        tickers = available_tickers()
+        if params.get('ticker') not in tickers:
+            raise ValueError(f"Unknown ticker {params.get('ticker')!r}, available: {', '.join(tickers)}")
+
+ENDPOINTS = {
+    '/calculate_growth': run_calculate_growth,
+    '/find_req_amt': run_find_req_amt,
+    '/get_req_sip': run_get_req_sip,
+    '/rolling_returns': run_rolling_returns,
+}
+
+def run_endpoint(path, params):
+    """Process-pool entry point: look the engine up by path so only plain data is pickled"""
+    return ENDPOINTS[path](**params)
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+
+    BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def record(self, elapsed_ms):
+        self.counts[bisect.bisect_left(self.BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def to_dict(self):
+        buckets = {f"le_{bound}ms": n for bound, n in zip(self.BOUNDS_MS, self.counts)}
+        buckets['le_inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'buckets': buckets,
+        }
+
+class SimulationService:
+    def __init__(self, executor=None, workers=None, cache_size=4096):
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers)
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.in_flight = {}
+        self.histograms = {path: LatencyHistogram() for path in ENDPOINTS}
+        self.stats = {'cache_hits': 0, 'coalesced': 0, 'computed': 0}
+
+    async def call(self, path, params):
+        """Run an engine with coalescing of identical in-flight requests and result caching"""
+        key = params_key(path, params)
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return self.cache[key]
+
+        if key in self.in_flight:
+            self.stats['coalesced'] += 1
+            return await asyncio.shield(self.in_flight[key])
+
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, run_endpoint, path, params)
+        self.in_flight[key] = future
+        # Cached when the computation finishes, even if the request that started it was cancelled
+        future.add_done_callback(functools.partial(self._finished, key))
+        self.stats['computed'] += 1
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        del self.in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        self.cache[key] = future.result()
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+
+    def metrics(self):
+        return {
+            'endpoints': {path: hist.to_dict() for path, hist in self.histograms.items()},
+            'cache_entries': len(self.cache),
+            'in_flight': len(self.in_flight),
+            **self.stats,
+        }
+
+    async def handle(self, method, path, body):
+        """Handle one request and return (status, json-serializable payload)"""
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        if method == 'GET' and path == '/metrics':
+            return 200, self.metrics()
+        if path not in ENDPOINTS:
+            return 404, {'error': f"Unknown endpoint {path}"}
+        if method != 'POST':
+            return 405, {'error': "Use POST with a JSON body"}
+
+        try:
+            params = json.loads(body or b'{}')
+        except ValueError as e:
+            return 400, {'error': f"Invalid JSON: {e}"}
+        if not isinstance(params, dict):
+            return 400, {'error': "Request body must be a JSON object"}
+
+        start = time.perf_counter()
+        try:
+            validate(path, params)
+            result = await self.call(path, params)
+            status, payload = 200, {'result': result}
+        except (TypeError, ValueError, KeyError) as e:
+            status, payload = 400, {'error': f"{type(e).__name__}: {e}"}
+        except Exception as e:
+            status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+        finally:
+            self.histograms[path].record((time.perf_counter() - start) * 1000)
+        return status, payload
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            method, path, _ = request_line.decode('latin-1').split(' ', 2)
+
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            body = await reader.readexactly(int(headers.get('content-length', 0)))
+            try:
+                status, payload = await service.handle(method, path.split('?', 1)[0], body)
+            except Exception as e:
+                status, payload = 500, {'error': f"{type(e).__name__}: {e}"}
+
+            data = json.dumps(payload).encode()
+            writer.write(
+                f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+            )
+            await writer.drain()
+
+            if headers.get('connection', '').lower() == 'close':
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def serve(host='127.0.0.1', port=8765, workers=None):
+    service = SimulationService(workers=workers)
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"Serving simulation API on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+class StubClient:
+    """In-process client that drives SimulationService.handle without opening sockets"""
+
+    def __init__(self, service):
+        self.service = service
+
+    async def post(self, path, params):
+        return await self.service.handle('POST', path, json.dumps(params).encode())
+
+    async def get(self, path):
+        return await self.service.handle('GET', path, b'')
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the simulation engines over HTTP/JSON")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
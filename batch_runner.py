@@ -0,0 +1,183 @@
+"""
+Headless batch runner for saved dashboard scenarios.
+
+Reads parameter sets from a directory of JSON files (as saved by dashboard.py's
+"Save Parameters as JSON" button) or from a JSONL file, evaluates them in parallel
+and streams one summary row per scenario to CSV or Parquet as results complete.
+
+A parameter set may carry the dashboard.py keys (used with calculate_growth), the
+dashboard2.py keys (used with find_req_amt / required_sip), or both. Columns for a
+part that isn't present are left empty. An optional 'schedules' entry gives
+time-varying assumptions (see growth_core.schedules) to every engine that has the key;
+a key none of them has is reported as the scenario's error.
+
+Usage:
+    python batch_runner.py scenarios/ -o results.csv
+    python batch_runner.py scenarios.jsonl -o results.parquet --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from multiprocessing import Pool
+
+from growth_core import calculate_growth, depletion_year, find_sustainable_withdrawal, find_req_amt, required_sip
+from growth_core.schedules import GROWTH_SCHEDULES, PERPETUAL_SCHEDULES, SIP_SCHEDULES, split_schedules
+
+GROWTH_KEYS = [
+    'nominal_return', 'inflation', 'withdrawal_increase', 'initial_withdrawal',
+    'projection_years', 'initial_portfolio', 'big_withdrawal_time', 'big_withdrawal_amt',
+    'big_withdrawal_start_yr', 'withdrawal_start_yr', 'generational_halving',
+    'halving_years', 'inheritance_tax', 'tax_on_withdrawals',
+]
+
+PERPETUAL_KEYS = [
+    'annual_withdrawal', 'decadal_withdrawal', 'withdrawal_increment', 'withdrawal_tax',
+    'annual_return', 'inflation', 'fees', 'new_generation_time', 'kids',
+    'withdrawal_start_yr', 'india_maturity_yr', 'mature_returns', 'mature_inflation',
+]
+
+SIP_KEYS = ['sip_increment', 'years_for_investment']
+
+SUMMARY_COLUMNS = [
+    'scenario', 'final_value', 'depletion_year', 'max_sustainable_withdrawal',
+    'required_corpus', 'required_sip', 'error',
+]
+
+def read_parameter_sets(source):
+    """Yield (scenario_id, params) pairs lazily from a directory of JSON files or a JSONL file"""
+    if os.path.isdir(source):
+        for name in sorted(os.listdir(source)):
+            if not name.endswith('.json'):
+                continue
+            with open(os.path.join(source, name)) as f:
+                yield os.path.splitext(name)[0], json.load(f)
+        return
+
+    with open(source) as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            params = json.loads(line)
+            yield str(params.pop('scenario', line_no)), params
+
+def evaluate_scenario(item):
+    """Evaluate one parameter set and return its summary row"""
+    scenario_id, params = item
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row['scenario'] = scenario_id
+
+    try:
+        growth_schedules, perpetual_schedules, sip_schedules = split_schedules(
+            params.get('schedules'), GROWTH_SCHEDULES, PERPETUAL_SCHEDULES, SIP_SCHEDULES)
+
+        if all(key in params for key in GROWTH_KEYS):
+            growth_params = {key: params[key] for key in GROWTH_KEYS}
+            if growth_schedules:
+                growth_params['schedules'] = growth_schedules
+            rows = calculate_growth(growth_params)
+            row['final_value'] = rows[-1]['real_portfolio_value']
+            if rows[-1]['real_portfolio_value'] <= 0:
+                row['depletion_year'] = depletion_year(rows)
+            row['max_sustainable_withdrawal'] = find_sustainable_withdrawal(growth_params, rows)
+
+        if all(key in params for key in PERPETUAL_KEYS):
+            amt, _ = find_req_amt(**{key: params[key] for key in PERPETUAL_KEYS}, schedules=perpetual_schedules)
+            row['required_corpus'] = amt
+
+            if all(key in params for key in SIP_KEYS):
+                sip = required_sip(
+                    amt=amt,
+                    sip_increment=params['sip_increment'],
+                    annual_return=params['annual_return'],
+                    inflation=params['inflation'],
+                    years=params['years_for_investment'],
+                    schedules=sip_schedules,
+                )
+                row['required_sip'] = float(sip)
+    except Exception as e:
+        row['error'] = f"{type(e).__name__}: {e}"
+
+    return row
+
+class CsvSink:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.DictWriter(self.file, fieldnames=SUMMARY_COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, row):
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+class ParquetSink:
+    """Buffers rows into row groups so the file grows while the batch is still running"""
+
+    def __init__(self, path, row_group_size=1000):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.pa = pa
+        self.schema = pa.schema([
+            ('scenario', pa.string()),
+            ('final_value', pa.float64()),
+            ('depletion_year', pa.int64()),
+            ('max_sustainable_withdrawal', pa.float64()),
+            ('required_corpus', pa.float64()),
+            ('required_sip', pa.float64()),
+            ('error', pa.string()),
+        ])
+        self.writer = pq.ParquetWriter(path, self.schema)
+        self.row_group_size = row_group_size
+        self.rows = []
+
+    def write(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    def flush(self):
+        if self.rows:
+            self.writer.write_table(self.pa.Table.from_pylist(self.rows, schema=self.schema))
+            self.rows = []
+
+    def close(self):
+        self.flush()
+        self.writer.close()
+
+def open_sink(path):
+    if path.endswith('.parquet'):
+        return ParquetSink(path)
+    return CsvSink(path)
+
+def run_batch(source, output, workers=None, chunksize=16):
+    """Evaluate every parameter set in source and stream summary rows to output. Returns the row count"""
+    sink = open_sink(output)
+    count = 0
+    try:
+        with Pool(processes=workers) as pool:
+            for row in pool.imap_unordered(evaluate_scenario, read_parameter_sets(source), chunksize=chunksize):
+                sink.write(row)
+                count += 1
+    finally:
+        sink.close()
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Evaluate saved dashboard scenarios in batch")
+    parser.add_argument('source', help="Directory of parameter JSON files or a JSONL file")
+    parser.add_argument('-o', '--output', required=True, help="Output path (.csv or .parquet)")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--chunksize', type=int, default=16, help="Scenarios handed to a worker at a time")
+    args = parser.parse_args(argv)
+
+    count = run_batch(args.source, args.output, workers=args.workers, chunksize=args.chunksize)
+    print(f"Evaluated {count} scenarios -> {args.output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
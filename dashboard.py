@@ -1,143 +1,13 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
-import numpy as np
 from datetime import datetime
 
-def calculate_growth(params):
-    """
-    Calculate portfolio growth based on provided parameters
-    
-    Args:
-        params: Dictionary containing all calculation parameters
-    
-    Returns:
-        DataFrame with yearly portfolio projections
-    """
-    # Extract parameters
-    nominal_rate = params['nominal_return'] / 100
-    inflation_rate = params['inflation'] / 100
-    real_withdrawal_growth_rate = params['withdrawal_increase'] / 100
-    withdrawal_lakhs = params['initial_withdrawal']
-    real_portfolio_value = params['initial_portfolio']
-    projection_years = params['projection_years']
-    big_withdrawal_time = params['big_withdrawal_time']
-    big_withdrawal_amt = params['big_withdrawal_amt']
-    big_withdrawal_start_yr = params['big_withdrawal_start_yr']
-    withdrawal_start_yr = params['withdrawal_start_yr']
-    generational_halving = params['generational_halving']
-    halving_years = params['halving_years']
-    inheritance_tax = params['inheritance_tax']
-    tax_on_withdrawals = params['tax_on_withdrawals']
-    
-    # Calculate real rate of return (after inflation)
-    real_rate = (1 + nominal_rate) / (1 + inflation_rate) - 1
-    
-    # Initialize data structure
-    annual_withdrawal = withdrawal_lakhs / 100  # Convert lakhs to crores
-    big_withdrawal = big_withdrawal_amt
-    
-    data = [{
-        'year': 0,
-        'year_display': datetime.now().year,
-        'real_portfolio_value': real_portfolio_value,
-        'annual_withdrawal': 0,
-        'big_withdrawal': 0,
-        'total_withdrawal': 0,
-        'cumulative_withdrawals': 0,
-        'withdrawal_events': '',
-        'withdrawal_tax_paid': 0,
-        'cumulative_withdrawal_tax_paid': 0,
-        'inheritance_tax_paid': 0,
-        'cumulative_inheritance_tax_paid': 0,
-        'total_tax_paid': 0,
-        'cumulative_total_tax_paid': 0,
-    }]
-    
-    cumulative_withdrawals = 0
-    cumulative_withdrawal_tax_paid = 0
-    cumulative_inheritance_tax_paid = 0
-    cumulative_total_tax_paid = 0
-    
-    for year in range(1, projection_years + 1):
-        current_year = datetime.now().year + year
-        
-        # Apply return for this period
-        real_portfolio_value = max(0, real_portfolio_value * (1 + real_rate))
-        
-        # Update withdrawal amounts with growth rate
-        annual_withdrawal *= (1 + real_withdrawal_growth_rate)
-        big_withdrawal *= (1 + real_withdrawal_growth_rate)
-
-        # Track withdrawals
-        withdrawal_amt = 0
-        events = []
-        
-        annual_withdrawal_tax = 0
-        big_withdrawal_tax = 0
-        # Regular annual withdrawal
-        annual_withdrawal_done = 0 
-        if year >= withdrawal_start_yr:
-            withdrawal_amt += annual_withdrawal
-            annual_withdrawal_done = annual_withdrawal
-            annual_withdrawal_tax = annual_withdrawal * tax_on_withdrawals / 100
-            events.append("Annual")
-        
-        # Periodic big withdrawal
-        big_withdrawal_done = 0
-        if (year % big_withdrawal_time == 0 and 
-            year >= big_withdrawal_time and 
-            year >= big_withdrawal_start_yr and 
-            year >= withdrawal_start_yr):
-            withdrawal_amt += big_withdrawal
-            big_withdrawal_done = big_withdrawal
-            big_withdrawal_tax = big_withdrawal * tax_on_withdrawals / 100
-            events.append("Big")
-        
-        # Apply withdrawals
-        real_portfolio_value -= (withdrawal_amt + annual_withdrawal_tax + big_withdrawal_tax) 
-        
-        # Track cumulative withdrawals
-        cumulative_withdrawals += withdrawal_amt
-        
-        # Apply generational wealth halving if enabled
-        inheritance_tax_paid = 0
-        if generational_halving and year > 0 and year % halving_years == 0:
-            real_portfolio_value /= 2
-            inheritance_tax_paid = real_portfolio_value * inheritance_tax / 100
-            real_portfolio_value -= inheritance_tax_paid
-            events.append("Generational Halving")
-
-        # Calculate cumulative tax paid
-        withdrawal_tax_paid = annual_withdrawal_tax + big_withdrawal_tax
-        total_tax_paid = withdrawal_tax_paid + inheritance_tax_paid
-        cumulative_withdrawal_tax_paid += withdrawal_tax_paid
-        cumulative_inheritance_tax_paid += inheritance_tax_paid
-        cumulative_total_tax_paid += total_tax_paid
-        
-        # Add data for this year
-        data.append({
-            'year': year,
-            'year_display': current_year,
-            'real_portfolio_value': max(0, real_portfolio_value),
-            'annual_withdrawal': annual_withdrawal_done,
-            'big_withdrawal': big_withdrawal_done,
-            'total_withdrawal': withdrawal_amt * 100,  # Convert to lakhs
-            'cumulative_withdrawals': cumulative_withdrawals,
-            'withdrawal_events': ", ".join(events),
-            'withdrawal_tax_paid': withdrawal_tax_paid,
-            'cumulative_withdrawal_tax_paid': cumulative_withdrawal_tax_paid,
-            'inheritance_tax_paid': inheritance_tax_paid,
-            'cumulative_inheritance_tax_paid': cumulative_inheritance_tax_paid,
-            'total_tax_paid': total_tax_paid,
-            'cumulative_total_tax_paid': cumulative_total_tax_paid,
-        })
-        
-        # Break if portfolio is depleted
-        if real_portfolio_value <= 0:
-            break
-            
-    return pd.DataFrame(data)
+from growth_core import (
+    bootstrap_paths, calculate_growth, find_sustainable_withdrawal, shared_arrays, simulate_capital_gains,
+)
+from growth_core.profiling import span
 
 def format_currency(amount, currency="₹"):
     """Format currency values with appropriate units (Lakhs/Crores). Takes input in Lakhs"""
@@ -146,6 +16,17 @@ def format_currency(amount, currency="₹"):
     else:
         return f"{currency}{amount:.2f} L"
 
+def monte_carlo_handle(params, num_paths, cost_basis):
+    # The (paths x years) arrays live in the process-wide store; the session only keeps a handle
+    def compute():
+        paths = bootstrap_paths(['nifty'], num_paths, params['projection_years'], seed=0)
+        return simulate_capital_gains(params, returns=paths['returns'][:, :, 0], inflation=paths['inflation'],
+                                      cost_basis=cost_basis)
+
+    return shared_arrays().session_handle(
+        st.session_state, 'monte_carlo', 'dashboard.monte_carlo',
+        {'params': params, 'num_paths': num_paths, 'cost_basis': cost_basis}, compute)
+
 def main():
     st.set_page_config(
         page_title="Investment Growth Calculator",
@@ -286,6 +167,30 @@ def main():
                 help="Tax rate on any withdrawals made"
             )
 
+            monte_carlo = st.checkbox(
+                "Monte Carlo on Historical Nifty Years",
+                value=False,
+                help="Replay the plan on bootstrapped Nifty years with capital-gains tax on each withdrawal"
+            )
+
+            monte_carlo_paths = st.select_slider(
+                "Monte Carlo Paths",
+                options=[1000, 2000, 5000, 10000],
+                value=2000,
+                disabled=not monte_carlo,
+                help="Number of simulated return paths"
+            )
+
+            cost_basis = st.slider(
+                "Cost Basis (% of portfolio value)",
+                min_value=0,
+                max_value=100,
+                value=100,
+                step=5,
+                disabled=not monte_carlo,
+                help="What today's portfolio cost to buy; the rest is taxable gain when sold"
+            )
+
         with tabs[2]:  # Display options
             show_data_table = st.checkbox("Show Data Table", value=False)
             chart_years = st.slider(
@@ -330,7 +235,8 @@ def main():
     }
     
     # Run simulation
-    df = calculate_growth(params)
+    rows = calculate_growth(params)
+    df = pd.DataFrame(rows)
     
     # Main content area
     st.title("Portfolio Projection")
@@ -441,7 +347,9 @@ def main():
     # Add a horizontal line at portfolio = 0
     fig.add_hline(y=0, line_width=1, line_dash="solid", line_color="red")
     
-    st.plotly_chart(fig, use_container_width=True)
+    # Plotly serialization happens here, so this is what gets timed when profiling
+    with span('dashboard.chart.growth'):
+        st.plotly_chart(fig, use_container_width=True)
     
     # Warning for portfolio depletion
     if any(df['real_portfolio_value'] <= 0):
@@ -463,16 +371,7 @@ def main():
             st.markdown(f"- Calendar year of depletion: **{datetime.now().year + depletion_year}**")
             
             # Calculate withdrawal to avoid depletion
-            sustainable_withdrawal = 0
-            test_rates = np.linspace(0.1, initial_withdrawal, 20)
-            
-            for test_rate in test_rates:
-                test_params = params.copy()
-                test_params['initial_withdrawal'] = test_rate
-                test_df = calculate_growth(test_params)
-                if test_df['real_portfolio_value'].iloc[-1] > 0:
-                    sustainable_withdrawal = test_rate
-                    break
+            sustainable_withdrawal = find_sustainable_withdrawal(params, rows)
             
             if sustainable_withdrawal > 0:
                 st.markdown(f"- Sustainable initial withdrawal: **{format_currency(sustainable_withdrawal)}** per year")
@@ -488,17 +387,7 @@ def main():
             st.markdown(f"- Growth multiple: **{growth_multiple:.2f}x** the initial portfolio")
             
             # Calculate maximum sustainable withdrawal
-            max_withdrawal = initial_withdrawal
-            test_rates = np.linspace(initial_withdrawal, initial_withdrawal*10, 20)
-            
-            for test_rate in test_rates:
-                test_params = params.copy()
-                test_params['initial_withdrawal'] = test_rate
-                test_df = calculate_growth(test_params)
-                if test_df['real_portfolio_value'].iloc[-1] > 0:
-                    max_withdrawal = test_rate
-                else:
-                    break
+            max_withdrawal = find_sustainable_withdrawal(params, rows)
             
             st.markdown(f"- Maximum sustainable initial withdrawal: **{format_currency(max_withdrawal)}** per year")
             st.markdown(f"- Maximum sustainable withdrawal rate: **{(max_withdrawal/100)/initial_portfolio*100:.2f}%**")
@@ -548,6 +437,53 @@ def main():
             tax_to_portfolio_ratio = cumulative_total_tax_paid / initial_portfolio * 100
             st.markdown(f"- Total tax as % of initial portfolio: **{tax_to_portfolio_ratio:.1f}%**")
     
+    if monte_carlo:
+        st.subheader("Monte Carlo: Historical Nifty Years with Capital-Gains Tax")
+
+        with st.spinner("Simulating return paths..."):
+            handle = monte_carlo_handle(params, monte_carlo_paths, cost_basis / 100)
+        # Memory-mapped views of the shared arrays, nothing is copied into the session
+        final_values = handle['final_values']
+        tax_paid = handle['tax_paid']
+        total_withdrawn = handle['withdrawals'].sum()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Success Rate", f"{(handle['depletion_years'] == 0).mean():.1%}")
+        with col2:
+            st.metric("Median Final Portfolio", format_currency(np.median(final_values) * 100))
+        with col3:
+            st.metric("5th Percentile Final Portfolio", format_currency(np.percentile(final_values, 5) * 100))
+        with col4:
+            effective_rate = tax_paid.sum() / total_withdrawn * 100 if total_withdrawn > 0 else 0.0
+            st.metric(
+                "Effective Capital-Gains Tax",
+                f"{effective_rate:.2f}%",
+                delta=f"{effective_rate - tax_on_withdrawals:.2f}% vs flat rate",
+                delta_color="inverse"
+            )
+
+        shown_years = min(chart_years, tax_paid.shape[1])
+        p5, p50, p95 = np.percentile(tax_paid[:, :shown_years], [5, 50, 95], axis=0)
+        calendar_years = [datetime.now().year + year for year in range(1, shown_years + 1)]
+
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=calendar_years, y=p95, name="95th Percentile", line=dict(width=0),
+                                 showlegend=False))
+        fig.add_trace(go.Scatter(x=calendar_years, y=p5, name="5th-95th Percentile", fill="tonexty",
+                                 line=dict(width=0), fillcolor="rgba(37, 99, 235, 0.2)"))
+        fig.add_trace(go.Scatter(x=calendar_years, y=p50, name="Median", line=dict(color="#2563eb", width=3)))
+        fig.update_layout(
+            title="Capital-Gains Tax Paid per Year (Crores, Today's Money)",
+            xaxis_title="Year",
+            yaxis_title="Tax (₹ Crores)",
+            height=400,
+            hovermode="x unified"
+        )
+
+        with span('dashboard.chart.monte_carlo'):
+            st.plotly_chart(fig, use_container_width=True)
+
     # Show the data table if requested
     if show_data_table:
         st.subheader("Detailed Projection Data")
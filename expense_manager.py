@@ -1,63 +1,110 @@
+import numpy as np
+
+from growth_core.tax_regimes import DEFAULT_REGIME, get_tax_regime
+
 base_salary_lpa = 17
 
-def calc_tax(salary):
-    standard_deduction = .75
-    salary -= standard_deduction
-    tax = 0
-    if salary >= 4:
-        tax += min(4, salary - 4) * 0.05
-    if salary >= 8:
-        tax += min(4, salary - 8) * 0.1
-    if salary >= 12:
-        tax += min(4, salary - 12) * 0.15
-    if salary >= 16:
-        tax += min(4, salary - 16) * 0.2
-    if salary >= 20:
-        tax += min(4, salary - 20) * 0.25
-    if salary >= 24:
-        tax += (salary - 24) * 0.3
-
-    cess = 4
-    tax *= 1 + cess / 100
-    return tax
-
-tax = calc_tax(base_salary_lpa)
-annual_inhand = round(base_salary_lpa - tax, 2)
-print(f"Annual inhand salary: {annual_inhand} LPA")
-monthly_inhand = round(annual_inhand / 12, 2)
-print(f"Monthly inhand salary: {monthly_inhand} lakhs")
-
-
-car_price = annual_inhand / 2
-print(f"Car price: {car_price} lakhs")
-car_downpayment = car_price * 0.2
-print(f"Car downpayment: {car_downpayment} lakhs")
+def calc_tax(salary, regime=DEFAULT_REGIME):
+    """Income tax incl. cess (lakhs) for a salary in LPA, or an array of salaries in one pass"""
+    return get_tax_regime(regime).tax(salary)
 
 def calculate_emi(principal, annual_rate, tenure_months):
-    monthly_rate = annual_rate / (12 * 100)  # Convert annual rate to monthly
-    emi = (principal * monthly_rate * (1 + monthly_rate) ** tenure_months) / ((1 + monthly_rate) ** tenure_months - 1)
-    return round(emi, 2)
+    """Monthly EMI, broadcasting over arrays of principals, rates and tenures"""
+    principal = np.asarray(principal, dtype=float)
+    monthly_rate = np.asarray(annual_rate, dtype=float) / (12 * 100)  # Convert annual rate to monthly
+    growth = (1 + monthly_rate) ** np.asarray(tenure_months, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        emi = np.where(monthly_rate == 0, principal / tenure_months, (principal * monthly_rate * growth) / (growth - 1))
+    emi = np.round(emi, 2)
+    return emi if emi.ndim else float(emi)
+
+def emi_grid(principals, annual_rates, tenure_months):
+    """EMI for every (principal, rate, tenure) combination as a 3-D array"""
+    return calculate_emi(
+        np.asarray(principals, dtype=float)[:, None, None],
+        np.asarray(annual_rates, dtype=float)[None, :, None],
+        np.asarray(tenure_months, dtype=float)[None, None, :],
+    )
+
+def max_loan_principal(monthly_budget, annual_rate, tenure_months):
+    """Largest principal whose EMI fits in monthly_budget (inverse of calculate_emi, unrounded)"""
+    monthly_budget = np.asarray(monthly_budget, dtype=float)
+    monthly_rate = np.asarray(annual_rate, dtype=float) / (12 * 100)
+    growth = (1 + monthly_rate) ** np.asarray(tenure_months, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(monthly_rate == 0, monthly_budget * tenure_months, monthly_budget * (growth - 1) / (monthly_rate * growth))
+
+def affordability_table(salaries, annual_rates, tenure_years, emi_share=0.4):
+    """
+    Largest loan (lakhs) for every (salary, rate, tenure) combination
+
+    The EMI is capped at emi_share of the monthly in-hand salary.
+    """
+    monthly_inhand = (np.asarray(salaries, dtype=float) - calc_tax(salaries)) / 12
+    return max_loan_principal(
+        (monthly_inhand * emi_share)[:, None, None],
+        np.asarray(annual_rates, dtype=float)[None, :, None],
+        np.asarray(tenure_years, dtype=float)[None, None, :] * 12,
+    )
+
+def budget_report(salaries, car_rate=10, car_tenure_years=4, house_rate=9, house_tenure_years=20):
+    """Budget figures (lakhs) for a salary or an array of salaries in LPA, as a dict of arrays"""
+    salaries = np.asarray(salaries, dtype=float)
+    annual_inhand = np.round(salaries - calc_tax(salaries), 2)
+    monthly_inhand = np.round(annual_inhand / 12, 2)
+
+    car_price = annual_inhand / 2
+    car_downpayment = car_price * 0.2
+    car_emi = calculate_emi(car_price - car_downpayment, car_rate, car_tenure_years*12)
+
+    house_price = np.round(annual_inhand * 4.5, 2)
+    house_downpayment = np.round(house_price * 0.4, 2)
+    house_emi = calculate_emi(house_price - house_downpayment, house_rate, house_tenure_years*12)
+
+    term_insurance_premium = round(0.35/12, 2)
+    health_insurance_premium = round(0.3/12, 2)
+
+    return {
+        'annual_inhand': annual_inhand,
+        'monthly_inhand': monthly_inhand,
+        'car_price': car_price,
+        'car_downpayment': car_downpayment,
+        'car_emi': car_emi,
+        'car_emi_share': car_emi / monthly_inhand,
+        'house_price': house_price,
+        'house_downpayment': house_downpayment,
+        'house_emi': house_emi,
+        'house_emi_share': house_emi / monthly_inhand,
+        'term_insurance_cover': annual_inhand * 15 + 40,
+        'term_insurance_premium': term_insurance_premium,
+        'term_insurance_share': term_insurance_premium / monthly_inhand,
+        'health_insurance_cover': 100,
+        'health_insurance_premium': health_insurance_premium,
+        'health_insurance_share': health_insurance_premium / monthly_inhand,
+        'emergency_fund': annual_inhand / 2,
+    }
+
+def main():
+    report = {name: np.asarray(value).item() for name, value in budget_report(base_salary_lpa).items()}
+
+    print(f"Annual inhand salary: {report['annual_inhand']} LPA")
+    print(f"Monthly inhand salary: {report['monthly_inhand']} lakhs")
 
-car_emi = calculate_emi(car_price - car_downpayment, 10, 4*12)
-print(f"Car EMI: {car_emi} lakhs/month ({car_emi/monthly_inhand:.2%} of monthly inhand)")
+    print(f"Car price: {report['car_price']} lakhs")
+    print(f"Car downpayment: {report['car_downpayment']} lakhs")
+    print(f"Car EMI: {report['car_emi']} lakhs/month ({report['car_emi_share']:.2%} of monthly inhand)")
 
+    print(f"House price: {report['house_price']} lakhs")
+    print(f"House downpayment: {report['house_downpayment']} lakhs")
+    print(f"House EMI: {report['house_emi']} lakhs/month ({report['house_emi_share']:.2%} of monthly inhand)")
 
-house_price = round(annual_inhand * 4.5, 2)
-print(f"House price: {house_price} lakhs")
-house_downpayment = round(house_price * 0.4, 2)
-print(f"House downpayment: {house_downpayment} lakhs")
-house_emi = calculate_emi(house_price - house_downpayment, 9, 20*12)
-print(f"House EMI: {house_emi} lakhs/month ({house_emi/monthly_inhand:.2%} of monthly inhand)")
+    print(f"Term insurance cover: {report['term_insurance_cover']/100} crores")
+    print(f"Term insurance premium: {report['term_insurance_premium']} lakhs/month ({report['term_insurance_share']:.2%} of monthly inhand)")
 
-term_insurance_cover = annual_inhand * 15 + 40
-print(f"Term insurance cover: {term_insurance_cover/100} crores")
-term_insurance_premium = round(0.35/12, 2)
-print(f"Term insurance premium: {term_insurance_premium} lakhs/month ({term_insurance_premium/monthly_inhand:.2%} of monthly inhand)")
+    print(f"Health insurance cover: {report['health_insurance_cover']/100} crores")
+    print(f"Health insurance premium: {report['health_insurance_premium']} lakhs/month ({report['health_insurance_share']:.2%} of monthly inhand)")
 
-health_insurance_cover = 100
-print(f"Health insurance cover: {health_insurance_cover/100} crores")
-health_insurance_premium = round(0.3/12, 2)
-print(f"Health insurance premium: {health_insurance_premium} lakhs/month ({health_insurance_premium/monthly_inhand:.2%} of monthly inhand)")
+    print(f"Emergency fund: {report['emergency_fund']} lakhs")
 
-emergency_fund = annual_inhand / 2
-print(f"Emergency fund: {emergency_fund} lakhs")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
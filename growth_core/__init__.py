@@ -0,0 +1,82 @@
+"""
+Pure-computation core for the investment growth calculator.
+
+Nothing here imports Streamlit, Plotly, pandas or any network client. Importing the
+package itself is cheap: each submodule is only imported when one of its names is
+first accessed, so `from growth_core import find_req_amt` doesn't pay for modules
+(or NumPy) that the caller never uses.
+"""
+import importlib
+
+_EXPORTS = {
+    'calculate_growth': 'growth',
+    'depletion_year': 'growth',
+    'find_sustainable_withdrawal': 'growth',
+    'get_final_corpus_val': 'perpetual',
+    'get_corpus_outcome': 'perpetual',
+    'find_req_amt': 'perpetual',
+    'get_final_sip_corpus': 'perpetual',
+    'get_req_sip': 'perpetual',
+    'unit_sip_corpus': 'perpetual',
+    'SipPlan': 'sip_plans',
+    'unit_sip_corpus_array': 'sip_plans',
+    'required_sip': 'sip_plans',
+    'sip_grid': 'sip_plans',
+    'AffineMap': 'fast_forward',
+    'fast_final_corpus_val': 'fast_forward',
+    'analyse_rolling_returns': 'history',
+    'sample_annual_returns': 'history',
+    'InflationIndex': 'alignment',
+    'RandomStreams': 'rng',
+    'bootstrap_paths': 'portfolio',
+    'simulate_portfolios': 'portfolio',
+    'summarize_allocations': 'portfolio',
+    'ResultStore': 'result_store',
+    'shared_store': 'result_store',
+    'CorpusTable': 'corpus_table',
+    'default_corpus_table': 'corpus_table',
+    'TaxRegime': 'tax_regimes',
+    'get_tax_regime': 'tax_regimes',
+    'load_tax_regimes': 'tax_regimes',
+    'historical_paths': 'stress',
+    'replay_growth': 'stress',
+    'replay_perpetual': 'stress',
+    'stress_summary': 'stress',
+    'AssetMoments': 'frontier',
+    'candidate_weights': 'frontier',
+    'efficient_frontier': 'frontier',
+    'band_coverage': 'risk',
+    'drawdown_duration': 'risk',
+    'max_drawdown': 'risk',
+    'risk_report': 'risk',
+    'rolling': 'risk',
+    'sortino_ratio': 'risk',
+    'ulcer_index': 'risk',
+    'var_cvar': 'risk',
+    'xirr': 'irr',
+    'xirr_batch': 'irr',
+    'rolling_sip': 'sip_windows',
+    'sip_percentiles': 'sip_windows',
+    'plan_lifecycles': 'lifecycle',
+    'compile_schedule': 'schedules',
+    'FeeStructure': 'fees',
+    'fee_drag': 'fees',
+    'CapitalGainsRules': 'capital_gains',
+    'LotBook': 'capital_gains',
+    'get_capital_gains_rules': 'capital_gains',
+    'simulate_capital_gains': 'capital_gains',
+    'ArrayStore': 'array_store',
+    'shared_arrays': 'array_store',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
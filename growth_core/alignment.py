@@ -0,0 +1,83 @@
+"""
+Align annual inflation with daily or monthly price series.
+
+InflationIndex turns the annual rates in inflation_data.csv into a cumulative price
+level on the calendar of a price series, once. Inflation and real returns for any
+window of that calendar are then two lookups, so rolling-window and Monte Carlo
+code can evaluate arrays of windows at once.
+
+Two ways of placing annual rates on a finer calendar:
+    step: every date takes the level of the nearest annual row, as the nearest-index
+          search in calculate_avg_inflation_rate does
+    interpolate: each year's rate compounds smoothly from its row date to the next
+"""
+import numpy as np
+
+from growth_core.history import DATA_DIR, load_inflation, nearest_index
+
+METHODS = ('step', 'interpolate')
+
+def monthly_closes(dates, values):
+    """Last close of every calendar month, forward-filling months without data"""
+    months = dates.astype('datetime64[M]')
+    last_of_month = np.append(np.flatnonzero(months[1:] != months[:-1]), len(months) - 1)
+    all_months = np.arange(months[0], months[-1] + 1)
+    pos = np.searchsorted(months[last_of_month], all_months, side='right') - 1
+    return all_months, values[last_of_month][pos]
+
+class InflationIndex:
+    def __init__(self, inflation_dates, inflation_values, calendar, method='step'):
+        if method not in METHODS:
+            raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+
+        calendar = np.asarray(calendar)
+        if calendar.dtype.kind == 'M':
+            calendar = calendar.astype('datetime64[D]')
+        self.calendar = np.asarray(calendar, dtype='datetime64[D]')
+        self.method = method
+
+        growth = 1 + np.asarray(inflation_values, dtype=float) / 100
+        # Price level at each annual row date, before that row's rate applies
+        row_level = np.concatenate(([1.0], np.cumprod(growth)))
+
+        if method == 'step':
+            rows = nearest_index(inflation_dates, self.calendar)
+            self.level = row_level[rows]
+            self.years = rows.astype(float)
+        else:
+            # Row dates plus the start of the year after the last row bound each rate's span
+            last_year = inflation_dates[-1].astype('datetime64[Y]')
+            bounds = np.append(inflation_dates, (last_year + 1).astype('datetime64[D]'))
+            rows = np.clip(np.searchsorted(bounds, self.calendar, side='right') - 1, 0, len(growth) - 1)
+            span = (bounds[rows + 1] - bounds[rows]).astype(float)
+            fraction = (self.calendar - bounds[rows]).astype(float) / span
+            self.level = row_level[rows] * growth[rows] ** fraction
+            self.years = rows + fraction
+
+    @classmethod
+    def from_csv(cls, calendar, method='step', data_dir=DATA_DIR):
+        inflation_dates, inflation_values = load_inflation(data_dir)
+        return cls(inflation_dates, inflation_values, calendar, method)
+
+    def positions(self, dates):
+        """Calendar index of each date (dates must lie on the calendar)"""
+        return np.searchsorted(self.calendar, np.asarray(dates, dtype='datetime64[D]'))
+
+    def window_inflation(self, start_idx, end_idx):
+        """Cumulative inflation between calendar positions, as a fraction"""
+        return self.level[end_idx] / self.level[start_idx] - 1
+
+    def annualized_inflation(self, start_idx, end_idx):
+        """
+        Average yearly inflation between calendar positions
+
+        For the step method this is the geometric mean of the whole annual rates
+        spanned, like calculate_avg_inflation_rate.
+        """
+        years = np.maximum(self.years[end_idx] - self.years[start_idx], 1 if self.method == 'step' else 1e-9)
+        return (self.level[end_idx] / self.level[start_idx]) ** (1 / years) - 1
+
+    def real_return(self, prices, start_idx, end_idx):
+        """Inflation-adjusted return of prices (on the same calendar) between positions"""
+        prices = np.asarray(prices, dtype=float)
+        return (prices[end_idx] / prices[start_idx]) / (self.level[end_idx] / self.level[start_idx]) - 1
@@ -0,0 +1,274 @@
+"""
+Process-wide store for large simulation arrays, shared by every dashboard session.
+
+ResultStore keeps results as Python objects, which is fine for a corpus history but
+not for (paths x years) Monte Carlo outputs: one copy per session, or a pickle into
+session state on every rerun, soon fills the dashboard host's memory. Here each
+result is a directory of .npy files keyed by the same (namespace, parameters) hash,
+written once and memory-mapped read-only by every reader, so sessions on the same
+inputs share one copy in the page cache and hold only an ArrayHandle.
+
+Entries are reference counted by the handles sessions hold. When the store grows past
+max_bytes, unreferenced entries are deleted least recently used first. A reader that
+still has an array mapped keeps it valid after deletion (the file is only unlinked),
+and other processes on the host find finished entries on disk instead of recomputing.
+A new store adopts the entries already in its directory, least recently used
+(by mtime) first, so those left by earlier runs count against max_bytes too, and
+removes temporary directories abandoned by writers that died.
+
+Set GROWTH_ARRAY_DIR to place the files (default: /dev/shm when it exists, so
+nothing touches disk) and GROWTH_ARRAY_MAX_BYTES to change the 2 GB budget.
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
+from growth_core.result_store import _Pending, params_key
+
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# A temporary directory older than this belongs to a writer that is gone
+STALE_TMP_SECONDS = 3600
+
+def default_directory():
+    base = '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+    return os.environ.get('GROWTH_ARRAY_DIR') or os.path.join(base, 'growth_arrays')
+
+class _Entry:
+    def __init__(self, views):
+        self.views = views
+        self.nbytes = sum(view.nbytes for view in views.values())
+        self.refs = 0
+
+class ArrayHandle:
+    """What a session keeps for a stored result: its key, and the arrays mapped on access"""
+
+    __slots__ = ('key', 'names', '_store', '_finalizer', '__weakref__')
+
+    def __init__(self, store, key, names):
+        self.key = key
+        self.names = names
+        self._store = store
+        # Released when the session drops the handle, even if release() is never called
+        self._finalizer = weakref.finalize(self, store.release, key)
+
+    def __getitem__(self, name):
+        return self._store.attach(self.key)[name]
+
+    def arrays(self):
+        """Every array of the result, as read-only memory maps"""
+        return dict(self._store.attach(self.key))
+
+    def release(self):
+        self._finalizer()
+
+    def __repr__(self):
+        return f"ArrayHandle({self.key[:12]}, {', '.join(self.names)})"
+
+class ArrayStore:
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or default_directory()
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        # Reentrant: a handle's finalizer can run (and release) whenever the garbage collector does
+        self.lock = threading.RLock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'coalesced': 0, 'computed': 0, 'evicted': 0}
+        os.makedirs(self.directory, exist_ok=True)
+        self._adopt()
+
+    def get_or_compute(self, namespace, params, compute):
+        """
+        Handle to the arrays for (namespace, params), computing them at most once
+
+        compute() returns a dict of arrays. As in ResultStore, concurrent callers for
+        the same key wait for the first one's computation. Every handle returned holds
+        a reference until it is released or garbage collected.
+        """
+        key = params_key(namespace, params)
+
+        with self.lock:
+            if key in self.entries:
+                self.stats['hits'] += 1
+                return self._handle(key)
+            pending = self.in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.in_flight[key] = _Pending()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            with self.lock:
+                if key in self.entries:
+                    return self._handle(key)
+            # Evicted in the meantime
+            return self.get_or_compute(namespace, params, compute)
+
+        found = False
+        try:
+            views = self._load(key)
+            found = views is not None
+            if not found:
+                views = self._save(key, compute())
+            entry = _Entry(views)
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            try:
+                with self.lock:
+                    del self.in_flight[key]
+                    if pending.error is None:
+                        self.entries[key] = entry
+                        self.stats['disk_hits' if found else 'computed'] += 1
+                        handle = self._handle(key)
+                        self._evict()
+            finally:
+                # Waiters must wake up whatever happened here
+                pending.event.set()
+
+        return handle
+
+    def session_handle(self, state, slot, namespace, params, compute):
+        """
+        Handle kept in a session's state (e.g. st.session_state) under slot
+
+        Reruns with the same parameters reuse the session's handle; new parameters
+        release the old entry before taking the new one.
+        """
+        key = params_key(namespace, params)
+        handle = state.get(slot)
+        if handle is not None and handle.key == key and handle.key in self.entries:
+            return handle
+        if handle is not None:
+            state.pop(slot).release()
+        state[slot] = handle = self.get_or_compute(namespace, params, compute)
+        return handle
+
+    def attach(self, key):
+        """The stored arrays of a key, as read-only memory maps (no copy)"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                raise KeyError(f"Result {key[:12]} is no longer stored")
+            self.entries.move_to_end(key)
+            return entry.views
+
+    def release(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry.refs -= 1
+                self._evict()
+
+    def nbytes(self):
+        with self.lock:
+            return sum(entry.nbytes for entry in self.entries.values())
+
+    def clear(self):
+        """Delete every unreferenced entry"""
+        with self.lock:
+            for key in [key for key, entry in self.entries.items() if entry.refs <= 0]:
+                self._delete(key)
+
+    def _handle(self, key):
+        entry = self.entries[key]
+        entry.refs += 1
+        self.entries.move_to_end(key)
+        try:
+            # Other stores on the directory order their adopted entries by this
+            os.utime(self._path(key))
+        except OSError:
+            pass
+        return ArrayHandle(self, key, list(entry.views))
+
+    def _adopt(self):
+        """Take over the entries already on disk, oldest first, and drop abandoned temporary directories"""
+        found = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            if name.endswith('.tmp'):
+                if time.time() - mtime > STALE_TMP_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif os.path.isdir(path):
+                found.append((mtime, name))
+
+        with self.lock:
+            for _, key in sorted(found):
+                views = self._load(key)
+                if views is None:
+                    shutil.rmtree(self._path(key), ignore_errors=True)
+                else:
+                    self.entries[key] = _Entry(views)
+            self._evict()
+
+    def _evict(self):
+        total = sum(entry.nbytes for entry in self.entries.values())
+        for key in [key for key, entry in self.entries.items() if entry.refs <= 0]:
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[key].nbytes
+            self._delete(key)
+            self.stats['evicted'] += 1
+
+    def _delete(self, key):
+        del self.entries[key]
+        shutil.rmtree(self._path(key), ignore_errors=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def _load(self, key):
+        """Map an entry another process (or an earlier run) already wrote"""
+        path = self._path(key)
+        try:
+            names = sorted(name[:-4] for name in os.listdir(path) if name.endswith('.npy'))
+            return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode='r') for name in names}
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key, arrays):
+        path = self._path(key)
+        # Write into a temporary directory and rename it, so readers never see a partial entry
+        tmp_path = tempfile.mkdtemp(dir=self.directory, suffix='.tmp')
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, f"{name}.npy"), np.asarray(array))
+            os.rename(tmp_path, path)
+        except OSError:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            # Another process stored the same key first
+            if not os.path.isdir(path):
+                raise
+        views = self._load(key)
+        if views is None:
+            # Already deleted again (e.g. evicted by another process): keep this process's copy
+            views = {name: np.asarray(array).view() for name, array in arrays.items()}
+            for view in views.values():
+                view.flags.writeable = False
+        return views
+
+_shared_arrays = None
+_shared_arrays_lock = threading.Lock()
+
+def shared_arrays():
+    """The process-wide ArrayStore, created on first use from GROWTH_ARRAY_DIR and GROWTH_ARRAY_MAX_BYTES"""
+    global _shared_arrays
+    with _shared_arrays_lock:
+        if _shared_arrays is None:
+            _shared_arrays = ArrayStore(max_bytes=int(os.environ.get('GROWTH_ARRAY_MAX_BYTES', DEFAULT_MAX_BYTES)))
+        return _shared_arrays
@@ -0,0 +1,273 @@
+"""
+Capital-gains tax on withdrawals, from the cost basis of every purchase lot.
+
+calculate_growth and get_final_corpus_val tax a withdrawal as a flat percentage of it,
+but only the gain in the units sold is taxed, at the short- or long-term rate
+depending on how long they were held, with the first part of each year's long-term
+gains exempt. LotBook keeps the purchase lots of a whole batch of portfolios in
+preallocated (portfolios x lots) arrays of units and cost, oldest lot first, so a FIFO
+sale is one cumulative sum over the lots rather than a loop over lot objects.
+
+The gross sale that leaves a given withdrawal after tax is found by iterating
+gross = net + tax(gross): the tax grows by at most the top rate per rupee sold, so
+each step shrinks the error by that factor.
+
+Rules (rates as fractions, exemption in lakhs, cess in %) come from a config file,
+like the income-tax regimes in tax_regimes.json.
+
+Usage:
+    python -m growth_core.capital_gains --rules FY2025-26/equity --cost-basis 0.5 --paths 1000
+"""
+import argparse
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+from growth_core.schedules import growth_rates, growth_series
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'capital_gains.json')
+DEFAULT_RULES = 'FY2025-26/equity'
+
+class CapitalGainsRules:
+    def __init__(self, name, stcg_rate, ltcg_rate, ltcg_exemption=0.0, holding_years=1, cess=0.0):
+        self.name = name
+        self.stcg_rate = stcg_rate
+        self.ltcg_rate = ltcg_rate
+        self.exemption = ltcg_exemption / 100  # Lakhs to crores
+        self.holding_years = holding_years
+        self.cess = cess
+
+    def tax(self, short_gains, long_gains, exemption_left):
+        """
+        Tax on realized gains (crores), short-term losses first offsetting long-term gains
+
+        Returns:
+            (tax, exemption used)
+        """
+        long_gains = long_gains + np.minimum(short_gains, 0.0)
+        short_gains = np.maximum(short_gains, 0.0)
+        exempt = np.clip(long_gains, 0.0, exemption_left)
+        tax = short_gains * self.stcg_rate + np.maximum(long_gains - exempt, 0.0) * self.ltcg_rate
+        return tax * (1 + self.cess / 100), exempt
+
+    def __repr__(self):
+        return f"CapitalGainsRules({self.name!r}, stcg={self.stcg_rate}, ltcg={self.ltcg_rate})"
+
+def load_capital_gains_rules(path=DEFAULT_CONFIG):
+    """All rule sets in a config file, keyed by name"""
+    with open(path) as f:
+        config = json.load(f)
+    return {name: CapitalGainsRules(name, **spec) for name, spec in config.items()}
+
+@lru_cache(maxsize=None)
+def _rules(path):
+    return load_capital_gains_rules(path)
+
+def get_capital_gains_rules(name=DEFAULT_RULES, path=DEFAULT_CONFIG):
+    """A rule set from the config file; the file is parsed once per process"""
+    rules = _rules(path)
+    if name not in rules:
+        raise KeyError(f"Unknown capital gains rules {name!r}, available: {', '.join(sorted(rules))}")
+    return rules[name]
+
+class LotBook:
+    """Purchase lots of one fund for a batch of portfolios, oldest first"""
+
+    def __init__(self, portfolios, max_lots, dtype=np.float64):
+        self.units = np.zeros((portfolios, max_lots), dtype=dtype)
+        self.cost = np.zeros((portfolios, max_lots), dtype=dtype)
+        # Lots are bought on the same dates in every portfolio, so one purchase year per column
+        self.bought = np.zeros(max_lots, dtype=np.int64)
+        self.count = 0
+        # Lots before head are sold out in every portfolio
+        self.head = 0
+
+    def buy(self, amount, nav, year, cost=None):
+        """New lot of `amount` at nav in every portfolio; cost defaults to the amount paid"""
+        if self.count == self.units.shape[1]:
+            raise ValueError(f"LotBook is full ({self.count} lots)")
+        self.units[:, self.count] = amount / nav
+        self.cost[:, self.count] = amount if cost is None else cost
+        self.bought[self.count] = year
+        self.count += 1
+
+    def value(self, nav):
+        return self.units[:, self.head:self.count].sum(axis=1) * nav
+
+    def scale(self, factor):
+        """Scale every lot, keeping cost and holding period (e.g. a generation's inheritance)"""
+        self.units[:, self.head:self.count] *= np.asarray(factor)[..., None]
+        self.cost[:, self.head:self.count] *= np.asarray(factor)[..., None]
+
+    def _fifo(self, gross, nav):
+        """Fraction of every live lot a sale of gross sells, oldest lots first"""
+        lot_value = self.units[:, self.head:self.count] * nav[:, None]
+        before = np.cumsum(lot_value, axis=1) - lot_value
+        sold = np.clip(gross[:, None] - before, 0.0, lot_value)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(lot_value > 0, sold / lot_value, 0.0)
+        return fraction, sold
+
+    def gains(self, gross, nav, year, holding_years):
+        """(short-term, long-term) gains realized by selling gross from every portfolio"""
+        fraction, sold = self._fifo(gross, nav)
+        gain = sold - fraction * self.cost[:, self.head:self.count]
+        long_term = year - self.bought[self.head:self.count] >= holding_years
+        return gain @ ~long_term, gain @ long_term
+
+    def gross_up(self, net, nav, year, rules, exemption_left, tol=1e-12, max_iter=50):
+        """
+        Sale leaving net after capital-gains tax, capped at the holdings
+
+        Returns:
+            (gross, tax, exemption used)
+        """
+        holdings = self.value(nav)
+        gross = np.minimum(net, holdings)
+        for _ in range(max_iter):
+            tax, exempt = rules.tax(*self.gains(gross, nav, year, rules.holding_years), exemption_left)
+            new_gross = np.minimum(net + tax, holdings)
+            converged = np.all(np.abs(new_gross - gross) <= tol * np.maximum(net, 1.0))
+            gross = new_gross
+            if converged:
+                break
+        tax, exempt = rules.tax(*self.gains(gross, nav, year, rules.holding_years), exemption_left)
+        return gross, tax, exempt
+
+    def sell(self, gross, nav):
+        """Sell gross from every portfolio, oldest lots first"""
+        fraction, _ = self._fifo(gross, nav)
+        # Lots sold to within rounding are emptied, so head can move past them
+        keep = np.where(fraction > 1 - 1e-12, 0.0, 1 - fraction)
+        self.units[:, self.head:self.count] *= keep
+        self.cost[:, self.head:self.count] *= keep
+        while self.head < self.count and not self.units[:, self.head].any():
+            self.head += 1
+
+def simulate_capital_gains(params, rules=DEFAULT_RULES, returns=None, inflation=None, cost_basis=1.0,
+                           chunk_size=10_000):
+    """
+    calculate_growth with capital-gains tax on every withdrawal instead of tax_on_withdrawals
+
+    params are calculate_growth's. Optional 'sip' (crores in year 1), 'sip_increment' (%)
+    buy a new lot at the start of every year before withdrawal_start_yr, as
+    get_final_sip_corpus does. The initial portfolio is one lot whose cost is cost_basis
+    times its value. A generation's halving and inheritance tax scale every lot, keeping
+    its cost basis and holding period.
+
+    Args:
+        returns, inflation: (paths x years, %) nominal returns and inflation, e.g. from
+            portfolio.bootstrap_paths; otherwise params' nominal_return and inflation,
+            or their params['schedules'] (see growth_core.schedules)
+        rules: CapitalGainsRules or a name from the config file
+    Returns:
+        dict of 'final_values', 'depletion_years' (paths,) and 'withdrawals', 'tax_paid'
+        (paths x years); amounts in today's money (crores), depletion year 0 where the
+        portfolio lasts
+    """
+    rules = get_capital_gains_rules(rules) if isinstance(rules, str) else rules
+    years = params['projection_years']
+    rates = growth_rates(params, years)
+    returns = np.atleast_2d(np.asarray(rates['nominal_return'] if returns is None else returns, dtype=float))
+    inflation = np.atleast_2d(np.asarray(rates['inflation'] if inflation is None else inflation, dtype=float))
+    paths = max(returns.shape[0], inflation.shape[0])
+    # The assumptions' single path broadcasts over the given ones, paths are cut to the projection
+    returns, inflation = (np.broadcast_to(values[:, :years], (paths, years)) for values in (returns, inflation))
+
+    result = {
+        'final_values': np.empty(paths),
+        'depletion_years': np.zeros(paths, dtype=np.int64),
+        'withdrawals': np.zeros((paths, years)),
+        'tax_paid': np.zeros((paths, years)),
+    }
+    for first in range(0, paths, chunk_size):
+        chunk = slice(first, first + chunk_size)
+        _simulate_chunk(params, rules, returns[chunk], inflation[chunk], cost_basis,
+                        {name: values[chunk] for name, values in result.items()})
+    return result
+
+def _simulate_chunk(params, rules, returns, inflation, cost_basis, out):
+    paths, years = returns.shape
+    withdrawal_start_yr = params['withdrawal_start_yr']
+    sip_years = max(withdrawal_start_yr - 1, 0) if params.get('sip') else 0
+    book = LotBook(paths, 1 + sip_years)
+
+    nav = np.ones(paths)
+    price_level = np.ones(paths)
+    book.buy(np.full(paths, float(params['initial_portfolio'])), nav, 0,
+             cost=np.full(paths, params['initial_portfolio'] * cost_basis))
+    sip = params.get('sip', 0.0)
+    annual_withdrawal = params['initial_withdrawal'] / 100  # Convert lakhs to crores
+    big_withdrawal = params['big_withdrawal_amt']
+    _, withdrawal_factor = growth_series(params, years)
+    alive = np.ones(paths, dtype=bool)
+
+    for year in range(1, years + 1):
+        if year <= sip_years:
+            book.buy(np.full(paths, sip), nav, year - 1)
+            sip *= 1 + params.get('sip_increment', 0.0) / 100
+
+        nav = nav * (1 + returns[:, year - 1] / 100)
+        price_level = price_level * (1 + inflation[:, year - 1] / 100)
+        annual_withdrawal *= withdrawal_factor[year - 1]
+        big_withdrawal *= withdrawal_factor[year - 1]
+
+        # The same withdrawal schedule as calculate_growth, in today's money
+        real_amount = 0.0
+        if year >= withdrawal_start_yr:
+            real_amount += annual_withdrawal
+            if (year % params['big_withdrawal_time'] == 0 and year >= params['big_withdrawal_time']
+                    and year >= params['big_withdrawal_start_yr']):
+                real_amount += big_withdrawal
+
+        if real_amount:
+            net = real_amount * price_level
+            gross, tax, _ = book.gross_up(net, nav, year, rules, rules.exemption)
+            newly_depleted = alive & (gross - tax < net * (1 - 1e-12))
+            out['depletion_years'][newly_depleted] = year
+            alive &= ~newly_depleted
+            # A depleting path's last sale falls short of the withdrawal, so neither is recorded
+            out['withdrawals'][:, year - 1] = np.where(alive, real_amount, 0.0)
+            out['tax_paid'][:, year - 1] = np.where(alive, tax / price_level, 0.0)
+            book.sell(gross, nav)
+
+        if params['generational_halving'] and year % params['halving_years'] == 0:
+            book.scale(0.5 * (1 - params['inheritance_tax'] / 100))
+
+        if not alive.any():
+            break
+
+    out['final_values'][:] = np.where(alive, book.value(nav) / price_level, 0.0)
+
+def main():
+    from growth_core.frontier import DEFAULT_GROWTH_PARAMS
+    from growth_core.portfolio import bootstrap_paths
+
+    parser = argparse.ArgumentParser(description="Capital-gains tax on withdrawals vs the flat tax_on_withdrawals")
+    parser.add_argument('--rules', default=DEFAULT_RULES, help=', '.join(sorted(_rules(DEFAULT_CONFIG))))
+    parser.add_argument('--cost-basis', type=float, default=1.0, help="Cost of the initial portfolio over its value")
+    parser.add_argument('--years', type=int, default=50)
+    parser.add_argument('--paths', type=int, default=0, help="Bootstrapped nifty paths (0 = the constant assumptions)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    params = {**DEFAULT_GROWTH_PARAMS, 'projection_years': args.years}
+    returns = inflation = None
+    if args.paths:
+        paths = bootstrap_paths(['nifty'], args.paths, args.years, seed=args.seed)
+        returns, inflation = paths['returns'][:, :, 0], paths['inflation']
+    result = simulate_capital_gains(params, args.rules, returns, inflation, args.cost_basis)
+
+    withdrawn = result['withdrawals'].sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        effective_rate = result['tax_paid'].sum(axis=1) / withdrawn * 100
+    print(f"Flat tax on withdrawals: {params['tax_on_withdrawals']:.2f}%")
+    print(f"Capital gains ({args.rules}): effective rate median {np.nanmedian(effective_rate):.2f}%, "
+          f"p95 {np.nanpercentile(effective_rate, 95):.2f}%")
+    print(f"Final value median {np.median(result['final_values']):.2f} crores, "
+          f"success rate {(result['depletion_years'] == 0).mean():.1%}")
+
+if __name__ == "__main__":
+    main()
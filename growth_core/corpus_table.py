@@ -0,0 +1,389 @@
+"""
+Precomputed lookup tables for the required perpetual corpus (find_req_amt).
+
+Each year of the get_final_corpus_val recurrence is x -> (g * x - w) / k, with g the
+real growth factor (1 + r)(1 - f)/(1 + i), w the (tax-inclusive) withdrawal and k the
+number of kids in a generation year, 1 otherwise. Over the simulated years the corpus
+is multiplied by G and loses the accumulated withdrawals, so the corpus find_req_amt
+converges to (output == starting amount) is
+
+    PV / (1 - 1/G),   PV = sum_t w_t * k_1 ... k_{t-1} / (g_1 ... g_t)
+
+PV is linear in the withdrawals, so it is stored per unit of annual and of decadal
+withdrawal. Splitting it at india_maturity_yr (m) gives
+
+    PV = P(g_pre) + g_pre^-(m-1) * Q(g_post)
+
+where P only sees the pre-maturity growth factor and Q only the mature one. The table
+holds log P and log Q on a fine growth-factor axis (times withdrawal increment) for
+each combination of the integer parameters. G has a closed form, so the singularity
+as G -> 1 is computed exactly rather than interpolated.
+
+Set GROWTH_CORPUS_TABLE to a built table to let the dashboards use it.
+
+Usage:
+    python -m growth_core.corpus_table build -o corpus_table.npz
+    python -m growth_core.corpus_table report corpus_table.npz --samples 200
+"""
+import argparse
+import math
+import os
+import threading
+import time
+
+import numpy as np
+
+from growth_core.perpetual import find_req_amt
+
+YEARS = 1000
+SOLVER_UPPER_BOUND = 1e10
+
+DEFAULT_GRID = {
+    'growth': (0.95, 1.15, 0.0001),
+    'withdrawal_increment': (0.0, 5.0, 0.5),
+    'new_generation_time': list(range(20, 36)),
+    'kids': [1, 2, 3, 4],
+    'withdrawal_start_yr': [0],
+    'india_maturity_yr': [50],
+}
+
+DISCRETE_AXES = ['new_generation_time', 'kids', 'withdrawal_start_yr', 'india_maturity_yr']
+PV_TABLES = ['log_pre_annual', 'log_pre_decadal', 'log_post_annual', 'log_post_decadal']
+
+def real_growth_factor(annual_return, fees, inflation):
+    """Yearly corpus multiplier applied by get_final_corpus_val before withdrawals"""
+    return (1 + annual_return / 100) * (1 - fees / 100) / (1 + inflation / 100)
+
+def pre_maturity_years(india_maturity_yr, years=YEARS):
+    return india_maturity_yr - 1 if 1 <= india_maturity_yr <= years else years
+
+def log_multiplier(pre_growth, post_growth, new_generation_time, kids, india_maturity_yr, years=YEARS):
+    """Closed-form log(G): growth compounding across both phases minus the generational splits"""
+    pre_years = pre_maturity_years(india_maturity_yr, years)
+    return (pre_years * math.log(pre_growth) + (years - pre_years) * math.log(post_growth)
+            - (years // new_generation_time) * math.log(kids))
+
+def unit_present_values(growth, withdrawal_increment, new_generation_time, kids, withdrawal_start_yr,
+                        india_maturity_yr, years=YEARS):
+    """
+    P and Q per unit of annual and of decadal withdrawal
+
+    Vectorized over broadcastable growth / withdrawal_increment arrays. The same growth
+    array is used as g_pre for P and as g_post for Q.
+
+    Returns:
+        (pre_annual, pre_decadal, post_annual, post_decadal) arrays
+    """
+    growth, withdrawal_increment = np.broadcast_arrays(
+        np.asarray(growth, dtype=np.float64),
+        np.asarray(withdrawal_increment, dtype=np.float64),
+    )
+    increment = 1 + withdrawal_increment / 100
+    pre_years = pre_maturity_years(india_maturity_yr, years)
+
+    discount = np.ones_like(growth)
+    withdrawal = np.ones_like(growth)
+    pv = {name: np.zeros_like(growth) for name in ('pre_annual', 'pre_decadal', 'post_annual', 'post_decadal')}
+    splits = 1.0
+
+    for year in range(1, years + 1):
+        phase = 'pre' if year <= pre_years else 'post'
+        if year == pre_years + 1:
+            # Q is discounted from the maturity year onwards; P's discount is applied at lookup
+            discount = np.ones_like(growth)
+        discount /= growth
+
+        if year >= withdrawal_start_yr:
+            value = withdrawal * discount * splits
+            pv[f'{phase}_annual'] += value
+            if year % 10 == 0:
+                pv[f'{phase}_decadal'] += value
+
+        withdrawal = withdrawal * increment
+        if year % new_generation_time == 0:
+            splits *= kids
+
+    return pv['pre_annual'], pv['pre_decadal'], pv['post_annual'], pv['post_decadal']
+
+def unit_required_corpus(pre_growth, post_growth, withdrawal_increment, new_generation_time, kids,
+                         withdrawal_start_yr, india_maturity_yr, years=YEARS):
+    """
+    Exact required corpus per unit of annual and of decadal withdrawal (before withdrawal tax)
+
+    Returns (nan, nan) when there is no perpetual solution (G <= 1).
+    """
+    log_g = log_multiplier(pre_growth, post_growth, new_generation_time, kids, india_maturity_yr, years)
+    if log_g <= 0:
+        return math.nan, math.nan
+    pre_a, pre_d, _, _ = unit_present_values(pre_growth, withdrawal_increment, new_generation_time, kids,
+                                             withdrawal_start_yr, india_maturity_yr, years)
+    _, _, post_a, post_d = unit_present_values(post_growth, withdrawal_increment, new_generation_time, kids,
+                                               withdrawal_start_yr, india_maturity_yr, years)
+    bridge = pre_growth ** -pre_maturity_years(india_maturity_yr, years)
+    scale = -math.expm1(-log_g)
+    return float(pre_a + bridge * post_a) / scale, float(pre_d + bridge * post_d) / scale
+
+def closed_form_required_corpus(annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                                annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                                india_maturity_yr, mature_returns, mature_inflation, years=YEARS):
+    """
+    Exact required corpus (find_req_amt's arguments) vectorized over arrays of annual_return and mature_returns
+
+    Returns inf where there is no perpetual solution (G <= 1), where the bisection would
+    stop at SOLVER_UPPER_BOUND.
+    """
+    pre_growth = real_growth_factor(np.asarray(annual_return, dtype=np.float64), fees, inflation)
+    post_growth = real_growth_factor(np.asarray(mature_returns, dtype=np.float64), fees, mature_inflation)
+    pre_growth, post_growth = np.broadcast_arrays(pre_growth, post_growth)
+    pre_years = pre_maturity_years(india_maturity_yr, years)
+
+    pre_a, pre_d, _, _ = unit_present_values(pre_growth, withdrawal_increment, new_generation_time, kids,
+                                             withdrawal_start_yr, india_maturity_yr, years)
+    _, _, post_a, post_d = unit_present_values(post_growth, withdrawal_increment, new_generation_time, kids,
+                                               withdrawal_start_yr, india_maturity_yr, years)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        log_g = (pre_years * np.log(pre_growth) + (years - pre_years) * np.log(post_growth)
+                 - (years // new_generation_time) * math.log(kids))
+        bridge = pre_growth ** -pre_years
+        present_value = (annual_withdrawal * (pre_a + bridge * post_a)
+                         + decadal_withdrawal * (pre_d + bridge * post_d))
+        corpus = (1 + withdrawal_tax / 100) * present_value / -np.expm1(-log_g)
+    return np.where(log_g > 0, corpus, np.inf)
+
+def axis_values(start, stop, step):
+    return start + step * np.arange(round((stop - start) / step) + 1)
+
+def build_table(grid=None, progress=None):
+    """Evaluate the unit present values over the whole grid. Returns a dict of arrays"""
+    grid = {**DEFAULT_GRID, **(grid or {})}
+    growth = axis_values(*grid['growth'])
+    inc = axis_values(*grid['withdrawal_increment'])
+    discrete = [np.array(grid[name], dtype=np.int64) for name in DISCRETE_AXES]
+
+    shape = tuple(len(values) for values in discrete) + (len(growth), len(inc))
+    tables = {name: np.empty(shape, dtype=np.float32) for name in PV_TABLES}
+
+    mesh = np.meshgrid(growth, inc, indexing='ij')
+    combos = list(np.ndindex(*shape[:4]))
+    with np.errstate(divide='ignore'):
+        for n, idx in enumerate(combos):
+            params = [int(values[i]) for values, i in zip(discrete, idx)]
+            for name, values in zip(PV_TABLES, unit_present_values(*mesh, *params)):
+                # log(0) = -inf for phases without withdrawals; exp() brings it back to 0 on lookup
+                tables[name][idx] = np.log(values)
+            if progress:
+                progress(n + 1, len(combos))
+
+    tables['growth'] = np.array(grid['growth'], dtype=np.float64)
+    tables['withdrawal_increment'] = np.array(grid['withdrawal_increment'], dtype=np.float64)
+    for name, values in zip(DISCRETE_AXES, discrete):
+        tables[name] = values
+    return tables
+
+def save_table(path, table):
+    np.savez_compressed(path, **table)
+
+class CorpusTable:
+    """Interpolated required-corpus lookups with a fallback to the exact solver"""
+
+    def __init__(self, table):
+        self.tables = {name: table[name].astype(np.float64) for name in PV_TABLES}
+        self.growth_axis = tuple(float(v) for v in table['growth'])
+        self.increment_axis = tuple(float(v) for v in table['withdrawal_increment'])
+        self.sizes = self.tables['log_pre_annual'].shape[4:]
+        self.discrete = [{int(v): i for i, v in enumerate(table[name])} for name in DISCRETE_AXES]
+        self.stats = {'lookups': 0, 'fallbacks': 0}
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls({name: data[name] for name in data.files})
+
+    @staticmethod
+    def _cell(axis, size, value):
+        start, _, step = axis
+        pos = (value - start) / step
+        if pos < -1e-9 or pos > size - 1 + 1e-9:
+            return None
+        if size == 1:
+            return 0, 0.0
+        lo = min(max(int(math.floor(pos)), 0), size - 2)
+        return lo, pos - lo
+
+    @staticmethod
+    def _interp(table, growth_cell, increment_cell):
+        (i, fi), (k, fk) = growth_cell, increment_cell
+        total = 0.0
+        for di, wi in ((0, 1 - fi), (1, fi)):
+            for dk, wk in ((0, 1 - fk), (1, fk)):
+                w = wi * wk
+                if w:
+                    total += w * table[i + di, k + dk]
+        return math.exp(total)
+
+    def unit_lookup(self, pre_growth, post_growth, withdrawal_increment, new_generation_time, kids,
+                    withdrawal_start_yr, india_maturity_yr):
+        """(per_annual, per_decadal) required corpus from the table, or None if off the grid or unsolvable"""
+        idx = []
+        for mapping, value in zip(self.discrete, (new_generation_time, kids, withdrawal_start_yr, india_maturity_yr)):
+            if value != int(value) or int(value) not in mapping:
+                return None
+            idx.append(mapping[int(value)])
+        idx = tuple(idx)
+
+        pre_cell = self._cell(self.growth_axis, self.sizes[0], pre_growth)
+        post_cell = self._cell(self.growth_axis, self.sizes[0], post_growth)
+        increment_cell = self._cell(self.increment_axis, self.sizes[1], withdrawal_increment)
+        if pre_cell is None or post_cell is None or increment_cell is None:
+            return None
+
+        log_g = log_multiplier(pre_growth, post_growth, new_generation_time, kids, india_maturity_yr)
+        if log_g <= 0:
+            return None
+
+        bridge = pre_growth ** -pre_maturity_years(india_maturity_yr)
+        scale = -math.expm1(-log_g)
+        tables = {name: table[idx] for name, table in self.tables.items()}
+        per_annual = (self._interp(tables['log_pre_annual'], pre_cell, increment_cell)
+                      + bridge * self._interp(tables['log_post_annual'], post_cell, increment_cell)) / scale
+        per_decadal = (self._interp(tables['log_pre_decadal'], pre_cell, increment_cell)
+                       + bridge * self._interp(tables['log_post_decadal'], post_cell, increment_cell)) / scale
+        return per_annual, per_decadal
+
+    def lookup(self, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax, annual_return,
+               inflation, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr,
+               mature_returns, mature_inflation):
+        """Required corpus from the table (same arguments as find_req_amt), or None if off the grid"""
+        units = self.unit_lookup(
+            real_growth_factor(annual_return, fees, inflation),
+            real_growth_factor(mature_returns, fees, mature_inflation),
+            withdrawal_increment, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr,
+        )
+        if units is None:
+            return None
+        per_annual, per_decadal = units
+        return (1 + withdrawal_tax / 100) * (annual_withdrawal * per_annual + decadal_withdrawal * per_decadal)
+
+    def required_corpus(self, **kwargs):
+        """Table lookup with a fallback to the exact find_req_amt solve off the grid"""
+        self.stats['lookups'] += 1
+        amt = self.lookup(**kwargs)
+        if amt is None:
+            self.stats['fallbacks'] += 1
+            amt, _ = find_req_amt(**kwargs)
+        return amt
+
+_default_table = None
+_default_table_lock = threading.Lock()
+
+def default_corpus_table():
+    """The table at GROWTH_CORPUS_TABLE, loaded once per process, or None if not configured"""
+    global _default_table
+    path = os.environ.get('GROWTH_CORPUS_TABLE')
+    if not path:
+        return None
+    with _default_table_lock:
+        if _default_table is None:
+            _default_table = CorpusTable.load(path)
+        return _default_table
+
+def accuracy_report(table, samples=200, seed=0):
+    """
+    Compare table lookups against exact find_req_amt solves
+
+    Inputs are drawn on the dashboard widget steps (returns/inflation 0.5, fees 0.1,
+    withdrawal increment 0.5) and the table's integer axes.
+    """
+    rng = np.random.default_rng(seed)
+    lookup_times = []
+    errors = []
+    closed_form_errors = []
+    off_grid = solver_capped = 0
+    for _ in range(samples):
+        params = {
+            'annual_withdrawal': float(rng.integers(1, 11) / 10),
+            'decadal_withdrawal': float(rng.integers(0, 21) / 2),
+            'withdrawal_increment': float(rng.integers(0, 5) / 2),
+            'withdrawal_tax': float(rng.integers(0, 31)),
+            'annual_return': float(rng.integers(16, 33) / 2),
+            'inflation': float(rng.integers(8, 17) / 2),
+            'fees': float(rng.integers(0, 21) / 10),
+            'new_generation_time': int(rng.choice(list(table.discrete[0]))),
+            'kids': int(rng.choice(list(table.discrete[1]))),
+            'withdrawal_start_yr': int(rng.choice(list(table.discrete[2]))),
+            'india_maturity_yr': int(rng.choice(list(table.discrete[3]))),
+            'mature_returns': float(rng.integers(14, 25) / 2),
+            'mature_inflation': float(rng.integers(6, 13) / 2),
+        }
+        start = time.perf_counter()
+        approx = table.lookup(**params)
+        lookup_times.append(time.perf_counter() - start)
+        if approx is None:
+            off_grid += 1
+            continue
+        exact, _ = find_req_amt(**params)
+        if exact >= SOLVER_UPPER_BOUND * 0.999:
+            # find_req_amt bisects on [0, 1e10], beyond that it just returns the bound
+            solver_capped += 1
+            continue
+        errors.append(abs(approx - exact) / exact)
+
+        # The bisection stops at a 1e-5 mismatch in the final corpus, which is loose when G is
+        # close to 1, so also compare against the closed form the table interpolates
+        per_annual, per_decadal = unit_required_corpus(
+            real_growth_factor(params['annual_return'], params['fees'], params['inflation']),
+            real_growth_factor(params['mature_returns'], params['fees'], params['mature_inflation']),
+            params['withdrawal_increment'], params['new_generation_time'], params['kids'],
+            params['withdrawal_start_yr'], params['india_maturity_yr'],
+        )
+        closed_form = (1 + params['withdrawal_tax'] / 100) * (
+            params['annual_withdrawal'] * per_annual + params['decadal_withdrawal'] * per_decadal)
+        closed_form_errors.append(abs(approx - closed_form) / closed_form)
+
+    errors = np.array(errors)
+    return {
+        'samples': samples,
+        'compared': int(len(errors)),
+        'off_grid': off_grid,
+        'solver_capped': solver_capped,
+        'max_rel_error': float(errors.max()) if len(errors) else None,
+        'mean_rel_error': float(errors.mean()) if len(errors) else None,
+        'p99_rel_error': float(np.percentile(errors, 99)) if len(errors) else None,
+        'max_rel_error_vs_closed_form': max(closed_form_errors) if closed_form_errors else None,
+        'mean_lookup_us': float(np.mean(lookup_times) * 1e6),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check the required-corpus lookup table")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help="Precompute the table")
+    build.add_argument('-o', '--output', default='corpus_table.npz')
+    build.add_argument('--generation-times', type=int, nargs='+', default=DEFAULT_GRID['new_generation_time'])
+    build.add_argument('--kids', type=int, nargs='+', default=DEFAULT_GRID['kids'])
+    build.add_argument('--withdrawal-start-yrs', type=int, nargs='+', default=DEFAULT_GRID['withdrawal_start_yr'])
+    build.add_argument('--maturity-yrs', type=int, nargs='+', default=DEFAULT_GRID['india_maturity_yr'])
+
+    report = sub.add_parser('report', help="Accuracy of table lookups against exact solves")
+    report.add_argument('table')
+    report.add_argument('--samples', type=int, default=200)
+    report.add_argument('--seed', type=int, default=0)
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        grid = {
+            'new_generation_time': args.generation_times,
+            'kids': args.kids,
+            'withdrawal_start_yr': args.withdrawal_start_yrs,
+            'india_maturity_yr': args.maturity_yrs,
+        }
+        table = build_table(grid, progress=lambda n, total: print(f"\r{n}/{total} parameter combinations", end=''))
+        print()
+        save_table(args.output, table)
+        print(f"Saved {table['log_pre_annual'].shape} table to {args.output}")
+    else:
+        for name, value in accuracy_report(CorpusTable.load(args.table), args.samples, args.seed).items():
+            print(f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Incremental refresh of the ticker and inflation CSVs.
+
+Only rows newer than the last stored date are fetched and appended, so a daily
+refresh costs O(new rows) instead of re-downloading and rewriting the full history.
+Rows come from a DataSource: YahooSource and WorldBankSource wrap the network
+clients (imported on first use), FakeSource serves rows from memory for tests.
+
+Usage:
+    python -m growth_core.data_refresh ^BSESN ^NSEI inflation
+"""
+import argparse
+import os
+from datetime import datetime
+
+import numpy as np
+
+from growth_core.history import DATA_DIR, read_series_cache, parse_series, write_series_cache
+
+INFLATION = 'inflation'
+INFLATION_INDICATOR = {"FP.CPI.TOTL.ZG": "Inflation (%)"}
+
+def series_path(series, data_dir=DATA_DIR):
+    if series == INFLATION:
+        return os.path.join(data_dir, "inflation_data.csv")
+    return os.path.join(data_dir, f"{series}_data.csv")
+
+def series_header(series):
+    if series == INFLATION:
+        return "date,Inflation (%)"
+    return f"Date,{series}"
+
+class DataSource:
+    """Where refresh() gets new rows from"""
+
+    def fetch(self, series, after):
+        """
+        Rows newer than `after` for a series
+
+        Args:
+            series: ticker symbol, or "inflation"
+            after: last stored date as datetime64[D], or None for the full history
+        Returns:
+            list of (YYYY-MM-DD, value) tuples in date order
+        """
+        raise NotImplementedError
+
+class YahooSource(DataSource):
+    def fetch(self, series, after):
+        import yfinance as yf
+
+        start = None if after is None else str(after + 1)
+        data = yf.download(series, start=start, auto_adjust=True, progress=False)
+        if data.empty:
+            return []
+        close = data["Close"]
+        if hasattr(close, 'columns'):
+            close = close[series]
+        return [(date.strftime('%Y-%m-%d'), float(value)) for date, value in close.dropna().items()]
+
+class WorldBankSource(DataSource):
+    def fetch(self, series, after):
+        import wbdata
+
+        first_year = 1960 if after is None else int(str(after)[:4]) + 1
+        last_year = datetime.now().year
+        if first_year > last_year:
+            return []
+        data = wbdata.get_dataframe(INFLATION_INDICATOR, country="IND", date=(str(first_year), str(last_year)),
+                                    parse_dates=True)
+        data = data.iloc[::-1].dropna()
+        return [(date.strftime('%Y-%m-%d'), float(value)) for date, value in data.iloc[:, 0].items()]
+
+class FakeSource(DataSource):
+    """In-memory source: {series: [(date, value), ...]}; records every fetch in .calls"""
+
+    def __init__(self, rows):
+        self.rows = {series: sorted(series_rows) for series, series_rows in rows.items()}
+        self.calls = []
+
+    def fetch(self, series, after):
+        self.calls.append((series, after))
+        return [(date, value) for date, value in self.rows.get(series, [])
+                if after is None or np.datetime64(date[:10], 'D') > after]
+
+def default_source(series):
+    return WorldBankSource() if series == INFLATION else YahooSource()
+
+def last_stored_date(path, block_size=4096):
+    """Date of the last row in a series CSV, reading only the end of the file"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        size = f.seek(0, os.SEEK_END)
+        offset = size
+        while True:
+            offset = max(0, offset - block_size)
+            f.seek(offset)
+            lines = [line for line in f.read().splitlines() if line.strip()]
+            # Unless we read from the start, the first line may be cut off
+            complete = lines if offset == 0 else lines[1:]
+            if complete or offset == 0:
+                break
+    if len(complete) < (2 if offset == 0 else 1):
+        return None  # Header only
+    return np.datetime64(complete[-1].split(b',')[0][:10].decode(), 'D')
+
+def append_rows(path, rows):
+    """
+    Append rows to a CSV in a single write
+
+    If the write fails part way the file is truncated back to its previous size, so
+    readers never see a half-written row left behind.
+    """
+    data = ''.join(f"{date},{value!r}\n" for date, value in rows).encode()
+    with open(path, 'rb+') as f:
+        size = f.seek(0, os.SEEK_END)
+        if size:
+            f.seek(size - 1)
+            if f.read(1) != b'\n':
+                data = b'\n' + data
+        try:
+            f.seek(size)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.truncate(size)
+            raise
+
+def refresh(series, source=None, data_dir=DATA_DIR):
+    """
+    Fetch and append rows newer than the last stored date, then update the binary cache
+
+    A series with no CSV yet is only created once the source returns rows, so an
+    empty fetch never leaves a header-only file for load_ticker to trip over.
+
+    Returns:
+        Number of rows appended
+    """
+    source = source or default_source(series)
+    path = series_path(series, data_dir)
+    last = last_stored_date(path)
+    cached = read_series_cache(path)
+
+    rows = [(date[:10], float(value)) for date, value in source.fetch(series, last)
+            if value is not None and not np.isnan(value)
+            and (last is None or np.datetime64(date[:10], 'D') > last)]
+    if not rows and not os.path.exists(path):
+        return 0
+    if not os.path.exists(path):
+        with open(path, 'w') as f:
+            f.write(series_header(series) + "\n")
+    if rows:
+        append_rows(path, rows)
+
+    if rows or cached is None:
+        if cached is None:
+            dates, values = parse_series(path)
+        else:
+            dates = np.concatenate((cached[0], np.array([date for date, _ in rows], dtype='datetime64[D]')))
+            values = np.concatenate((cached[1], np.array([value for _, value in rows])))
+        write_series_cache(path, dates, values)
+
+    return len(rows)
+
+def main():
+    parser = argparse.ArgumentParser(description="Append new rows to the ticker and inflation CSVs")
+    parser.add_argument('series', nargs='*', default=["^BSESN", "^NSEI", INFLATION])
+    args = parser.parse_args()
+
+    for series in args.series:
+        appended = refresh(series)
+        if not os.path.exists(series_path(series)):
+            print(f"{series}: nothing fetched, no file written")
+        else:
+            print(f"{series}: {appended} new rows")
+
+if __name__ == "__main__":
+    main()
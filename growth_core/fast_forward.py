@@ -0,0 +1,214 @@
+"""
+Fast-forward of the perpetual corpus recurrence over whole generation cycles.
+
+Normalized by the cumulative withdrawal growth, y = corpus / (1 + withdrawal_increment/100)**year
+for a constant increment, every year of get_final_corpus_val is an increasing affine
+map of y. Once returns and withdrawals are steady (from india_maturity_yr, the last
+change of any schedule and withdrawal_start_yr on) the maps
+repeat every lcm(10, new_generation_time) years, so one cycle composes into a single
+AffineMap and k cycles are its k-th power by repeated squaring. 1000 or 1,000,000
+years cost O(log n) compositions plus one cycle of yearly maps.
+
+Depletion is still found exactly: each offset within the cycle moves monotonically
+from one cycle to the next, so the first depleting cycle is a binary search.
+Results match get_final_corpus_val up to floating-point rounding. A power that
+overflows (a 1,000,000-year horizon easily does) goes to +inf or -inf by which side
+of the cycle's fixed point it starts on, where the yearly loop would overflow or deplete.
+"""
+from math import gcd, isfinite
+
+from growth_core.schedules import PerpetualYears, schedule_end
+
+class AffineMap:
+    """y -> slope * y + offset"""
+
+    __slots__ = ('slope', 'offset')
+
+    def __init__(self, slope=1.0, offset=0.0):
+        self.slope = slope
+        self.offset = offset
+
+    def __call__(self, y):
+        return self.slope * y + self.offset
+
+    def then(self, other):
+        """Apply self, then other"""
+        return AffineMap(other.slope * self.slope, other.slope * self.offset + other.offset)
+
+    def power(self, n):
+        """self applied n times, by repeated squaring"""
+        result = AffineMap()
+        base = self
+        while n:
+            if n & 1:
+                result = result.then(base)
+            n >>= 1
+            if n:
+                base = base.then(base)
+            if not (isfinite(base.slope) and isfinite(base.offset)
+                    and isfinite(result.slope) and isfinite(result.offset)):
+                # Only an expanding map overflows, and the remaining squarings only expand it further
+                return _Divergent(self.offset / (1 - self.slope))
+        return result
+
+    def __repr__(self):
+        return f"AffineMap({self.slope!r}, {self.offset!r})"
+
+class _Divergent(AffineMap):
+    """
+    Limit of an expanding map's powers once they overflow
+
+    slope * y + offset would be inf - inf; every y but the fixed point runs off to
+    +inf or -inf, and the side of the fixed point it starts on says which.
+    """
+
+    __slots__ = ()
+
+    def __init__(self, fixed_point):
+        super().__init__(float('inf'), fixed_point)
+
+    def __call__(self, y):
+        if y == self.offset:
+            return y
+        return float('inf') if y > self.offset else float('-inf')
+
+def _year_maps(first_year, count, plan, annual_withdrawal, decadal_withdrawal, withdrawal_tax, new_generation_time,
+               kids, withdrawal_start_yr):
+    """Normalized yearly maps for years first_year .. first_year + count - 1"""
+    maps = []
+    for year in range(first_year, first_year + count):
+        # Past the compiled years every factor holds its steady value
+        i = min(year, plan.years) - 1
+        growth = plan.return_factor[i] * plan.fee_factor[i] / plan.inflation_factor[i]
+        scale = 1 + plan.series['withdrawal_increment'][i] / 100
+
+        # Withdrawals in year n are the year-1 amounts grown by the increments of years
+        # 1 .. n-1, so normalized by the level after year n they are a fixed amount / scale
+        withdrawal = 0.0
+        if year >= withdrawal_start_yr:
+            withdrawal = annual_withdrawal * (1 + withdrawal_tax / 100)
+            if year % 10 == 0:
+                withdrawal += decadal_withdrawal * (1 + withdrawal_tax / 100)
+        split = kids if year % new_generation_time == 0 else 1
+        maps.append(AffineMap(growth / scale / split, -withdrawal / scale / split))
+    return maps
+
+class _WithdrawalLevel:
+    """Cumulative withdrawal growth after each year, which y is normalized by"""
+
+    def __init__(self, plan):
+        increments = plan.series['withdrawal_increment']
+        self.steady_scale = 1 + increments[-1] / 100 if increments else 1.0
+        self.constant = len(set(increments)) <= 1
+        self.levels = [1.0]
+        for increment in increments:
+            self.levels.append(self.levels[-1] * (1 + increment / 100))
+
+    def corpus(self, y, year):
+        try:
+            if self.constant:
+                return y * self.steady_scale ** year
+            known = min(year, len(self.levels) - 1)
+            return y * self.levels[known] * self.steady_scale ** (year - known)
+        except OverflowError:
+            return float('inf') if y > 0 else float('-inf')
+
+def fast_final_corpus_val(amt, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax, annual_return, inflation, years, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr, mature_returns, mature_inflation, history=False, schedules=None):
+    """
+    get_final_corpus_val in O(log years) cycle compositions
+
+    Returns:
+        (final_value, corpus_history): like get_final_corpus_val, the final value is the
+        first non-positive corpus if it depletes; corpus_history is built only if
+        history=True, otherwise None
+    """
+    period = 10 * new_generation_time // gcd(10, new_generation_time)
+    # Factors only need compiling until every schedule is steady, plus one cycle
+    ends = [schedule_end(spec) for spec in (schedules or {}).values()]
+    horizon = min(years, max(india_maturity_yr, withdrawal_start_yr, 1, *ends) + period)
+    plan = PerpetualYears(horizon, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                          annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                          india_maturity_yr, mature_returns, mature_inflation, schedules)
+    params = dict(plan=plan, annual_withdrawal=annual_withdrawal, decadal_withdrawal=decadal_withdrawal,
+                  withdrawal_tax=withdrawal_tax, new_generation_time=new_generation_time, kids=kids,
+                  withdrawal_start_yr=withdrawal_start_yr)
+    level = _WithdrawalLevel(plan)
+    steady_from = max(plan.steady_year, withdrawal_start_yr, 1)
+
+    # Years before the steady state, one map each
+    lead = min(steady_from - 1, years)
+    y = amt
+    year = 0
+    for step in _year_maps(1, lead, **params):
+        y = step(y)
+        year += 1
+        if y <= 0:
+            return _finish(amt, y, year, level, history, params)
+    if year == years:
+        return _finish(amt, y, year, level, history, params)
+
+    # One steady cycle: prefix[r] maps the cycle start to r years in
+    prefix = [AffineMap()]
+    for step in _year_maps(year + 1, period, **params):
+        prefix.append(prefix[-1].then(step))
+    cycle = prefix[-1]
+    cycles, remainder = divmod(years - year, period)
+
+    def depleted_in(start_y, length):
+        """First offset 1..length in a cycle starting at start_y whose corpus is <= 0"""
+        if not isfinite(start_y):
+            # An overflowed start: -inf is depleted from the first year on, +inf never is
+            return 1 if start_y < 0 else None
+        for r in range(1, length + 1):
+            if prefix[r](start_y) <= 0:
+                return r
+        return None
+
+    # Every offset moves the same direction from cycle to cycle (slopes are positive)
+    first_cycle_depletes = depleted_in(y, period if cycles else remainder)
+    if first_cycle_depletes is not None:
+        end = year + first_cycle_depletes
+        return _finish(amt, prefix[first_cycle_depletes](y), end, level, history, params)
+
+    if cycles and cycle(y) < y:
+        # Decreasing, so a depleted offset stays depleted in later cycles:
+        # binary search for the first full cycle with one, then check the partial cycle
+        def depleted_in_cycle(k, length=period):
+            start_y = cycle.power(k)(y)
+            return start_y, depleted_in(start_y, length)
+
+        found = None
+        if cycles > 1 and depleted_in_cycle(cycles - 1)[1] is not None:
+            lo, hi = 0, cycles - 1
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                if depleted_in_cycle(mid)[1] is not None:
+                    hi = mid
+                else:
+                    lo = mid
+            found = hi, depleted_in_cycle(hi)
+        elif remainder:
+            start_y, r = depleted_in_cycle(cycles, remainder)
+            if r is not None:
+                found = cycles, (start_y, r)
+
+        if found is not None:
+            k, (start_y, r) = found
+            return _finish(amt, prefix[r](start_y), year + k * period + r, level, history, params)
+
+    final_y = prefix[remainder](cycle.power(cycles)(y))
+    return _finish(amt, final_y, years, level, history, params)
+
+def _finish(amt, y, end_year, level, history, params):
+    final = level.corpus(y, end_year)
+    if not history:
+        return final, None
+
+    # History is inherently one value per year; rebuild it from the yearly maps
+    corpus_history = [amt]
+    y = amt
+    for year, step in enumerate(_year_maps(1, end_year, **params), start=1):
+        y = step(y)
+        corpus_history.append(level.corpus(y, year))
+    corpus_history[-1] = final
+    return final, corpus_history
@@ -0,0 +1,277 @@
+"""
+Fee drag: the same plan under several fund and advice fee structures.
+
+get_final_corpus_val charges `fees` as one constant fraction of the corpus each year.
+A FeeStructure splits that into what an investor actually pays:
+    ter              expense ratio (%/yr) taken out of the NAV, e.g. direct vs regular plan
+    exit_load        % of the redeemed amount for withdrawals in the first exit_load_years,
+                     grossed up so the net withdrawal is unchanged
+    advisory_slabs   [[aum_start, rate], ...] fee on assets under advice, marginal by slab
+                     like income tax (aum_start in crores of today's money, rate in %/yr)
+
+Every structure is run against the same return paths in one batch: arrays are
+(structures x paths) and each year is one vectorized step. The required corpus is
+bisected for all of them together, and each final value starts from the baseline
+structure's required corpus, so the deltas read as "what this fee choice costs".
+
+Each year is get_final_corpus_val's: growth, TER, deflation, advisory fee on the real
+corpus, tax-inclusive withdrawals (with any exit load), generation split. With only a
+TER and the plan's own returns, the required corpus is find_req_amt with fees = ter.
+
+Usage:
+    python -m growth_core.fees direct regular regular_advised
+    python -m growth_core.fees direct regular --paths 500 --years 100 --amt 20 --seed 1
+"""
+import argparse
+import warnings
+
+import numpy as np
+
+from growth_core.corpus_table import SOLVER_UPPER_BOUND, YEARS
+from growth_core.frontier import DEFAULT_PERPETUAL_PARAMS
+from growth_core.schedules import PerpetualYears
+
+# Fee structures the CLI knows by name
+FEE_PRESETS = {
+    'direct': {'ter': 0.5},
+    'regular': {'ter': 1.5},
+    'regular_exit_load': {'ter': 1.5, 'exit_load': 1.0, 'exit_load_years': 1},
+    'direct_advised': {'ter': 0.5, 'advisory_slabs': [[0, 1.0], [5, 0.75], [25, 0.5]]},
+    'regular_advised': {'ter': 1.5, 'advisory_slabs': [[0, 1.0], [5, 0.75], [25, 0.5]]},
+}
+
+class FeeStructure:
+    def __init__(self, name, ter=0.0, exit_load=0.0, exit_load_years=1, advisory_slabs=()):
+        slabs = sorted(advisory_slabs)
+        if slabs and slabs[0][0] != 0:
+            raise ValueError(f"Advisory slabs of {name!r} must start at 0")
+
+        self.name = name
+        self.ter = ter
+        self.exit_load = exit_load
+        self.exit_load_years = exit_load_years
+        self.slab_starts = [float(start) for start, _ in slabs]
+        self.slab_rates = [float(rate) for _, rate in slabs]
+
+    def __repr__(self):
+        return f"FeeStructure({self.name!r}, ter={self.ter}, exit_load={self.exit_load})"
+
+def as_fee_structures(structures):
+    """FeeStructure objects from instances, preset names or (name, spec dict) pairs"""
+    result = []
+    for structure in structures:
+        if isinstance(structure, FeeStructure):
+            result.append(structure)
+        elif isinstance(structure, str):
+            if structure not in FEE_PRESETS:
+                raise KeyError(f"Unknown fee preset {structure!r}, available: {', '.join(FEE_PRESETS)}")
+            result.append(FeeStructure(structure, **FEE_PRESETS[structure]))
+        else:
+            name, spec = structure
+            result.append(FeeStructure(name, **spec))
+    return result
+
+class _FeeArrays:
+    """Fee structures as columns (structures x 1) that broadcast over paths"""
+
+    def __init__(self, structures):
+        slabs = max((len(s.slab_starts) for s in structures), default=0) or 1
+        self.ter_factor = np.array([1 - s.ter / 100 for s in structures])[:, None]
+        self.exit_gross_up = np.array([1 / (1 - s.exit_load / 100) for s in structures])[:, None]
+        self.exit_load_years = np.array([s.exit_load_years for s in structures])[:, None]
+
+        # Padded slabs: unused ones start at infinity and charge nothing
+        self.slab_starts = np.full((len(structures), 1, slabs), np.inf)
+        self.slab_rates = np.zeros((len(structures), 1, slabs))
+        for k, s in enumerate(structures):
+            self.slab_starts[k, 0, :len(s.slab_starts)] = s.slab_starts
+            self.slab_rates[k, 0, :len(s.slab_rates)] = s.slab_rates
+        with np.errstate(invalid='ignore'):
+            widths = np.diff(self.slab_starts, axis=-1, append=np.inf)
+        self.slab_widths = np.where(np.isnan(widths), np.inf, widths)
+
+    def advisory_fee(self, aum):
+        """Slabbed fee on every corpus in aum (structures x paths); nothing on a depleted one"""
+        in_slab = np.clip(aum[..., None] - self.slab_starts, 0.0, self.slab_widths)
+        return np.sum(in_slab * self.slab_rates, axis=-1) / 100
+
+def plan_factors(params, years=YEARS, returns=None, inflation=None):
+    """
+    Per-year factors of the plan, shared by every fee structure
+
+    params are find_req_amt's; their `fees` are ignored (the structures replace them).
+    returns / inflation (paths x years, %) replace the plan's own, e.g. from
+    portfolio.bootstrap_paths or stress.historical_paths; without them there is one path.
+
+    Returns:
+        dict of 'return_factor', 'inflation_factor' (paths x years) and 'outflow', 'split'
+        (years,), outflow being the tax-inclusive annual plus decadal withdrawal
+    """
+    params = {**params, 'fees': 0.0}
+    schedules = {name: spec for name, spec in (params.pop('schedules', None) or {}).items() if name != 'fees'}
+    plan = PerpetualYears(years, **params, schedules=schedules)
+
+    return_factor = np.array(plan.return_factor)[None, :]
+    inflation_factor = np.array(plan.inflation_factor)[None, :]
+    if returns is not None:
+        return_factor = 1 + np.asarray(returns, dtype=float)[:, :years] / 100
+    if inflation is not None:
+        inflation_factor = 1 + np.asarray(inflation, dtype=float)[:, :years] / 100
+    return_factor, inflation_factor = np.broadcast_arrays(return_factor, inflation_factor)
+    if return_factor.shape[1] < years:
+        raise ValueError(f"Return paths cover {return_factor.shape[1]} years, {years} needed")
+
+    return {
+        'return_factor': return_factor,
+        'inflation_factor': inflation_factor,
+        'outflow': np.add(plan.annual_outflow, plan.decadal_outflow),
+        'split': np.array(plan.split, dtype=float),
+    }
+
+def simulate_fees(amt, structures, factors, years=None):
+    """
+    Corpus after `years` for every fee structure on every path
+
+    Args:
+        amt: starting corpus, scalar or broadcastable to (structures x paths)
+        structures: FeeStructure list (see as_fee_structures)
+        factors: output of plan_factors
+    Returns:
+        (final_values, fees_paid) arrays (structures x paths); fees_paid sums the TER,
+        advisory fee and exit load in today's money. A depleted corpus stays at 0.
+    """
+    fees = structures if isinstance(structures, _FeeArrays) else _FeeArrays(as_fee_structures(structures))
+    years = factors['return_factor'].shape[1] if years is None else years
+    paths = factors['return_factor'].shape[0]
+    amt = np.array(np.broadcast_to(amt, (len(fees.ter_factor), paths)), dtype=float)
+    fees_paid = np.zeros_like(amt)
+
+    with np.errstate(over='ignore', invalid='ignore'):
+        for year in range(1, years + 1):
+            inflation = factors['inflation_factor'][:, year - 1]
+            amt *= factors['return_factor'][:, year - 1]
+            fees_paid += amt * (1 - fees.ter_factor) / inflation
+            amt *= fees.ter_factor
+            amt /= inflation
+
+            advisory = fees.advisory_fee(amt)
+            amt -= advisory
+            fees_paid += advisory
+
+            outflow = factors['outflow'][year - 1]
+            if outflow:
+                grossed_up = np.where(year <= fees.exit_load_years, outflow * fees.exit_gross_up, outflow)
+                # Only a corpus that still has money pays the exit load
+                fees_paid += np.where(amt > 0, grossed_up - outflow, 0.0)
+                amt -= grossed_up
+            amt /= factors['split'][year - 1]
+            np.maximum(amt, 0.0, out=amt)
+    return amt, fees_paid
+
+def required_corpus(structures, factors, tolerance=1e-6, max_iter=1000):
+    """
+    Smallest corpus each fee structure needs to last on each path (structures x paths)
+
+    The find_req_amt condition, bisected for every (structure, path) at once: the
+    corpus after all the years must be back at the starting amount. inf where no corpus
+    below SOLVER_UPPER_BOUND is enough, like closed_form_required_corpus.
+    """
+    fees = _FeeArrays(as_fee_structures(structures))
+    shape = (len(fees.ter_factor), factors['return_factor'].shape[0])
+    low = np.zeros(shape)
+    high = np.full(shape, SOLVER_UPPER_BOUND)
+
+    for _ in range(max_iter):
+        if np.all(high - low <= tolerance):
+            break
+        mid = (low + high) / 2
+        final, _ = simulate_fees(mid, fees, factors)
+        enough = final > mid
+        high = np.where(enough, mid, high)
+        low = np.where(enough, low, mid)
+    # high only moves once some corpus below the bound is enough
+    return np.where(high < SOLVER_UPPER_BOUND, (low + high) / 2, np.inf)
+
+def fee_drag(structures, params=None, horizon=50, amt=None, returns=None, inflation=None, years=YEARS):
+    """
+    Required corpus and final value of every fee structure, against the first one
+
+    Final values run `horizon` years from amt, by default the baseline's required
+    corpus on the same path, so a cheaper structure ends above it and a dearer one
+    below. Give amt when the paths are too poor for any corpus to last `years`.
+
+    Returns:
+        dict with 'names' and (structures x paths) arrays 'required_corpus' (inf where
+        no corpus lasts), 'infeasible', 'final_value', 'fees_paid' and the deltas from
+        the baseline, 'required_corpus_delta' and 'final_value_delta'. Deltas are NaN
+        where either side has no required corpus, and so are the final values and fees
+        paid on paths where the baseline has none to start from.
+    """
+    structures = as_fee_structures(structures)
+    params = {**DEFAULT_PERPETUAL_PARAMS, **(params or {})}
+    factors = plan_factors(params, max(years, horizon), returns, inflation)
+
+    required = required_corpus(structures, {**factors, 'return_factor': factors['return_factor'][:, :years],
+                                            'inflation_factor': factors['inflation_factor'][:, :years]})
+    infeasible = ~np.isfinite(required)
+    with np.errstate(invalid='ignore'):
+        required_delta = np.where(infeasible | infeasible[:1], np.nan, required - required[:1])
+    if amt is None:
+        final, fees_paid = simulate_fees(np.where(infeasible[:1], 0.0, required[:1]), structures, factors, horizon)
+        final[:, infeasible[0]] = np.nan
+        fees_paid[:, infeasible[0]] = np.nan
+    else:
+        final, fees_paid = simulate_fees(amt, structures, factors, horizon)
+    return {
+        'names': [structure.name for structure in structures],
+        'required_corpus': required,
+        'infeasible': infeasible,
+        'required_corpus_delta': required_delta,
+        'final_value': final,
+        'final_value_delta': final - final[:1],
+        'fees_paid': fees_paid,
+    }
+
+def fee_drag_summary(result, percentiles=(5, 50, 95)):
+    """
+    Per structure percentiles of every fee_drag array over the paths where it is finite,
+    and 'infeasible_share', the fraction of paths where no corpus lasts
+    """
+    keys = [key for key in result if key not in ('names', 'infeasible')]
+    summary = {}
+    with warnings.catch_warnings():
+        # A structure with no feasible path has all-NaN deltas, summarized as NaN
+        warnings.simplefilter('ignore', RuntimeWarning)
+        for k, name in enumerate(result['names']):
+            finite = {key: np.where(np.isfinite(result[key][k]), result[key][k], np.nan) for key in keys}
+            row = {f"{key}_p{p}": float(np.nanpercentile(finite[key], p)) for key in keys for p in percentiles}
+            row['infeasible_share'] = float(np.mean(result['infeasible'][k]))
+            summary[name] = row
+    return summary
+
+def main():
+    from growth_core.portfolio import bootstrap_paths
+
+    parser = argparse.ArgumentParser(description="Required corpus and final value under several fee structures")
+    parser.add_argument('structures', nargs='*', default=list(FEE_PRESETS), help=', '.join(FEE_PRESETS))
+    parser.add_argument('--horizon', type=int, default=50, help="Years for the final value")
+    parser.add_argument('--amt', type=float, default=None, help="Starting corpus for the final value (crores)")
+    parser.add_argument('--years', type=int, default=YEARS, help="Years the required corpus has to last")
+    parser.add_argument('--paths', type=int, default=0, help="Bootstrapped nifty paths (0 = the plan's own returns)")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    returns = inflation = None
+    if args.paths:
+        paths = bootstrap_paths(['nifty'], args.paths, max(args.years, args.horizon), seed=args.seed)
+        returns, inflation = paths['returns'][:, :, 0], paths['inflation']
+    result = fee_drag(args.structures, horizon=args.horizon, amt=args.amt, returns=returns, inflation=inflation,
+                      years=args.years)
+
+    for name, row in fee_drag_summary(result, percentiles=(50,)).items():
+        print(f"{name:20s} required corpus {row['required_corpus_p50']:8.2f} ({row['required_corpus_delta_p50']:+.2f})  "
+              f"{args.horizon}y value {row['final_value_p50']:10.2f} ({row['final_value_delta_p50']:+.2f})  "
+              f"fees paid {row['fees_paid_p50']:8.2f}  infeasible {row['infeasible_share']:.0%}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+"""
+Efficient frontier and allocation search over the historical index and NAV series.
+
+AssetMoments computes annualized mean returns and the covariance matrix once, from
+monthly log returns over the months all historical assets share (synthetic assets
+from portfolio.SYNTHETIC_ASSETS are uncorrelated with the rest). Candidate weights are
+then scored in large batches with a couple of einsums. The efficient points are
+thinned to at most max_points spread over the volatility range (two assets on one
+line would otherwise keep nearly every candidate), and only those are run through the
+planning engines: the required corpus from corpus_table's vectorized closed form (one
+batch for every point) or the sustainable withdrawal from calculate_growth, plus Monte
+Carlo safety metrics from simulate_portfolios.
+
+A plan no corpus can sustain (G <= 1, where find_req_amt stops at its bisection
+bound) is reported as infeasible, with required_corpus None, rather than as a corpus.
+
+Usage:
+    python -m growth_core.frontier nifty kotak_equity_opportunities debt --objective min_required_corpus
+"""
+import argparse
+
+import numpy as np
+
+from growth_core.corpus_table import closed_form_required_corpus
+from growth_core.growth import find_sustainable_withdrawal
+from growth_core.history import DATA_DIR
+from growth_core.portfolio import (
+    HISTORICAL_ASSETS, SYNTHETIC_ASSETS, bootstrap_paths, common_monthly_closes, simulate_portfolios,
+)
+from growth_core.rng import RandomStreams
+
+OBJECTIVES = ('min_required_corpus', 'max_sustainable_withdrawal')
+
+# dashboard2.py defaults
+DEFAULT_PERPETUAL_PARAMS = {
+    'annual_withdrawal': 0.3, 'decadal_withdrawal': 6.0, 'withdrawal_increment': 0.0, 'withdrawal_tax': 15.0,
+    'annual_return': 14.0, 'inflation': 7.0, 'fees': 1.0, 'new_generation_time': 27, 'kids': 2,
+    'withdrawal_start_yr': 0, 'india_maturity_yr': 50, 'mature_returns': 10.0, 'mature_inflation': 5.0,
+}
+
+# dashboard.py defaults
+DEFAULT_GROWTH_PARAMS = {
+    'nominal_return': 14.0, 'inflation': 7.0, 'withdrawal_increase': 0.0, 'initial_withdrawal': 30,
+    'projection_years': 1000, 'initial_portfolio': 36.0, 'big_withdrawal_time': 10, 'big_withdrawal_amt': 6,
+    'big_withdrawal_start_yr': 0, 'withdrawal_start_yr': 0, 'generational_halving': True, 'halving_years': 25,
+    'inheritance_tax': 0.0, 'tax_on_withdrawals': 15.0,
+}
+
+class AssetMoments:
+    """Annualized mean log returns and covariance (fractions) of a list of assets"""
+
+    def __init__(self, assets, mean, cov):
+        self.assets = list(assets)
+        self.mean = np.asarray(mean, dtype=float)
+        self.cov = np.asarray(cov, dtype=float)
+
+    @classmethod
+    def from_history(cls, assets, synthetic=None, data_dir=DATA_DIR):
+        synthetic = SYNTHETIC_ASSETS if synthetic is None else synthetic
+        historical = [name for name in assets if name in HISTORICAL_ASSETS]
+        mean = np.zeros(len(assets))
+        cov = np.zeros((len(assets), len(assets)))
+
+        if historical:
+            _, closes = common_monthly_closes(historical, data_dir)
+            monthly = np.diff(np.log(closes), axis=0)
+            idx = [assets.index(name) for name in historical]
+            mean[idx] = monthly.mean(axis=0) * 12
+            cov[np.ix_(idx, idx)] = np.atleast_2d(np.cov(monthly, rowvar=False)) * 12
+
+        for k, name in enumerate(assets):
+            if name not in HISTORICAL_ASSETS:
+                arithmetic, std = (value / 100 for value in synthetic[name])
+                variance = np.log1p((std / (1 + arithmetic)) ** 2)
+                mean[k] = np.log1p(arithmetic) - variance / 2
+                cov[k, k] = variance
+        return cls(assets, mean, cov)
+
+    def portfolio_stats(self, weights):
+        """
+        Expected annual returns of weighted portfolios (batched over rows of weights)
+
+        Returns:
+            (geometric, arithmetic, volatility) arrays, returns as annual fractions
+        """
+        weights = np.atleast_2d(weights)
+        log_mean = weights @ self.mean
+        variance = np.einsum('nk,kl,nl->n', weights, self.cov, weights)
+        return np.expm1(log_mean), np.expm1(log_mean + variance / 2), np.sqrt(variance)
+
+def candidate_weights(num_assets, count, seed=None, max_weight=1.0):
+    """Single-asset corners plus count random allocations (uniform on the simplex), rows summing to 1"""
+    rng = RandomStreams(seed).stream('frontier', num_assets, count)
+    weights = np.vstack([np.eye(num_assets), rng.dirichlet(np.ones(num_assets), size=count)])
+    return weights[weights.max(axis=1) <= max_weight + 1e-12]
+
+def efficient_indices(expected, volatility):
+    """Indices of points with no other point at lower or equal risk and higher return, by risk"""
+    order = np.lexsort((-expected, volatility))
+    best_so_far = np.maximum.accumulate(expected[order])
+    keep = np.concatenate(([True], expected[order][1:] > best_so_far[:-1]))
+    return order[keep]
+
+def thin_frontier(frontier, volatility, max_points):
+    """
+    At most max_points of a frontier ordered by risk, one per equal-width volatility bin
+
+    Along the frontier return rises with risk, so each bin keeps its last point; the
+    lowest-risk point is always kept.
+    """
+    if len(frontier) <= max_points:
+        return frontier
+    risk = volatility[frontier]
+    edges = np.linspace(risk[0], risk[-1], max_points + 1)
+    bins = np.clip(np.searchsorted(edges, risk, side='right') - 1, 0, max_points - 1)
+    last_in_bin = np.flatnonzero(np.append(bins[1:] != bins[:-1], True))
+    return frontier[np.union1d(0, last_in_bin)]
+
+def efficient_frontier(assets, objective='min_required_corpus', candidates=100_000, seed=None, max_weight=1.0,
+                       perpetual_params=None, growth_params=None, safety_paths=2000, safety_years=50,
+                       max_points=200, data_dir=DATA_DIR):
+    """
+    Frontier allocations with their planning and withdrawal-safety metrics
+
+    Each frontier portfolio's expected geometric return replaces the return
+    assumption of the chosen engine (annual_return, with mature_returns shifted by the
+    same amount, or nominal_return). The safety metrics simulate the dashboard.py
+    annual withdrawal (without the big withdrawals) on bootstrapped paths over
+    safety_years.
+
+    Returns:
+        list of dicts, lowest risk first, and the index of the best feasible point for
+        the objective (None if there is none)
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}, expected one of {OBJECTIVES}")
+    perpetual_params = {**DEFAULT_PERPETUAL_PARAMS, **(perpetual_params or {})}
+    growth_params = {**DEFAULT_GROWTH_PARAMS, **(growth_params or {})}
+
+    moments = AssetMoments.from_history(assets, data_dir=data_dir)
+    weights = candidate_weights(len(assets), candidates, seed, max_weight)
+    geometric, arithmetic, volatility = moments.portfolio_stats(weights)
+    frontier = thin_frontier(efficient_indices(geometric, volatility), volatility, max_points)
+
+    paths = bootstrap_paths(assets, safety_paths, safety_years, seed=seed, data_dir=data_dir)
+    safety = simulate_portfolios(
+        weights[frontier], paths, growth_params['initial_portfolio'], growth_params['initial_withdrawal'] / 100,
+        withdrawal_increase=growth_params['withdrawal_increase'],
+        tax_on_withdrawals=growth_params['tax_on_withdrawals'],
+    )
+
+    if objective == 'min_required_corpus':
+        # Each point's return replaces annual_return, with mature_returns shifted by the same amount
+        shift = geometric[frontier] * 100 - perpetual_params['annual_return']
+        required = closed_form_required_corpus(**{
+            **perpetual_params, 'annual_return': perpetual_params['annual_return'] + shift,
+            'mature_returns': perpetual_params['mature_returns'] + shift,
+        })
+
+    points = []
+    for row, idx in enumerate(frontier):
+        expected_return = geometric[idx] * 100
+        point = {
+            'weights': dict(zip(assets, weights[idx].round(4).tolist())),
+            'expected_return': float(expected_return),
+            'arithmetic_return': float(arithmetic[idx] * 100),
+            'volatility': float(volatility[idx] * 100),
+            'success_rate': float((safety['depletion_years'][row] == 0).mean()),
+            'p5_final_value': float(np.percentile(safety['final_values'][row], 5)),
+        }
+        if objective == 'min_required_corpus':
+            point['feasible'] = bool(np.isfinite(required[row]))
+            point['required_corpus'] = float(required[row]) if point['feasible'] else None
+        else:
+            point['max_sustainable_withdrawal'] = find_sustainable_withdrawal(
+                {**growth_params, 'nominal_return': expected_return})
+        points.append(point)
+
+    if objective == 'min_required_corpus':
+        best = int(np.argmin(required)) if np.isfinite(required).any() else None
+    else:
+        best = int(np.argmax([point['max_sustainable_withdrawal'] for point in points]))
+    return points, best
+
+def main():
+    parser = argparse.ArgumentParser(description="Efficient frontier over historical and synthetic assets")
+    parser.add_argument('assets', nargs='+', help=f"any of {', '.join([*HISTORICAL_ASSETS, *SYNTHETIC_ASSETS])}")
+    parser.add_argument('--objective', choices=OBJECTIVES, default='min_required_corpus')
+    parser.add_argument('--candidates', type=int, default=100_000)
+    parser.add_argument('--max-weight', type=float, default=1.0)
+    parser.add_argument('--max-points', type=int, default=200, help="Frontier points to evaluate")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    points, best = efficient_frontier(args.assets, args.objective, args.candidates, args.seed, args.max_weight,
+                                      max_points=args.max_points)
+    metric = 'required_corpus' if args.objective == 'min_required_corpus' else 'max_sustainable_withdrawal'
+    for i, point in enumerate(points):
+        marker = '*' if i == best else ' '
+        weights = ' '.join(f"{name}={weight:.0%}" for name, weight in point['weights'].items())
+        value = f"{point[metric]:10.2f}" if point[metric] is not None else f"{'infeasible':>10s}"
+        print(f"{marker} return {point['expected_return']:6.2f}%  vol {point['volatility']:6.2f}%  "
+              f"{metric} {value}  success {point['success_rate']:.1%}  {weights}")
+    if best is None:
+        print("No allocation on the frontier has a sustainable corpus")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Year-by-year portfolio projection used by the investment growth calculator dashboard"""
+
+from datetime import datetime
+
+from growth_core.profiling import profiled
+from growth_core.schedules import growth_series
+
+@profiled(years_from_result=len)
+def calculate_growth(params):
+    """
+    Calculate portfolio growth based on provided parameters
+    
+    Args:
+        params: Dictionary containing all calculation parameters
+    
+    Returns:
+        List of yearly projection rows (one dict per year, pass to pd.DataFrame for display)
+    """
+    # Extract parameters
+    withdrawal_lakhs = params['initial_withdrawal']
+    real_portfolio_value = params['initial_portfolio']
+    projection_years = params['projection_years']
+    big_withdrawal_time = params['big_withdrawal_time']
+    big_withdrawal_amt = params['big_withdrawal_amt']
+    big_withdrawal_start_yr = params['big_withdrawal_start_yr']
+    withdrawal_start_yr = params['withdrawal_start_yr']
+    generational_halving = params['generational_halving']
+    halving_years = params['halving_years']
+    inheritance_tax = params['inheritance_tax']
+    tax_on_withdrawals = params['tax_on_withdrawals']
+    
+    # Real growth and withdrawal growth of every year (constant, or from params['schedules'])
+    growth_factor, withdrawal_factor = growth_series(params, projection_years)
+    
+    # Initialize data structure
+    annual_withdrawal = withdrawal_lakhs / 100  # Convert lakhs to crores
+    big_withdrawal = big_withdrawal_amt
+    
+    data = [{
+        'year': 0,
+        'year_display': datetime.now().year,
+        'real_portfolio_value': real_portfolio_value,
+        'annual_withdrawal': 0,
+        'big_withdrawal': 0,
+        'total_withdrawal': 0,
+        'cumulative_withdrawals': 0,
+        'withdrawal_events': '',
+        'withdrawal_tax_paid': 0,
+        'cumulative_withdrawal_tax_paid': 0,
+        'inheritance_tax_paid': 0,
+        'cumulative_inheritance_tax_paid': 0,
+        'total_tax_paid': 0,
+        'cumulative_total_tax_paid': 0,
+    }]
+    
+    cumulative_withdrawals = 0
+    cumulative_withdrawal_tax_paid = 0
+    cumulative_inheritance_tax_paid = 0
+    cumulative_total_tax_paid = 0
+    
+    for year in range(1, projection_years + 1):
+        current_year = datetime.now().year + year
+        
+        # Apply return for this period
+        real_portfolio_value = max(0, real_portfolio_value * growth_factor[year - 1])
+        
+        # Update withdrawal amounts with growth rate
+        annual_withdrawal *= withdrawal_factor[year - 1]
+        big_withdrawal *= withdrawal_factor[year - 1]
+
+        # Track withdrawals
+        withdrawal_amt = 0
+        events = []
+        
+        annual_withdrawal_tax = 0
+        big_withdrawal_tax = 0
+        # Regular annual withdrawal
+        annual_withdrawal_done = 0 
+        if year >= withdrawal_start_yr:
+            withdrawal_amt += annual_withdrawal
+            annual_withdrawal_done = annual_withdrawal
+            annual_withdrawal_tax = annual_withdrawal * tax_on_withdrawals / 100
+            events.append("Annual")
+        
+        # Periodic big withdrawal
+        big_withdrawal_done = 0
+        if (year % big_withdrawal_time == 0 and 
+            year >= big_withdrawal_time and 
+            year >= big_withdrawal_start_yr and 
+            year >= withdrawal_start_yr):
+            withdrawal_amt += big_withdrawal
+            big_withdrawal_done = big_withdrawal
+            big_withdrawal_tax = big_withdrawal * tax_on_withdrawals / 100
+            events.append("Big")
+        
+        # Apply withdrawals
+        real_portfolio_value -= (withdrawal_amt + annual_withdrawal_tax + big_withdrawal_tax) 
+        
+        # Track cumulative withdrawals
+        cumulative_withdrawals += withdrawal_amt
+        
+        # Apply generational wealth halving if enabled
+        inheritance_tax_paid = 0
+        if generational_halving and year > 0 and year % halving_years == 0:
+            real_portfolio_value /= 2
+            inheritance_tax_paid = real_portfolio_value * inheritance_tax / 100
+            real_portfolio_value -= inheritance_tax_paid
+            events.append("Generational Halving")
+
+        # Calculate cumulative tax paid
+        withdrawal_tax_paid = annual_withdrawal_tax + big_withdrawal_tax
+        total_tax_paid = withdrawal_tax_paid + inheritance_tax_paid
+        cumulative_withdrawal_tax_paid += withdrawal_tax_paid
+        cumulative_inheritance_tax_paid += inheritance_tax_paid
+        cumulative_total_tax_paid += total_tax_paid
+        
+        # Add data for this year
+        data.append({
+            'year': year,
+            'year_display': current_year,
+            'real_portfolio_value': max(0, real_portfolio_value),
+            'annual_withdrawal': annual_withdrawal_done,
+            'big_withdrawal': big_withdrawal_done,
+            'total_withdrawal': withdrawal_amt * 100,  # Convert to lakhs
+            'cumulative_withdrawals': cumulative_withdrawals,
+            'withdrawal_events': ", ".join(events),
+            'withdrawal_tax_paid': withdrawal_tax_paid,
+            'cumulative_withdrawal_tax_paid': cumulative_withdrawal_tax_paid,
+            'inheritance_tax_paid': inheritance_tax_paid,
+            'cumulative_inheritance_tax_paid': cumulative_inheritance_tax_paid,
+            'total_tax_paid': total_tax_paid,
+            'cumulative_total_tax_paid': cumulative_total_tax_paid,
+        })
+        
+        # Break if portfolio is depleted
+        if real_portfolio_value <= 0:
+            break
+            
+    return data
+
+def linspace(start, stop, num):
+    """Evenly spaced floats from start to stop inclusive (np.linspace without importing NumPy)"""
+    if num == 1:
+        return [float(start)]
+    step = (stop - start) / (num - 1)
+    return [start + step * i for i in range(num - 1)] + [float(stop)]
+
+def find_sustainable_withdrawal(params, rows=None):
+    """
+    Search for a sustainable initial withdrawal (lakhs/year) for the given parameters
+
+    If the portfolio depletes, returns the smallest tested withdrawal that survives
+    the projection (0 if none does). Otherwise returns the largest tested withdrawal,
+    up to 10x the current one, that still survives.
+    """
+    if rows is None:
+        rows = calculate_growth(params)
+    initial_withdrawal = params['initial_withdrawal']
+
+    if rows[-1]['real_portfolio_value'] <= 0:
+        test_rates = linspace(0.1, initial_withdrawal, 20)
+
+        for test_rate in test_rates:
+            test_params = params.copy()
+            test_params['initial_withdrawal'] = test_rate
+            test_rows = calculate_growth(test_params)
+            if test_rows[-1]['real_portfolio_value'] > 0:
+                return test_rate
+        return 0
+
+    max_withdrawal = initial_withdrawal
+    test_rates = linspace(initial_withdrawal, initial_withdrawal*10, 20)
+
+    for test_rate in test_rates:
+        test_params = params.copy()
+        test_params['initial_withdrawal'] = test_rate
+        test_rows = calculate_growth(test_params)
+        if test_rows[-1]['real_portfolio_value'] > 0:
+            max_withdrawal = test_rate
+        else:
+            break
+    return max_withdrawal
+
+def depletion_year(rows):
+    """First projection year in which the portfolio is depleted, or None if it never is"""
+    for row in rows:
+        if row['real_portfolio_value'] <= 0:
+            return row['year']
+    return None
@@ -0,0 +1,190 @@
+"""
+Historical index and inflation analysis on the CSVs shipped with the repo.
+
+NumPy-only counterpart of historical_data_analysis.py: series are loaded into
+(datetime64[D] dates, float values) arrays, and every start date of a rolling
+window is evaluated at once instead of sampling random dates one at a time.
+"""
+import csv
+import os
+
+import numpy as np
+
+DATA_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def cache_path(path):
+    """Binary cache kept next to a series CSV, e.g. ^BSESN_data.csv -> ^BSESN_data.npz"""
+    return os.path.splitext(path)[0] + '.npz'
+
+def write_series_cache(path, dates, values):
+    """Save parsed arrays for a CSV, stamped with the CSV's size and mtime"""
+    stat = os.stat(path)
+    tmp_path = cache_path(path) + '.tmp.npz'
+    np.savez(tmp_path, dates=dates, values=values, csv_size=stat.st_size, csv_mtime=stat.st_mtime_ns)
+    os.replace(tmp_path, cache_path(path))
+
+def read_series_cache(path):
+    """Cached (dates, values) if the cache matches the CSV on disk, else None"""
+    try:
+        stat = os.stat(path)
+        with np.load(cache_path(path)) as cache:
+            if cache['csv_size'] != stat.st_size or cache['csv_mtime'] != stat.st_mtime_ns:
+                return None
+            return cache['dates'], cache['values']
+    except (OSError, KeyError, ValueError):
+        return None
+
+def load_series(path):
+    """Load a two-column date,value CSV (ticker or inflation data) as (dates, values) arrays"""
+    cached = read_series_cache(path)
+    if cached is not None:
+        return cached
+    return parse_series(path)
+
+def parse_series(path):
+    """Parse the CSV itself, ignoring any binary cache"""
+    dates = []
+    values = []
+    with open(path, newline='') as f:
+        reader = csv.reader(f)
+        next(reader)
+        for row in reader:
+            if len(row) < 2 or not row[1]:
+                continue
+            dates.append(row[0][:10])
+            values.append(float(row[1]))
+    return np.array(dates, dtype='datetime64[D]'), np.array(values)
+
+def load_amfi_nav(path):
+    """Load an AMFI NAV history export (Nav Date as dd-Mon-YYYY, Nav) as (dates, values) arrays"""
+    from datetime import datetime
+
+    dates = []
+    values = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            if not row.get('Nav'):
+                continue
+            dates.append(datetime.strptime(row['Nav Date'], '%d-%b-%Y').date())
+            values.append(float(row['Nav']))
+    order = np.argsort(np.array(dates, dtype='datetime64[D]'), kind='stable')
+    return np.array(dates, dtype='datetime64[D]')[order], np.array(values)[order]
+
+def load_nav_json(path):
+    """Load a [{navDate, navValue}, ...] JSON NAV history as (dates, values) arrays"""
+    import json
+
+    with open(path) as f:
+        rows = json.load(f)
+    dates = np.array([row['navDate'][:10] for row in rows], dtype='datetime64[D]')
+    values = np.array([float(row['navValue']) for row in rows])
+    order = np.argsort(dates, kind='stable')
+    return dates[order], values[order]
+
+def available_tickers(data_dir=DATA_DIR):
+    """Tickers with a <ticker>_data.csv in data_dir"""
+    return sorted(name[:-len('_data.csv')] for name in os.listdir(data_dir)
+                  if name.endswith('_data.csv') and name != 'inflation_data.csv')
+
+def load_ticker(ticker, data_dir=DATA_DIR):
+    return load_series(os.path.join(data_dir, f"{ticker}_data.csv"))
+
+def load_inflation(data_dir=DATA_DIR):
+    return load_series(os.path.join(data_dir, "inflation_data.csv"))
+
+def nearest_index(dates, targets):
+    """Index of the closest available date in sorted `dates` for each target date"""
+    targets = np.asarray(targets, dtype='datetime64[D]')
+    right = np.clip(np.searchsorted(dates, targets), 1, len(dates) - 1)
+    left = right - 1
+    pick_left = (targets - dates[left]) <= (dates[right] - targets)
+    return np.where(pick_left, left, right)
+
+def rolling_annual_returns(dates, values, num_years):
+    """
+    Annualized return for every start date whose num_years window fits in the data
+
+    Mirrors calculate_annual_return: the end date is start + num_years * 365 days,
+    snapped to the closest available date, and the return is annualized over the
+    actual number of days between the two snapped dates.
+
+    Returns:
+        (start_idx, end_idx, annual_returns) arrays
+    """
+    window = np.timedelta64(num_years * 365, 'D')
+    start_idx = np.flatnonzero(dates + window <= dates[-1])
+    end_idx = nearest_index(dates, dates[start_idx] + window)
+
+    num_yrs = (dates[end_idx] - dates[start_idx]).astype(np.float64) / 365
+    annual_returns = (values[end_idx] / values[start_idx]) ** (1 / num_yrs) - 1
+    return start_idx, end_idx, annual_returns
+
+def window_annual_returns(dates, values, start_dates, num_years):
+    """calculate_annual_return for an array of arbitrary start dates"""
+    start_dates = np.asarray(start_dates, dtype='datetime64[D]')
+    start_idx = nearest_index(dates, start_dates)
+    end_idx = nearest_index(dates, start_dates + np.timedelta64(num_years * 365, 'D'))
+
+    num_yrs = (dates[end_idx] - dates[start_idx]).astype(np.float64) / 365
+    return (values[end_idx] / values[start_idx]) ** (1 / num_yrs) - 1
+
+def sample_annual_returns(ticker, num_years, num_samples, seed=None, chunk_size=100_000, data_dir=DATA_DIR):
+    """
+    Annual returns for num_samples random start dates, as in do_simulation
+
+    Start dates are drawn in chunks from RandomStreams(seed).stream(ticker, num_years, chunk),
+    so the samples are reproducible and the same however the chunks are split across workers.
+    """
+    from growth_core.rng import RandomStreams, random_dates
+
+    dates, values = load_ticker(ticker, data_dir)
+    last_start = dates[-1] - np.timedelta64(num_years * 365, 'D')
+    if last_start < dates[0]:
+        raise ValueError(f"Not enough data in {ticker} for {num_years} year periods")
+
+    start_dates = RandomStreams(seed).chunked(
+        (ticker, num_years), num_samples, chunk_size,
+        lambda rng, n: random_dates(rng, dates[0], last_start, n),
+    ).astype('datetime64[D]')
+    return start_dates, window_annual_returns(dates, values, start_dates, num_years)
+
+def avg_inflation_rates(inflation_dates, inflation_values, start_dates, num_years):
+    """
+    Geometric mean inflation over each num_years window, as in calculate_avg_inflation_rate
+
+    Uses a prefix sum of log(1 + r) so each window costs two lookups.
+    """
+    start_dates = np.asarray(start_dates, dtype='datetime64[D]')
+    start_idx = nearest_index(inflation_dates, start_dates)
+    end_idx = nearest_index(inflation_dates, start_dates + np.timedelta64(num_years * 365, 'D'))
+
+    log_growth = np.concatenate(([0.0], np.cumsum(np.log1p(inflation_values / 100))))
+    periods = np.maximum(end_idx - start_idx, 1)
+    return np.expm1((log_growth[start_idx + periods] - log_growth[start_idx]) / periods)
+
+def analyse_rolling_returns(ticker, num_years, data_dir=DATA_DIR):
+    """Summary of every rolling num_years window of a ticker, with matching inflation"""
+    dates, values = load_ticker(ticker, data_dir)
+    start_idx, _, annual_returns = rolling_annual_returns(dates, values, num_years)
+    if len(annual_returns) == 0:
+        raise ValueError(f"Not enough data in {ticker} for {num_years} year periods")
+
+    inflation_dates, inflation_values = load_inflation(data_dir)
+    inflation_rates = avg_inflation_rates(inflation_dates, inflation_values, dates[start_idx], num_years)
+
+    return {
+        'ticker': ticker,
+        'num_years': num_years,
+        'num_periods': int(len(annual_returns)),
+        'first_start_date': str(dates[start_idx[0]]),
+        'last_start_date': str(dates[start_idx[-1]]),
+        'average_annual_return': float(np.exp(np.mean(np.log1p(annual_returns))) - 1),
+        'std_annual_return': float(np.std(annual_returns)),
+        'min_annual_return': float(annual_returns.min()),
+        'max_annual_return': float(annual_returns.max()),
+        'percentiles': {
+            str(p): float(v) for p, v in zip((5, 25, 50, 75, 95), np.percentile(annual_returns, (5, 25, 50, 75, 95)))
+        },
+        'average_inflation_rate': float(np.mean(inflation_rates)),
+        'std_inflation_rate': float(np.std(inflation_rates)),
+    }
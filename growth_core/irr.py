@@ -0,0 +1,85 @@
+"""
+Money-weighted returns (XIRR) of dated cash flows.
+
+Solves sum(amount_i * (1 + r) ** -t_i) = 0 with t_i in years of 365 days, as
+spreadsheet XIRR does. The solve runs on lam = log(1 + r), where every r > -100% is a
+real number, so Newton steps can't leave the domain: Newton first, then bisection
+inside a fixed bracket for anything Newton didn't settle. xirr_batch solves many
+cash-flow rows at once (strategies, start dates) with the iterations shared across rows.
+
+Amounts are negative for money invested and positive for money received.
+"""
+import numpy as np
+
+# Bracket for log(1 + r): r from about -99.995% to +2.2 million % a year
+LOG_RATE_BOUNDS = (-10.0, 10.0)
+
+def year_fractions(dates, start=None):
+    """Years of 365 days from start (default: the first date) to each date"""
+    dates = np.asarray(dates, dtype='datetime64[D]')
+    start = dates.min() if start is None else np.datetime64(start, 'D')
+    return (dates - start).astype(float) / 365
+
+def _npv(amounts, times, lam):
+    discounted = amounts * np.exp(-lam[:, None] * times)
+    return discounted.sum(axis=1), -(discounted * times).sum(axis=1)
+
+def xirr_batch(amounts, times, guess=0.1, tol=1e-10, max_iter=50, bisect_iter=100):
+    """
+    XIRR of every row of cash flows
+
+    Args:
+        amounts: (rows x flows) cash flows, zero for padding
+        times: flow times in years, broadcastable to amounts
+        guess: starting annual rate (fraction) for Newton
+    Returns:
+        annual rates as fractions, NaN for rows without a sign change in NPV
+    """
+    amounts = np.atleast_2d(np.asarray(amounts, dtype=float))
+    times = np.broadcast_to(np.asarray(times, dtype=float), amounts.shape)
+    # Measure from each row's first flow so the discount factors stay in range
+    times = times - times.min(axis=1, keepdims=True)
+
+    low, high = LOG_RATE_BOUNDS
+    lam = np.full(len(amounts), np.log1p(guess))
+    settled = np.zeros(len(amounts), dtype=bool)
+    failed = np.zeros(len(amounts), dtype=bool)
+    for _ in range(max_iter):
+        active = np.flatnonzero(~settled)
+        if len(active) == 0:
+            break
+        value, slope = _npv(amounts[active], times[active], lam[active])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            step = value / slope
+        # Rows Newton can't move (flat or non-finite NPV) are left to bisection
+        bad = ~np.isfinite(step)
+        lam[active] = np.clip(lam[active] - np.where(bad, 0.0, step), low, high)
+        settled[active[~bad & (np.abs(step) < tol)]] = True
+        failed[active[bad]] = True
+        settled[active[bad]] = True
+
+    # Bisection for rows Newton didn't settle, inside the bracket
+    fallback = np.flatnonzero(~settled | failed)
+    if len(fallback):
+        lo = np.full(len(fallback), low)
+        hi = np.full(len(fallback), high)
+        rows_amounts, rows_times = amounts[fallback], times[fallback]
+        value_lo, _ = _npv(rows_amounts, rows_times, lo)
+        value_hi, _ = _npv(rows_amounts, rows_times, hi)
+        solvable = np.sign(value_lo) != np.sign(value_hi)
+        for _ in range(bisect_iter):
+            mid = (lo + hi) / 2
+            value_mid, _ = _npv(rows_amounts, rows_times, mid)
+            same_side = np.sign(value_mid) == np.sign(value_lo)
+            lo = np.where(same_side, mid, lo)
+            value_lo = np.where(same_side, value_mid, value_lo)
+            hi = np.where(same_side, hi, mid)
+            if np.all(hi - lo < tol):
+                break
+        lam[fallback] = np.where(solvable, (lo + hi) / 2, np.nan)
+
+    return np.expm1(lam)
+
+def xirr(amounts, dates, guess=0.1):
+    """XIRR of one list of cash flows on the given dates, as a fraction"""
+    return float(xirr_batch(amounts, year_fractions(dates), guess)[0])
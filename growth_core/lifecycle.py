@@ -0,0 +1,188 @@
+"""
+Lifecycle plans: SIP accumulation running straight into perpetual withdrawals.
+
+dashboard2.py sizes the perpetual corpus as if withdrawals started today and then
+sizes a SIP to reach it, so the mature-market switch (india_maturity_yr) is counted
+from a different year in each phase and fees only apply to the corpus. Here both
+phases share one timeline from today: years 1 .. years_for_investment accumulate
+the SIP, withdrawals run from the next year on, and every year's real growth
+(1 + r)(1 - fees)/(1 + i) switches to the mature regime at the same calendar year.
+
+Both phases are linear in the money put in, so nothing is bisected. The corpus the
+withdrawal phase needs is the closed form corpus_table uses, PV / (1 - 1/G) (PV of the
+withdrawals, G the multiplier over the simulated years; the corpus stays positive in
+every year whenever G > 1), and the required SIP is that corpus divided by the
+corpus a unit SIP builds. Households are columns of arrays and every year is one
+vectorized step, so thousands of profiles are solved in one pass.
+
+Amounts are in crores of today's money, as in find_req_amt.
+
+Usage:
+    python -m growth_core.lifecycle profiles.jsonl -o plans.csv
+"""
+import argparse
+import csv
+import json
+
+import numpy as np
+
+from growth_core.corpus_table import SOLVER_UPPER_BOUND, YEARS
+from growth_core.schedules import PERPETUAL_SCHEDULES, check_schedules, compile_schedule
+
+PERPETUAL_KEYS = [
+    'annual_withdrawal', 'decadal_withdrawal', 'withdrawal_increment', 'withdrawal_tax',
+    'annual_return', 'inflation', 'fees', 'new_generation_time', 'kids',
+    'withdrawal_start_yr', 'india_maturity_yr', 'mature_returns', 'mature_inflation',
+]
+
+LIFECYCLE_KEYS = PERPETUAL_KEYS + ['sip_increment', 'years_for_investment']
+
+INTEGER_KEYS = ['new_generation_time', 'kids', 'withdrawal_start_yr', 'india_maturity_yr', 'years_for_investment']
+
+def as_profile_arrays(profiles):
+    """
+    Broadcast a dict of scalars / arrays, or a list of parameter dicts, to one array per key
+
+    A 'schedules' entry (see growth_core.schedules) is kept as one dict or None per
+    household: a single dict in the dict-of-arrays form applies to every household.
+    """
+    if not isinstance(profiles, dict):
+        schedules = [profile.get('schedules') for profile in profiles]
+        profiles = {key: [profile[key] for profile in profiles] for key in LIFECYCLE_KEYS}
+    else:
+        schedules = profiles.get('schedules')
+    missing = [key for key in LIFECYCLE_KEYS if key not in profiles]
+    if missing:
+        raise KeyError(f"Missing lifecycle parameters: {', '.join(missing)}")
+    arrays = np.broadcast_arrays(*(np.atleast_1d(np.asarray(profiles[key], dtype=float)) for key in LIFECYCLE_KEYS))
+    columns = dict(zip(LIFECYCLE_KEYS, (array.ravel() for array in arrays)))
+    for key in INTEGER_KEYS:
+        columns[key] = columns[key].astype(np.int64)
+    households = len(columns['annual_return'])
+    columns['schedules'] = schedules if isinstance(schedules, list) else [schedules] * households
+    return columns
+
+def assumption_arrays(p, total_years):
+    """
+    Per-household, per-year factors on the lifecycle timeline (households x total_years)
+
+    Returns and inflation switch to the mature values at india_maturity_yr unless a
+    household's schedules replace them; schedule year 1 is the first SIP year.
+
+    Returns:
+        (real growth, inflation factor, withdrawal growth factor) arrays
+    """
+    years = np.arange(1, total_years + 1)
+    maturity = p['india_maturity_yr'][:, None]
+    mature = (maturity >= 1) & (years >= maturity)
+    series = {
+        'annual_return': np.where(mature, p['mature_returns'][:, None], p['annual_return'][:, None]),
+        'inflation': np.where(mature, p['mature_inflation'][:, None], p['inflation'][:, None]),
+        'fees': np.repeat(p['fees'][:, None], total_years, axis=1),
+        'withdrawal_increment': np.repeat(p['withdrawal_increment'][:, None], total_years, axis=1),
+    }
+    for household, schedules in enumerate(p['schedules']):
+        for name, spec in check_schedules(schedules, PERPETUAL_SCHEDULES).items():
+            series[name][household] = compile_schedule(spec, total_years)[0]
+
+    inflation = 1 + series['inflation'] / 100
+    growth = (1 + series['annual_return'] / 100) * (1 - series['fees'] / 100) / inflation
+    return growth, inflation, 1 + series['withdrawal_increment'] / 100
+
+def lifecycle_unit_sip_corpus(p, growth, inflation):
+    """Real corpus at the end of accumulation from a first-year SIP of 1"""
+    corpus = np.zeros(len(p['annual_return']))
+    price_level = np.ones_like(corpus)
+    sip = np.ones_like(corpus)
+    for year in range(1, int(p['years_for_investment'].max(initial=0)) + 1):
+        investing = year <= p['years_for_investment']
+        # get_final_sip_corpus's nominal recurrence, deflated year by year
+        corpus = np.where(investing, (corpus + sip / price_level) * growth[:, year - 1], corpus)
+        price_level = np.where(investing, price_level * inflation[:, year - 1], price_level)
+        sip = sip * (1 + p['sip_increment'] / 100)
+    return corpus
+
+def retirement_corpus(p, growth, withdrawal_growth, years=YEARS):
+    """
+    Corpus needed when withdrawals start, for the perpetual phase of every household
+
+    The find_req_amt solution (final corpus after `years` equal to the starting one) of
+    the withdrawal phase, with the per-year factors read from the shared timeline.
+    Returns SOLVER_UPPER_BOUND where there is none (G <= 1), as the bisection does.
+    """
+    start = p['years_for_investment']
+    households = np.arange(len(start))
+    withdrawal_tax = 1 + p['withdrawal_tax'] / 100
+
+    discount = np.ones(len(start))
+    splits = np.ones(len(start))
+    withdrawal = np.ones(len(start))
+    present_value = np.zeros(len(start))
+    log_multiplier = np.zeros(len(start))
+
+    for year in range(1, years + 1):
+        year_growth = growth[households, start + year - 1]
+        discount /= year_growth
+        log_multiplier += np.log(year_growth)
+
+        withdrawing = year >= p['withdrawal_start_yr']
+        amount = p['annual_withdrawal'] + np.where(year % 10 == 0, p['decadal_withdrawal'], 0.0)
+        present_value += np.where(withdrawing, amount * withdrawal_tax * withdrawal * discount * splits, 0.0)
+
+        withdrawal = withdrawal * withdrawal_growth[households, start + year - 1]
+        generation = year % p['new_generation_time'] == 0
+        splits = np.where(generation, splits * p['kids'], splits)
+        log_multiplier -= np.where(generation, np.log(p['kids']), 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        corpus = present_value / -np.expm1(-log_multiplier)
+    return np.where((log_multiplier > 0) & (corpus < SOLVER_UPPER_BOUND), corpus, SOLVER_UPPER_BOUND)
+
+def plan_lifecycles(profiles, years=YEARS, chunk_size=2000):
+    """
+    Required first-year SIP and retirement corpus for every household profile
+
+    Args:
+        profiles: list of dicts with LIFECYCLE_KEYS (and optionally 'schedules'), or a
+            dict of broadcastable arrays
+        chunk_size: households solved together, bounding the per-year factor arrays
+    Returns:
+        dict of arrays: 'required_corpus' (crores of today's money, when withdrawals
+        start), 'unit_sip_corpus' and 'required_sip' (crores in the first year)
+    """
+    p = as_profile_arrays(profiles)
+    total = len(p['annual_return'])
+    results = {name: np.empty(total) for name in ('required_corpus', 'unit_sip_corpus', 'required_sip')}
+
+    for first in range(0, total, chunk_size):
+        chunk = slice(first, first + chunk_size)
+        part = {key: value[chunk] for key, value in p.items()}
+        growth, inflation, withdrawal_growth = assumption_arrays(
+            part, int(part['years_for_investment'].max(initial=0)) + years)
+        required_corpus = retirement_corpus(part, growth, withdrawal_growth, years)
+        unit_corpus = lifecycle_unit_sip_corpus(part, growth, inflation)
+        results['required_corpus'][chunk] = required_corpus
+        results['unit_sip_corpus'][chunk] = unit_corpus
+        with np.errstate(divide='ignore'):
+            results['required_sip'][chunk] = required_corpus / unit_corpus
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve lifecycle SIP plans for a JSONL file of household profiles")
+    parser.add_argument('source', help="JSONL file, one profile per line with the dashboard2.py keys")
+    parser.add_argument('-o', '--output', required=True, help="CSV file for the results")
+    args = parser.parse_args()
+
+    with open(args.source) as f:
+        profiles = [json.loads(line) for line in f if line.strip()]
+    plans = plan_lifecycles(profiles)
+
+    with open(args.output, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['scenario', 'required_corpus', 'required_sip'])
+        for i, profile in enumerate(profiles):
+            writer.writerow([profile.get('scenario', i + 1), plans['required_corpus'][i], plans['required_sip'][i]])
+    print(f"Solved {len(profiles)} profiles")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,260 @@
+"""Perpetual corpus and SIP solvers used by the perpetual financial planning dashboard"""
+
+from math import expm1, gcd, isfinite, log
+
+from growth_core.fast_forward import AffineMap
+from growth_core.profiling import profiled
+from growth_core.schedules import PerpetualYears, SipYears
+
+# Relative rounding allowance when a settled outcome is decided without simulating
+SETTLE_MARGIN = 1e-9
+
+def get_final_corpus_val(amt, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax, annual_return, inflation, years, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr, mature_returns, mature_inflation, schedules=None):
+    """schedules optionally replaces returns, inflation, fees or withdrawal growth (see growth_core.schedules)"""
+    plan = PerpetualYears(years, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                          annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                          india_maturity_yr, mature_returns, mature_inflation, schedules)
+    return _final_corpus_val(amt, plan)
+
+@profiled('growth_core.perpetual.get_final_corpus_val', years_from_result=lambda result: len(result[1]) - 1)
+def _final_corpus_val(amt, plan):
+    corpus_history = [amt]
+
+    for growth, fee, inflation, annual_outflow, decadal_outflow, split in zip(
+            plan.return_factor, plan.fee_factor, plan.inflation_factor, plan.annual_outflow, plan.decadal_outflow,
+            plan.split):
+        amt = amt * growth
+        amt *= fee
+        amt /= inflation
+        amt -= annual_outflow
+        amt -= decadal_outflow
+        amt /= split
+
+        corpus_history.append(amt)
+
+        # Stop if corpus becomes negative
+        if amt <= 0:
+            break
+
+    return amt, corpus_history
+
+def _settled_outcome(amt, done, plan, low, high):
+    """
+    Outcome of the years after `done`, all steady, without simulating them
+
+    Normalized by the cumulative withdrawal growth, y = corpus / level, each steady year
+    is an increasing affine map of y, and the maps repeat every lcm(10, new_generation_time)
+    years. As in fast_forward, one cycle composes into a single AffineMap and k cycles
+    are its k-th power. Each year within the cycle moves monotonically from cycle to
+    cycle, so depletion shows in the first cycle if y rises and in the last one if it
+    falls. Returns None when a comparison is within rounding of its boundary.
+    """
+    years = plan.years
+    period = 10 * plan.new_generation_time // gcd(10, plan.new_generation_time)
+    cycles, rest = divmod(years - done, period)
+    increments = plan.series['withdrawal_increment']
+    scale = 1 + increments[done] / 100
+    if scale <= 0:
+        return None
+
+    level = 1.0
+    for increment in increments[:done]:
+        level *= 1 + increment / 100
+    start_level = level
+
+    # prefix[r] maps y at the cycle start to y r years in
+    prefix = [AffineMap()]
+    for i in range(done, done + min(period, years - done)):
+        growth = plan.return_factor[i] * plan.fee_factor[i] / plan.inflation_factor[i]
+        if growth <= 0:
+            return None
+        level *= scale
+        outflow = plan.annual_outflow[i] + plan.decadal_outflow[i]
+        prefix.append(prefix[-1].then(AffineMap(growth / scale / plan.split[i], -outflow / level / plan.split[i])))
+    if not isfinite(level):
+        return None
+    cycle = prefix[-1]
+    y = amt / start_level
+
+    def settled_sign(step, y):
+        """Sign of step(y), or None within rounding of 0"""
+        value = step(y)
+        if value != value:
+            return None
+        if not isfinite(value):
+            return 1 if value > 0 else -1
+        if abs(value) <= SETTLE_MARGIN * (abs(step.slope * y) + abs(step.offset)):
+            return None
+        return 1 if value > 0 else -1
+
+    # Lowest start of each year within the cycle: the first cycle if y rises, else the last
+    lowest = [(y, len(prefix) - 1)]
+    if cycles:
+        trend = settled_sign(AffineMap(cycle.slope - 1, cycle.offset), y)
+        if trend is None:
+            return None
+        if trend < 0:
+            lowest = [(cycle.power(cycles - 1)(y), period), (cycle.power(cycles)(y), rest)]
+    for start_y, length in lowest:
+        for r in range(1, length + 1):
+            sign = settled_sign(prefix[r], start_y)
+            if sign is None:
+                return None
+            if sign < 0:
+                return -1
+
+    try:
+        end_level = start_level * scale ** (years - done)
+    except OverflowError:
+        return None
+    power = cycle.power(cycles)
+    if not isfinite(power.slope):
+        # Overflowed: y runs off to +inf or -inf (depletion was ruled out above)
+        return 1 if power(y) == float('inf') else None
+    final_map = power.then(prefix[rest])
+    for bound, outcome in ((low, -1), (high, 1)):
+        side = settled_sign(AffineMap(final_map.slope, final_map.offset - bound / end_level), y)
+        if side is None:
+            return None
+        if side == outcome:
+            return outcome
+    return 0
+
+def get_corpus_outcome(amt, low, high, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax, annual_return, inflation, years, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr, mature_returns, mature_inflation, schedules=None):
+    """
+    Where get_final_corpus_val's final corpus lands relative to [low, high], stopping early
+
+    Runs the same yearly loop up to the year returns and withdrawals turn steady, then
+    settles the remaining years from the composed steady cycle (see _settled_outcome),
+    running the loop on only where that is within rounding of a boundary.
+
+    Returns:
+        (outcome, years_simulated): outcome is -1 below low (including depletion), 1 above
+        high, 0 within
+    """
+    plan = PerpetualYears(years, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                          annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                          india_maturity_yr, mature_returns, mature_inflation, schedules)
+    return _corpus_outcome(amt, low, high, plan)
+
+@profiled('growth_core.perpetual.get_corpus_outcome', years_from_result=lambda result: result[1])
+def _corpus_outcome(amt, low, high, plan):
+    years = plan.years
+    # Factors from steady_from on all equal the last year's, so the rest can be settled there
+    steady_from = max(plan.steady_year, plan.withdrawal_start_yr, 1)
+    settle_at = steady_from - 1 if plan.kids > 0 and steady_from - 1 < years else None
+
+    for i, (growth, fee, inflation, annual_outflow, decadal_outflow, split) in enumerate(zip(
+            plan.return_factor, plan.fee_factor, plan.inflation_factor, plan.annual_outflow, plan.decadal_outflow,
+            plan.split)):
+        if i == settle_at:
+            outcome = _settled_outcome(amt, i, plan, low, high)
+            if outcome is not None:
+                return outcome, i
+
+        amt = amt * growth
+        amt *= fee
+        amt /= inflation
+        amt -= annual_outflow
+        amt -= decadal_outflow
+        amt /= split
+
+        if amt <= 0:
+            return -1, i + 1
+
+    if amt > high:
+        return 1, years
+    if amt < low:
+        return -1, years
+    return 0, years
+
+@profiled()
+def find_req_amt(annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax, annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr, mature_returns, mature_inflation, stats=None, schedules=None):
+    """
+    Stats, if a dict is given, collects bisection probes and years simulated and skipped.
+    schedules optionally replaces returns, inflation, fees or withdrawal growth (see growth_core.schedules)
+    """
+    low, high = 0, 1e10
+    tolerance = 1e-6
+    iteration = 0
+    # Every probe runs the same years, so the per-year factors are compiled once
+    plan = PerpetualYears(1000, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                          annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                          india_maturity_yr, mature_returns, mature_inflation, schedules)
+
+    while high - low > tolerance and iteration < 1000:
+        iteration += 1
+        if iteration > 1000:
+            return None, []
+        
+        mid_amt = (low + high) / 2
+        # Only which side of mid_amt the final corpus lands on matters here
+        outcome, years_simulated = _corpus_outcome(mid_amt, mid_amt * 0.99999, mid_amt * 1.00001, plan)
+        if stats is not None:
+            stats['probes'] = stats.get('probes', 0) + 1
+            stats['years_simulated'] = stats.get('years_simulated', 0) + years_simulated
+            stats['years_skipped'] = stats.get('years_skipped', 0) + 1000 - years_simulated
+
+        if outcome > 0:
+            high = mid_amt
+        elif outcome < 0:
+            low = mid_amt
+        else:
+            break
+    
+    # Calculate the final corpus history with the found amount
+    _, corpus_history = _final_corpus_val(mid_amt, plan)
+    
+    return mid_amt, corpus_history
+
+@profiled(years_arg='years')
+def get_final_sip_corpus(sip, sip_increment, annual_return, inflation, years, schedules=None):
+    """schedules optionally replaces returns, inflation or SIP growth (see growth_core.schedules)"""
+    plan = SipYears(years, sip_increment, annual_return, inflation, schedules)
+    corpus = 0
+    sip_history = []
+    corpus_history = [0]
+    
+    for growth, step in zip(plan.return_factor, plan.step_factor):
+        corpus += sip
+        sip_history.append(sip)
+        corpus *= growth
+        corpus_history.append(corpus)
+        sip *= step
+        
+    real_corpus = corpus / plan.price_level
+    
+    return real_corpus, corpus_history, sip_history
+
+def unit_sip_corpus(sip_increment, annual_return, inflation, years, schedules=None):
+    """
+    Real corpus from get_final_sip_corpus with sip=1, in closed form
+
+    A growing annuity: growth * (growth**n - step**n) / (growth - step) in nominal terms,
+    written as growth**n * expm1(n*x) / expm1(x) with x = log(step / growth) so it stays
+    accurate as step approaches growth, and equal to n * growth**n when they match.
+    Scheduled rates have no closed form and run the recurrence.
+    """
+    growth = 1 + annual_return / 100
+    step = 1 + sip_increment / 100
+    if growth <= 0 or step <= 0 or schedules:
+        real_corpus, _, _ = get_final_sip_corpus(1, sip_increment, annual_return, inflation, years, schedules)
+        return real_corpus
+    x = log(step / growth)
+    ratio = years if x == 0 else expm1(years * x) / expm1(x)
+    return growth ** years * ratio / (1 + inflation / 100) ** years
+
+@profiled()
+def get_req_sip(amt, sip_increment, annual_return, inflation, years, schedules=None):
+    required_sip = amt / unit_sip_corpus(sip_increment, annual_return, inflation, years, schedules)
+
+    _, corpus_history, sip_history = get_final_sip_corpus(
+        sip=required_sip,
+        sip_increment=sip_increment,
+        annual_return=annual_return,
+        inflation=inflation,
+        years=years,
+        schedules=schedules
+    )
+    
+    return required_sip, corpus_history, sip_history
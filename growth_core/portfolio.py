@@ -0,0 +1,201 @@
+"""
+Multi-asset portfolio simulation over many allocations and return paths at once.
+
+Return paths are bootstrapped from the series on disk (^NSEI, ^BSESN and the fund
+NAVs): each simulated year is a 12-month window drawn from the months all chosen
+assets share, so the cross-asset correlation of that year is kept, together with the
+inflation of the same window. Assets without history on disk (debt, gold) are added
+as synthetic normal annual returns; with only those, inflation is a constant rate.
+
+simulate_portfolios evolves holdings as one (allocations x paths x assets) array per
+year: real growth per asset, withdrawals taken pro-rata or from a chosen bucket
+first, and rebalancing to target weights that can glide from a start to an end
+allocation. Allocations are processed in chunks to bound memory, so 1000 allocations
+x 10k paths runs on one node.
+
+Amounts are in crores and real (today's money), as in calculate_growth.
+"""
+import os
+
+import numpy as np
+
+from growth_core.alignment import InflationIndex, monthly_closes
+from growth_core.history import DATA_DIR, load_amfi_nav, load_inflation, load_nav_json, load_ticker
+from growth_core.rng import RandomStreams
+
+HISTORICAL_ASSETS = {
+    'nifty': lambda data_dir: load_ticker('^NSEI', data_dir),
+    'sensex': lambda data_dir: load_ticker('^BSESN', data_dir),
+    'kotak_equity_opportunities': lambda data_dir: load_amfi_nav(os.path.join(data_dir, 'NAV_120158.csv')),
+    'ppfas_flexi_cap': lambda data_dir: load_nav_json(os.path.join(data_dir, 'parag parikh flexi cap.json')),
+}
+
+# Mean and standard deviation of annual nominal returns (%)
+SYNTHETIC_ASSETS = {
+    'debt': (7.0, 1.5),
+    'gold': (9.0, 14.0),
+}
+
+def common_monthly_closes(names, data_dir=DATA_DIR):
+    """Month-end closes of historical assets over the months they all cover"""
+    series = [monthly_closes(*HISTORICAL_ASSETS[name](data_dir)) for name in names]
+    first = max(months[0] for months, _ in series)
+    last = min(months[-1] for months, _ in series)
+    months = np.arange(first, last + 1)
+    closes = np.stack([values[np.searchsorted(asset_months, months)] for asset_months, values in series], axis=1)
+    return months, closes
+
+def bootstrap_paths(assets, num_paths, years, seed=None, synthetic=None, inflation=None, data_dir=DATA_DIR):
+    """
+    Annual return paths for a list of assets
+
+    Args:
+        assets: names from HISTORICAL_ASSETS or synthetic (defaults to SYNTHETIC_ASSETS)
+        synthetic: {name: (mean %, std %)} for assets without history
+        inflation: yearly inflation (%) when every asset is synthetic, by default the
+            compounded average of inflation_data.csv; historical assets use their windows'
+    Returns:
+        dict with 'assets', 'returns' (num_paths x years x assets, %) and 'inflation'
+        (num_paths x years, %)
+    """
+    synthetic = SYNTHETIC_ASSETS if synthetic is None else synthetic
+    unknown = [name for name in assets if name not in HISTORICAL_ASSETS and name not in synthetic]
+    if unknown:
+        raise KeyError(f"Unknown assets: {', '.join(unknown)}")
+
+    rng = RandomStreams(seed).stream('portfolio', *assets, num_paths, years)
+    historical = [name for name in assets if name in HISTORICAL_ASSETS]
+    returns = np.empty((num_paths, years, len(assets)))
+
+    if historical:
+        months, closes = common_monthly_closes(historical, data_dir)
+        price_level = InflationIndex.from_csv(months, 'interpolate', data_dir).level
+        windows = len(months) - 12
+        if windows < 1:
+            raise ValueError(f"Less than a year of common history for {', '.join(historical)}")
+        window_returns = (closes[12:] / closes[:-12] - 1) * 100
+        window_inflation = (price_level[12:] / price_level[:-12] - 1) * 100
+
+        picks = rng.integers(0, windows, size=(num_paths, years))
+        returns[:, :, [assets.index(name) for name in historical]] = window_returns[picks]
+        inflation = window_inflation[picks]
+    else:
+        if inflation is None:
+            _, rates = load_inflation(data_dir)
+            inflation = (np.exp(np.mean(np.log1p(np.asarray(rates, dtype=float) / 100))) - 1) * 100
+        inflation = np.full((num_paths, years), float(inflation))
+
+    for k, name in enumerate(assets):
+        if name not in HISTORICAL_ASSETS:
+            mean, std = synthetic[name]
+            returns[:, :, k] = rng.normal(mean, std, size=(num_paths, years))
+
+    return {'assets': list(assets), 'returns': returns, 'inflation': inflation}
+
+def target_weights(weights, end_weights, glide_years, year):
+    """Allocation targets in a given year, moving linearly from weights to end_weights"""
+    if end_weights is None or not glide_years:
+        return weights
+    progress = min(year / glide_years, 1.0)
+    return weights + (end_weights - weights) * progress
+
+def _withdraw(holdings, total, amount, withdraw_from):
+    """Take amount from every portfolio, pro-rata or from one bucket first"""
+    if withdraw_from is not None:
+        bucket = holdings[..., withdraw_from]
+        taken = np.minimum(bucket, amount)
+        holdings[..., withdraw_from] = bucket - taken
+        remaining = amount - taken
+        total = total - taken
+    else:
+        remaining = amount
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        keep = np.where(total > 0, 1 - remaining / total, 0.0)
+    holdings *= np.maximum(keep, 0.0)[..., None]
+
+def simulate_portfolios(weights, paths, initial_portfolio, annual_withdrawal, withdrawal_increase=0.0,
+                        withdrawal_start_yr=1, tax_on_withdrawals=0.0, rebalance_every=1, end_weights=None,
+                        glide_years=None, withdraw_from=None, chunk_size=100, dtype=np.float64):
+    """
+    Simulate every allocation on every return path
+
+    Args:
+        weights: (allocations x assets) starting allocations, rows summing to 1
+        paths: output of bootstrap_paths
+        annual_withdrawal: first-year withdrawal (crores), growing by withdrawal_increase %
+        rebalance_every: rebalance to the target weights every n years (0 = never)
+        end_weights, glide_years: glide path from weights to end_weights over glide_years
+        withdraw_from: asset name to withdraw from first, or None for pro-rata
+        chunk_size: allocations simulated together, to bound memory
+    Returns:
+        dict with 'final_values' and 'depletion_years' (allocations x paths), depletion
+        year 0 where the portfolio lasts all years
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=dtype))
+    end_weights = None if end_weights is None else np.atleast_2d(np.asarray(end_weights, dtype=dtype))
+    assets = paths['assets']
+    bucket = None if withdraw_from is None else assets.index(withdraw_from)
+
+    # Real growth per path, year and asset, shared by all allocations
+    real_growth = ((1 + paths['returns'] / 100) / (1 + paths['inflation'] / 100)[..., None]).astype(dtype)
+    num_paths, years, _ = real_growth.shape
+
+    final_values = np.empty((len(weights), num_paths), dtype=dtype)
+    depletion_years = np.zeros((len(weights), num_paths), dtype=np.int32)
+
+    for start in range(0, len(weights), chunk_size):
+        chunk = slice(start, start + chunk_size)
+        chunk_weights = weights[chunk]
+        chunk_end = None if end_weights is None else np.broadcast_to(end_weights, weights.shape)[chunk]
+
+        if rebalance_every == 1:
+            # Holdings sit at the target weights at the start of every year, so only the
+            # totals need tracking and which bucket pays the withdrawal doesn't matter
+            total = np.full((len(chunk_weights), num_paths), initial_portfolio, dtype=dtype)
+            depleted = depletion_years[chunk]
+            withdrawal = annual_withdrawal
+            for year in range(1, years + 1):
+                targets = target_weights(chunk_weights, chunk_end, glide_years, year - 1)
+                total *= targets @ real_growth[:, year - 1, :].T
+
+                if year >= withdrawal_start_yr:
+                    total -= withdrawal * (1 + tax_on_withdrawals / 100)
+                    depleted[(depleted == 0) & (total <= 0)] = year
+                    np.maximum(total, 0, out=total)
+                withdrawal *= 1 + withdrawal_increase / 100
+            final_values[chunk] = total
+            continue
+
+        holdings = initial_portfolio * np.broadcast_to(chunk_weights[:, None, :], (len(chunk_weights), num_paths, len(assets))).copy()
+        depleted = depletion_years[chunk]
+        withdrawal = annual_withdrawal
+
+        for year in range(1, years + 1):
+            holdings *= real_growth[None, :, year - 1, :]
+
+            if year >= withdrawal_start_yr:
+                total = holdings.sum(axis=-1)
+                _withdraw(holdings, total, withdrawal * (1 + tax_on_withdrawals / 100), bucket)
+                newly_depleted = (depleted == 0) & (total - withdrawal * (1 + tax_on_withdrawals / 100) <= 0)
+                depleted[newly_depleted] = year
+            withdrawal *= 1 + withdrawal_increase / 100
+
+            if rebalance_every and year % rebalance_every == 0:
+                targets = target_weights(chunk_weights, chunk_end, glide_years, year)
+                holdings[:] = holdings.sum(axis=-1, keepdims=True) * targets[:, None, :]
+
+        final_values[chunk] = holdings.sum(axis=-1)
+
+    return {'final_values': final_values, 'depletion_years': depletion_years}
+
+def summarize_allocations(result, percentiles=(5, 50, 95)):
+    """Per allocation success rate and final-value percentiles"""
+    final_values = result['final_values']
+    return {
+        'success_rate': (result['depletion_years'] == 0).mean(axis=1),
+        'median_depletion_year': np.array([
+            np.median(years[years > 0]) if (years > 0).any() else 0 for years in result['depletion_years']
+        ]),
+        **{f"p{p}_final_value": np.percentile(final_values, p, axis=1) for p in percentiles},
+    }
@@ -0,0 +1,148 @@
+"""
+Lightweight instrumentation for the simulation hot paths.
+
+Set GROWTH_PROFILE=1 before the modules are imported to record, per instrumented
+function or span: call count, simulated years, wall time and (with
+GROWTH_PROFILE_ALLOC=1, via tracemalloc) peak allocated bytes. When GROWTH_PROFILE is
+unset the decorator returns the function untouched and span() is an empty context
+manager, so instrumentation costs nothing. Allocation peaks are reset whenever an
+instrumented call starts, so for nested calls they cover the innermost call only.
+
+Results can be written as a JSON summary or as a Chrome trace (chrome://tracing,
+Perfetto). With GROWTH_PROFILE_OUT=path they are written at exit, as a Chrome trace
+if the path ends in .trace.json and as a summary otherwise.
+"""
+import atexit
+import contextlib
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+ENABLED = os.environ.get('GROWTH_PROFILE', '') not in ('', '0')
+TRACE_ALLOCATIONS = ENABLED and os.environ.get('GROWTH_PROFILE_ALLOC', '') not in ('', '0')
+MAX_EVENTS = 200_000
+
+class Profiler:
+    def __init__(self, trace_allocations=False, max_events=MAX_EVENTS):
+        self.trace_allocations = trace_allocations
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.origin = time.perf_counter()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.stats = {}
+            self.events = []
+            self.dropped_events = 0
+
+    def start(self):
+        if self.trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        return time.perf_counter()
+
+    def record(self, name, started, years=0):
+        ended = time.perf_counter()
+        peak = tracemalloc.get_traced_memory()[1] if self.trace_allocations else 0
+        with self.lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {'calls': 0, 'years': 0, 'wall_s': 0.0, 'max_wall_s': 0.0, 'peak_alloc_bytes': 0}
+            stat['calls'] += 1
+            stat['years'] += years
+            stat['wall_s'] += ended - started
+            stat['max_wall_s'] = max(stat['max_wall_s'], ended - started)
+            stat['peak_alloc_bytes'] = max(stat['peak_alloc_bytes'], peak)
+
+            if len(self.events) < self.max_events:
+                self.events.append((name, started, ended, threading.get_ident(), years))
+            else:
+                self.dropped_events += 1
+
+    def summary(self):
+        """Per-name stats, slowest total wall time first"""
+        with self.lock:
+            return dict(sorted(((name, dict(stat)) for name, stat in self.stats.items()),
+                               key=lambda item: -item[1]['wall_s']))
+
+    def chrome_trace(self):
+        """Recorded calls as Chrome trace-event JSON (complete 'X' events, microseconds)"""
+        pid = os.getpid()
+        with self.lock:
+            events = [{
+                'name': name, 'ph': 'X', 'pid': pid, 'tid': tid,
+                'ts': (started - self.origin) * 1e6, 'dur': (ended - started) * 1e6,
+                'args': {'years': years},
+            } for name, started, ended, tid, years in self.events]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_json(self, path):
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'dropped_events': self.dropped_events}, f, indent=2)
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def export(self, path):
+        if path.endswith('.trace.json'):
+            self.export_chrome_trace(path)
+        else:
+            self.export_json(path)
+
+profiler = Profiler(trace_allocations=TRACE_ALLOCATIONS)
+
+def profiled(name=None, years_arg=None, years_from_result=None):
+    """
+    Record calls of the decorated function when profiling is enabled
+
+    Args:
+        name: label in the summary, defaults to module.qualname
+        years_arg: name of the argument holding the number of simulated years
+        years_from_result: callable computing simulated years from the return value
+    """
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        label = name or f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func) if years_arg else None
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = profiler.start()
+            years = 0
+            try:
+                result = func(*args, **kwargs)
+                if years_from_result and not years_arg:
+                    years = years_from_result(result)
+                return result
+            finally:
+                # Failed calls are recorded too, with years_arg's years but none from a result
+                if years_arg:
+                    years = signature.bind(*args, **kwargs).arguments.get(years_arg, 0)
+                profiler.record(label, started, years)
+
+        return wrapper
+    return decorate
+
+@contextlib.contextmanager
+def _span(name, years=0):
+    started = profiler.start()
+    try:
+        yield
+    finally:
+        profiler.record(name, started, years)
+
+def span(name, years=0):
+    """Context manager recording a block, e.g. building and serializing a figure"""
+    return _span(name, years) if ENABLED else contextlib.nullcontext()
+
+if ENABLED and os.environ.get('GROWTH_PROFILE_OUT'):
+    atexit.register(lambda: profiler.export(os.environ['GROWTH_PROFILE_OUT']))
@@ -0,0 +1,137 @@
+"""
+Process-wide result store shared by every dashboard session.
+
+Results are keyed by a hash of (function, parameters). Concurrent requests for the
+same key wait on a single computation instead of each running it, and results can
+optionally be persisted as JSON files so they survive a restart.
+
+Set GROWTH_CACHE_DIR to enable the on-disk layer for the shared store.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+def params_key(namespace, params):
+    """Stable hash of a namespace and JSON-serializable parameters"""
+    payload = json.dumps([namespace, params], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+class _Pending:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class ResultStore:
+    def __init__(self, cache_dir=None, max_entries=4096):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.results = OrderedDict()
+        self.in_flight = {}
+        self.lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'coalesced': 0, 'computed': 0}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get_or_compute(self, namespace, params, compute):
+        """
+        Return the stored result for (namespace, params), computing it at most once
+
+        compute() is called without arguments by the first caller for a key; every
+        other caller asking for the same key meanwhile blocks until it finishes and
+        gets the same result (or exception).
+        """
+        key = params_key(namespace, params)
+
+        with self.lock:
+            if key in self.results:
+                self.results.move_to_end(key)
+                self.stats['hits'] += 1
+                return self.results[key]
+            pending = self.in_flight.get(key)
+            owner = pending is None
+            if owner:
+                pending = self.in_flight[key] = _Pending()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            pending.event.wait()
+            if pending.error is not None:
+                raise pending.error
+            return pending.result
+
+        found = False
+        try:
+            found, result = self._load(key)
+            if not found:
+                result = compute()
+                self._save(key, result)
+            pending.result = result
+        except BaseException as e:
+            pending.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+                if pending.error is None:
+                    self._remember(key, pending.result)
+                    self.stats['disk_hits' if found else 'computed'] += 1
+            pending.event.set()
+
+        return result
+
+    def call(self, func, **kwargs):
+        """Memoized func(**kwargs), namespaced by the function's qualified name"""
+        namespace = f"{func.__module__}.{func.__qualname__}"
+        return self.get_or_compute(namespace, kwargs, lambda: func(**kwargs))
+
+    def clear(self):
+        with self.lock:
+            self.results.clear()
+
+    def _remember(self, key, result):
+        self.results[key] = result
+        if len(self.results) > self.max_entries:
+            self.results.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load(self, key):
+        if not self.cache_dir:
+            return False, None
+        try:
+            with open(self._path(key)) as f:
+                return True, json.load(f)
+        except (OSError, ValueError):
+            return False, None
+
+    def _save(self, key, result):
+        if not self.cache_dir:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file and rename so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(result, f)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+_shared_store = None
+_shared_store_lock = threading.Lock()
+
+def shared_store():
+    """The process-wide ResultStore, created on first use from GROWTH_CACHE_DIR"""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = ResultStore(cache_dir=os.environ.get('GROWTH_CACHE_DIR') or None)
+        return _shared_store
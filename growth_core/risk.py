@@ -0,0 +1,178 @@
+"""
+Risk metrics for the price and NAV series in the repo.
+
+Each metric makes one vectorized pass over the last axis of its input, so the same
+function scores a whole series, a batch of series, or every window of a series at once:
+rolling() passes a sliding-window view of shape (windows x window) and gets one value
+per window back, without copying the series per window.
+
+Drawdown-based metrics (max_drawdown, drawdown_duration, ulcer_index) take prices;
+the return-based ones (var_cvar, sortino_ratio, band_coverage) take periodic simple
+returns, e.g. simple_returns(prices).
+
+Usage:
+    python -m growth_core.risk nifty kotak_equity_opportunities --window-years 3
+"""
+import argparse
+from math import erf, sqrt
+from statistics import NormalDist
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+METHODS = ('historical', 'cornish_fisher')
+
+def simple_returns(prices):
+    """Period-over-period returns along the last axis, as fractions"""
+    prices = np.asarray(prices, dtype=float)
+    return prices[..., 1:] / prices[..., :-1] - 1
+
+def periods_per_year(dates):
+    """Average number of observations per year in a datetime64 series"""
+    span_years = (dates[-1] - dates[0]).astype('timedelta64[D]').astype(float) / 365.25
+    return (len(dates) - 1) / span_years
+
+def drawdowns(prices):
+    """Fall from the running peak at every point, as a fraction (0 at new highs, negative below)"""
+    prices = np.asarray(prices, dtype=float)
+    return prices / np.maximum.accumulate(prices, axis=-1) - 1
+
+def max_drawdown(prices):
+    """Largest peak-to-trough fall, as a positive fraction"""
+    return -drawdowns(prices).min(axis=-1)
+
+def drawdown_duration(prices):
+    """Longest time spent below a previous peak, in periods (including an unrecovered drawdown at the end)"""
+    prices = np.asarray(prices, dtype=float)
+    index = np.arange(prices.shape[-1])
+    at_peak = prices >= np.maximum.accumulate(prices, axis=-1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, index, 0), axis=-1)
+    return (index - last_peak).max(axis=-1)
+
+def ulcer_index(prices):
+    """Root mean square drawdown, in %"""
+    return np.sqrt(np.mean((drawdowns(prices) * 100) ** 2, axis=-1))
+
+def _cornish_fisher_z(z, skew, excess_kurtosis):
+    return (z + (z ** 2 - 1) * skew / 6 + (z ** 3 - 3 * z) * excess_kurtosis / 24
+            - (2 * z ** 3 - 5 * z) * skew ** 2 / 36)
+
+def var_cvar(returns, level=0.95, method='historical', tail_points=200):
+    """
+    Value at risk and conditional value at risk (expected shortfall) of periodic returns
+
+    historical uses the empirical quantile and the mean of the returns at or below it.
+    cornish_fisher adjusts the normal quantile for the sample skew and excess kurtosis;
+    its CVaR averages the adjusted quantile over tail_points levels in the tail.
+
+    Returns:
+        (var, cvar) as positive loss fractions per period
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}, expected one of {METHODS}")
+    returns = np.asarray(returns, dtype=float)
+    tail = 1 - level
+
+    if method == 'historical':
+        cutoff = np.quantile(returns, tail, axis=-1, keepdims=True)
+        in_tail = returns <= cutoff
+        cvar = -np.sum(returns * in_tail, axis=-1) / np.sum(in_tail, axis=-1)
+        return -cutoff[..., 0], cvar
+
+    mean = returns.mean(axis=-1, keepdims=True)
+    std = returns.std(axis=-1, keepdims=True)
+    standardized = (returns - mean) / std
+    skew = np.mean(standardized ** 3, axis=-1, keepdims=True)
+    excess_kurtosis = np.mean(standardized ** 4, axis=-1, keepdims=True) - 3
+
+    normal = NormalDist()
+    # Tail levels at the midpoints of tail_points equal slices of (0, tail)
+    levels = (np.arange(tail_points) + 0.5) * tail / tail_points
+    z = np.array([normal.inv_cdf(tail), *map(normal.inv_cdf, levels)])
+    quantiles = mean + std * _cornish_fisher_z(z, skew, excess_kurtosis)
+    return -quantiles[..., 0], -quantiles[..., 1:].mean(axis=-1)
+
+def sortino_ratio(returns, periods=252, target=0.0):
+    """Annualized mean excess return over the annualized downside deviation below target (per period)"""
+    excess = np.asarray(returns, dtype=float) - target
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2, axis=-1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return excess.mean(axis=-1) * periods / (downside * np.sqrt(periods))
+
+def band_coverage(returns, bands=(1, 2, 3)):
+    """
+    Share of returns within k standard deviations of the mean, for each k in bands
+
+    Returns:
+        (empirical, normal): empirical has a trailing axis of len(bands); normal is what
+        a normal distribution would give (68.3%, 95.4%, 99.7% for 1, 2, 3)
+    """
+    returns = np.asarray(returns, dtype=float)
+    distance = np.abs(returns - returns.mean(axis=-1, keepdims=True)) / returns.std(axis=-1, keepdims=True)
+    bands = np.asarray(bands, dtype=float)
+    empirical = np.mean(distance[..., None] <= bands, axis=-2)
+    normal = np.array([erf(k / sqrt(2)) for k in bands])
+    return empirical, normal
+
+def rolling(metric, series, window, step=1, chunk_size=2000, **kwargs):
+    """
+    metric over every window of series (windows starting step periods apart)
+
+    Windows are views into series and are scored chunk_size at a time, so long
+    daily series with multi-year windows stay within memory.
+    """
+    windows = sliding_window_view(np.asarray(series, dtype=float), window, axis=-1)[..., ::step, :]
+    # Metrics reduce the window axis, so the window-start axis keeps its position in every output
+    axis = windows.ndim - 2
+    chunks = [metric(windows[..., start:start + chunk_size, :], **kwargs)
+              for start in range(0, windows.shape[axis], chunk_size)]
+    if isinstance(chunks[0], tuple):
+        return tuple(np.concatenate(parts, axis=axis) for parts in zip(*chunks))
+    return np.concatenate(chunks, axis=axis)
+
+def risk_report(dates, prices, level=0.95):
+    """All whole-series metrics for one price series, returns annualized from its own frequency"""
+    periods = periods_per_year(dates)
+    returns = simple_returns(prices)
+    historical_var, historical_cvar = var_cvar(returns, level)
+    cf_var, cf_cvar = var_cvar(returns, level, 'cornish_fisher')
+    empirical, normal = band_coverage(returns)
+    return {
+        'max_drawdown': float(max_drawdown(prices)),
+        'drawdown_duration_years': float(drawdown_duration(prices) / periods),
+        'ulcer_index': float(ulcer_index(prices)),
+        'historical_var': float(historical_var),
+        'historical_cvar': float(historical_cvar),
+        'cornish_fisher_var': float(cf_var),
+        'cornish_fisher_cvar': float(cf_cvar),
+        'sortino_ratio': float(sortino_ratio(returns, periods)),
+        'band_coverage': empirical.tolist(),
+        'normal_coverage': normal.tolist(),
+    }
+
+def main():
+    from growth_core.portfolio import HISTORICAL_ASSETS
+    from growth_core.history import DATA_DIR
+
+    parser = argparse.ArgumentParser(description="Risk metrics for the index and NAV series in the repo")
+    parser.add_argument('assets', nargs='*', default=list(HISTORICAL_ASSETS), help=', '.join(HISTORICAL_ASSETS))
+    parser.add_argument('--level', type=float, default=0.95)
+    parser.add_argument('--window-years', type=float, default=3, help="Window for the rolling drawdown and ulcer index")
+    args = parser.parse_args()
+
+    for name in args.assets:
+        dates, prices = HISTORICAL_ASSETS[name](DATA_DIR)
+        print(name)
+        for metric, value in risk_report(dates, prices, args.level).items():
+            print(f"  {metric}: {value}")
+        window = int(round(args.window_years * periods_per_year(dates)))
+        if window < len(prices):
+            rolling_drawdown = rolling(max_drawdown, prices, window)
+            rolling_ulcer = rolling(ulcer_index, prices, window)
+            print(f"  rolling {args.window_years}y max drawdown: median {np.median(rolling_drawdown):.2%}, "
+                  f"worst {rolling_drawdown.max():.2%}")
+            print(f"  rolling {args.window_years}y ulcer index: median {np.median(rolling_ulcer):.2f}, "
+                  f"worst {rolling_ulcer.max():.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Seedable random streams for the stochastic analyses.
+
+Every job gets its own NumPy Generator, derived from a root seed and a job key such
+as (ticker, period, chunk) through SeedSequence spawn keys. The stream a job sees
+depends only on the root seed and its key, not on which worker runs it or in what
+order, so results are reproducible however the work is split.
+
+The root seed defaults to DEFAULT_SEED and can be overridden with GROWTH_SEED.
+"""
+import hashlib
+import os
+
+import numpy as np
+
+DEFAULT_SEED = 20240101
+
+def default_seed():
+    seed = os.environ.get('GROWTH_SEED')
+    return int(seed) if seed else DEFAULT_SEED
+
+def _key_word(part):
+    """Stable 32-bit word for one part of a job key (str hash() is salted per process)"""
+    if isinstance(part, (int, np.integer)) and 0 <= part < 2**32:
+        return int(part)
+    return int.from_bytes(hashlib.sha256(str(part).encode()).digest()[:4], 'little')
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        self.seed = default_seed() if seed is None else seed
+        self.root = np.random.SeedSequence(self.seed)
+
+    def seed_sequence(self, *key):
+        """SeedSequence for a job key, as if spawned from the root along that key"""
+        return np.random.SeedSequence(self.root.entropy, spawn_key=tuple(_key_word(part) for part in key))
+
+    def stream(self, *key):
+        """Independent Generator for a job key, e.g. stream("^BSESN", 10, chunk)"""
+        return np.random.Generator(np.random.PCG64(self.seed_sequence(*key)))
+
+    def chunked(self, key, num_samples, chunk_size, draw):
+        """
+        Draw num_samples in chunks, chunk i from stream(*key, i)
+
+        draw(rng, n) returns an array of n samples. The result is the same whether the
+        chunks are drawn here or separately by workers and concatenated in order.
+        """
+        chunks = []
+        for chunk, start in enumerate(range(0, num_samples, chunk_size)):
+            n = min(chunk_size, num_samples - start)
+            chunks.append(draw(self.stream(*key, chunk), n))
+        return np.concatenate(chunks) if chunks else np.array([])
+
+def random_dates(rng, start_date, end_date, num_dates):
+    """num_dates uniform dates (datetime64[D]) between start_date and end_date inclusive, in one draw"""
+    start = np.datetime64(start_date, 'D')
+    days = (np.datetime64(end_date, 'D') - start).astype(np.int64)
+    return start + rng.integers(0, days + 1, size=num_dates).astype('timedelta64[D]')
@@ -0,0 +1,217 @@
+"""
+Time-varying assumptions compiled into per-year factor lists.
+
+Returns, inflation, fees and withdrawal growth can follow a schedule instead of a
+constant. A schedule is compiled once into one value per year, and the engines'
+yearly loops then index precomputed factors instead of testing the year (the
+india_maturity_yr switch to mature_returns / mature_inflation is the two-step
+schedule used when none is given).
+
+Schedule specs are plain JSON, so they can sit under a 'schedules' key in saved
+parameter files:
+    14.0                                constant
+    [14, 13.5, 13, 12.5]                one value per year from year 1, the last one held
+    {"steps": [[1, 14], [50, 10]]}      piecewise constant, each value from its year on
+    {"linear": [[1, 14], [40, 10]]}     linear between the points, flat outside them
+
+Each engine takes only its own keys (PERPETUAL_SCHEDULES, GROWTH_SCHEDULES,
+SIP_SCHEDULES); any other key, e.g. a misspelt 'anual_return', raises ValueError.
+
+Pure Python, like perpetual.py, so the solvers don't need NumPy; per-year arrays
+given as NumPy arrays work too.
+"""
+
+# Schedule keys of the perpetual solvers (get_final_corpus_val, find_req_amt, fast_final_corpus_val)
+PERPETUAL_SCHEDULES = ('annual_return', 'inflation', 'fees', 'withdrawal_increment')
+
+# Schedule keys of calculate_growth
+GROWTH_SCHEDULES = ('nominal_return', 'inflation', 'withdrawal_increase')
+
+# Schedule keys of the SIP engines (get_final_sip_corpus, get_req_sip, sip_plans)
+SIP_SCHEDULES = ('annual_return', 'inflation', 'sip_increment')
+
+def check_schedules(schedules, names):
+    """The schedules dict (empty for None), after checking that an engine with these schedule keys knows every key"""
+    schedules = schedules or {}
+    unknown = sorted(set(schedules) - set(names))
+    if unknown:
+        raise ValueError(f"Unknown schedule {', '.join(map(repr, unknown))}, expected one of {', '.join(names)}")
+    return schedules
+
+def split_schedules(schedules, *engines):
+    """
+    One schedules dict per engine from a dict shared by several (a saved scenario's)
+
+    engines are key tuples such as GROWTH_SCHEDULES; a key no engine knows raises ValueError.
+    """
+    schedules = check_schedules(schedules, sorted(set().union(*engines)))
+    return [{name: spec for name, spec in schedules.items() if name in names} for names in engines]
+
+def schedule_end(spec):
+    """Last year in which a schedule can change; it holds its value from then on"""
+    if isinstance(spec, dict):
+        if len(spec) != 1 or not {'steps', 'linear'} & set(spec):
+            raise ValueError(f"Schedule dict needs exactly one of 'steps' or 'linear', got {sorted(spec)}")
+        points = next(iter(spec.values()))
+        if not points:
+            raise ValueError("Empty schedule")
+        return max(max(int(year) for year, _ in points), 1)
+    if isinstance(spec, (int, float)):
+        return 1
+    if len(spec) == 0:
+        raise ValueError("Empty per-year schedule")
+    return len(spec)
+
+def compile_schedule(spec, years):
+    """
+    Values of a schedule for years 1 .. years
+
+    Returns:
+        (values, steady_year): values[i] applies in year i + 1, and the value stays the
+        same from steady_year on (including any year past `years`)
+    """
+    end = min(schedule_end(spec), years)
+    if isinstance(spec, dict):
+        kind, points = next(iter(spec.items()))
+        points = sorted(((int(year), float(value)) for year, value in points), key=lambda point: point[0])
+        values = [_point_value(kind, points, year) for year in range(1, end + 1)]
+    elif isinstance(spec, (int, float)):
+        values = [float(spec)] * min(years, 1)
+    else:
+        values = [float(value) for value in spec[:end]]
+    if values:
+        values += [values[-1]] * (years - end)
+
+    # Trim the steady year back over trailing repeats, so solvers can settle as early as possible
+    steady_year = end
+    while steady_year > 1 and values[steady_year - 2] == values[steady_year - 1]:
+        steady_year -= 1
+    return values, max(steady_year, 1)
+
+def _point_value(kind, points, year):
+    if year < points[0][0]:
+        return points[0][1]
+    # Last point at or before the year (a later point in the same year overrides)
+    k = max(i for i, (point_year, _) in enumerate(points) if point_year <= year)
+    if kind == 'steps' or k == len(points) - 1:
+        return points[k][1]
+    (year0, value0), (year1, value1) = points[k], points[k + 1]
+    return value0 + (value1 - value0) * (year - year0) / (year1 - year0)
+
+def perpetual_series(years, annual_return, inflation, fees, withdrawal_increment, india_maturity_yr, mature_returns,
+                     mature_inflation, schedules=None):
+    """
+    Per-year annual_return, inflation, fees and withdrawal_increment (in %) for the perpetual solvers
+
+    Without a schedule, returns and inflation switch to the mature values at
+    india_maturity_yr (when 1 <= india_maturity_yr), as get_final_corpus_val always did.
+
+    Returns:
+        ({name: values for years 1 .. years}, steady_year)
+    """
+    schedules = check_schedules(schedules, PERPETUAL_SCHEDULES)
+    defaults = {
+        'annual_return': {'steps': [[1, annual_return], [india_maturity_yr, mature_returns]]}
+        if india_maturity_yr >= 1 else annual_return,
+        'inflation': {'steps': [[1, inflation], [india_maturity_yr, mature_inflation]]}
+        if india_maturity_yr >= 1 else inflation,
+        'fees': fees,
+        'withdrawal_increment': withdrawal_increment,
+    }
+    series = {}
+    steady_year = 1
+    for name in PERPETUAL_SCHEDULES:
+        series[name], steady = compile_schedule(schedules.get(name, defaults[name]), years)
+        steady_year = max(steady_year, steady)
+    return series, steady_year
+
+class PerpetualYears:
+    """
+    Every per-year factor of the get_final_corpus_val recurrence
+
+    One year is: amt * return_factor, * fee_factor, / inflation_factor, - annual_outflow,
+    - decadal_outflow, / split. The factors are built with the same floating-point
+    operations the loop used to do inline, so results are bit-identical.
+    """
+
+    __slots__ = ('years', 'return_factor', 'fee_factor', 'inflation_factor', 'annual_outflow', 'decadal_outflow',
+                 'split', 'steady_year', 'series', 'new_generation_time', 'kids', 'withdrawal_start_yr')
+
+    def __init__(self, years, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                 annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr, india_maturity_yr,
+                 mature_returns, mature_inflation, schedules=None):
+        series, steady_year = perpetual_series(years, annual_return, inflation, fees, withdrawal_increment,
+                                               india_maturity_yr, mature_returns, mature_inflation, schedules)
+        self.years = years
+        self.new_generation_time = new_generation_time
+        self.kids = kids
+        self.withdrawal_start_yr = withdrawal_start_yr
+        self.series = series
+        self.steady_year = steady_year
+        self.return_factor = [1 + value / 100 for value in series['annual_return']]
+        self.fee_factor = [1 - value / 100 for value in series['fees']]
+        self.inflation_factor = [1 + value / 100 for value in series['inflation']]
+
+        self.annual_outflow = []
+        self.decadal_outflow = []
+        for year, increment in enumerate(series['withdrawal_increment'], start=1):
+            withdrawing = year >= withdrawal_start_yr
+            self.annual_outflow.append(annual_withdrawal * (1 + withdrawal_tax / 100) if withdrawing else 0.0)
+            self.decadal_outflow.append(decadal_withdrawal * (1 + withdrawal_tax / 100)
+                                        if withdrawing and year % 10 == 0 else 0.0)
+            annual_withdrawal *= (1 + increment / 100)
+            decadal_withdrawal *= (1 + increment / 100)
+
+        self.split = [kids if year % new_generation_time == 0 else 1 for year in range(1, years + 1)]
+
+def growth_rates(params, years):
+    """
+    Per-year nominal_return, inflation and withdrawal_increase (in %) of calculate_growth's params
+
+    params may carry a 'schedules' dict with GROWTH_SCHEDULES keys (in %).
+
+    Returns:
+        {name: values for years 1 .. years}
+    """
+    schedules = check_schedules(params.get('schedules'), GROWTH_SCHEDULES)
+    return {name: compile_schedule(schedules.get(name, params[name]), years)[0] for name in GROWTH_SCHEDULES}
+
+def growth_series(params, years):
+    """
+    Per-year portfolio growth and withdrawal growth factors for calculate_growth
+
+    Returns:
+        (growth_factor, withdrawal_factor) lists for years 1 .. years, from growth_rates
+    """
+    rates = growth_rates(params, years)
+    # Same operations calculate_growth used on its scalar rates
+    growth_factor = [1 + ((1 + n / 100) / (1 + i / 100) - 1)
+                     for n, i in zip(rates['nominal_return'], rates['inflation'])]
+    withdrawal_factor = [1 + g / 100 for g in rates['withdrawal_increase']]
+    return growth_factor, withdrawal_factor
+
+class SipYears:
+    """
+    Per-year factors of the get_final_sip_corpus recurrence
+
+    One year is: corpus + sip, * return_factor, then sip * step_factor; the real corpus
+    is the nominal one / price_level. Without an inflation schedule price_level is the
+    (1 + inflation / 100) ** years the loop always used, so results stay bit-identical.
+    """
+
+    __slots__ = ('years', 'return_factor', 'step_factor', 'price_level')
+
+    def __init__(self, years, sip_increment, annual_return, inflation, schedules=None):
+        schedules = check_schedules(schedules, SIP_SCHEDULES)
+        self.years = years
+        returns, _ = compile_schedule(schedules.get('annual_return', annual_return), years)
+        increments, _ = compile_schedule(schedules.get('sip_increment', sip_increment), years)
+        self.return_factor = [1 + value / 100 for value in returns]
+        self.step_factor = [1 + value / 100 for value in increments]
+
+        if 'inflation' in schedules:
+            self.price_level = 1.0
+            for value in compile_schedule(schedules['inflation'], years)[0]:
+                self.price_level *= 1 + value / 100
+        else:
+            self.price_level = (1 + inflation / 100) ** years
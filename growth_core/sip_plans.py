@@ -0,0 +1,136 @@
+"""
+Required SIPs over whole grids of goals in closed form.
+
+The SIP accumulation in get_final_sip_corpus is a growing annuity, so the corpus from
+a unit SIP has a closed form (perpetual.unit_sip_corpus). unit_sip_corpus_array
+evaluates it on broadcast NumPy arrays, e.g. every (target corpus x sip_increment x annual_return x
+years_for_investment) combination at once, and SipPlan only fills in the year-by-year
+SIP and corpus histories when they are asked for.
+
+Scheduled rates (see growth_core.schedules) have no closed form; with schedules every
+element runs get_final_sip_corpus's recurrence, one array step per year.
+"""
+import numpy as np
+
+from growth_core.perpetual import get_final_sip_corpus
+from growth_core.schedules import SIP_SCHEDULES, check_schedules, compile_schedule
+
+def unit_sip_corpus_array(sip_increment, annual_return, inflation, years, schedules=None):
+    """
+    perpetual.unit_sip_corpus, broadcast over all arguments
+
+    As there, a return or increment of -100% or below has no logarithm, so those
+    elements run get_final_sip_corpus's recurrence instead of the closed form. A
+    schedule replaces its argument for every element.
+    """
+    growth, step, deflator, years = np.broadcast_arrays(
+        1 + np.asarray(annual_return, dtype=float) / 100,
+        1 + np.asarray(sip_increment, dtype=float) / 100,
+        1 + np.asarray(inflation, dtype=float) / 100,
+        np.asarray(years, dtype=float),
+    )
+    if schedules:
+        return _unit_sip_recurrence(growth, step, deflator, years, schedules)
+    closed_form = (growth > 0) & (step > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x = np.log(step / growth)
+        same_rate = x == 0
+        ratio = np.where(same_rate, years, np.expm1(years * x) / np.expm1(np.where(same_rate, 1.0, x)))
+        corpus = growth ** years * ratio / deflator ** years
+    if not closed_form.all():
+        corpus = np.where(closed_form, corpus, _unit_sip_recurrence(growth, step, deflator, years))
+    return corpus
+
+def _unit_sip_recurrence(growth, step, deflator, years, schedules=None):
+    """Real corpus from a first-year SIP of 1, year by year as in get_final_sip_corpus"""
+    total = int(years.max(initial=0))
+    schedules = check_schedules(schedules, SIP_SCHEDULES)
+
+    def factors(name, constant):
+        if name not in schedules:
+            return [constant] * total
+        return [1 + value / 100 for value in compile_schedule(schedules[name], total)[0]]
+
+    corpus = np.zeros(growth.shape)
+    sip = np.ones(growth.shape)
+    price_level = np.ones(growth.shape) if 'inflation' in schedules else deflator ** years
+    for year, year_growth, year_step, year_inflation in zip(
+            range(1, total + 1), factors('annual_return', growth), factors('sip_increment', step),
+            factors('inflation', None)):
+        investing = year <= years
+        corpus = np.where(investing, (corpus + sip) * year_growth, corpus)
+        sip = sip * year_step
+        if year_inflation is not None:
+            price_level = np.where(investing, price_level * year_inflation, price_level)
+    return corpus / price_level
+
+def required_sip(amt, sip_increment, annual_return, inflation, years, schedules=None):
+    """First-year SIP reaching a real corpus of amt, broadcast over all arguments"""
+    return np.asarray(amt, dtype=float) / unit_sip_corpus_array(sip_increment, annual_return, inflation, years,
+                                                                schedules)
+
+def sip_grid(amts, sip_increments, annual_returns, years, inflation, schedules=None):
+    """
+    Required SIP for every combination of the four axes
+
+    Returns:
+        array of shape (len(amts), len(sip_increments), len(annual_returns), len(years))
+    """
+    return required_sip(
+        np.asarray(amts, dtype=float)[:, None, None, None],
+        np.asarray(sip_increments, dtype=float)[None, :, None, None],
+        np.asarray(annual_returns, dtype=float)[None, None, :, None],
+        inflation,
+        np.asarray(years, dtype=float)[None, None, None, :],
+        schedules,
+    )
+
+class SipPlan:
+    """
+    Required SIP for one goal, with histories computed on first access
+
+    Unpacks like get_req_sip's result: sip, corpus_history, sip_history = SipPlan(...)
+    """
+
+    def __init__(self, amt, sip_increment, annual_return, inflation, years, schedules=None):
+        self.amt = amt
+        self.sip_increment = sip_increment
+        self.annual_return = annual_return
+        self.inflation = inflation
+        self.years = years
+        self.schedules = schedules
+        self.sip = float(required_sip(amt, sip_increment, annual_return, inflation, years, schedules))
+        self._sip_history = None
+        self._corpus_history = None
+
+    def _scheduled_histories(self):
+        _, self._corpus_history, self._sip_history = get_final_sip_corpus(
+            self.sip, self.sip_increment, self.annual_return, self.inflation, self.years, self.schedules)
+
+    @property
+    def sip_history(self):
+        """SIP paid in each year"""
+        if self._sip_history is None and self.schedules:
+            self._scheduled_histories()
+        if self._sip_history is None:
+            steps = (1 + self.sip_increment / 100) ** np.arange(self.years)
+            self._sip_history = (self.sip * steps).tolist()
+        return self._sip_history
+
+    @property
+    def corpus_history(self):
+        """Nominal corpus at the end of each year, starting with 0"""
+        if self._corpus_history is None and self.schedules:
+            self._scheduled_histories()
+        if self._corpus_history is None:
+            growth = 1 + self.annual_return / 100
+            # corpus_k = growth * (corpus_{k-1} + sip_k), unrolled as a discounted cumulative sum
+            discount = growth ** -np.arange(self.years, dtype=float)
+            invested = np.cumsum(np.array(self.sip_history) * discount)
+            corpus = invested * growth ** np.arange(1, self.years + 1, dtype=float)
+            self._corpus_history = [0] + corpus.tolist()
+        return self._corpus_history
+
+    def __iter__(self):
+        return iter((self.sip, self.corpus_history, self.sip_history))
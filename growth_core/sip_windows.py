@@ -0,0 +1,120 @@
+"""
+SIP outcomes for every start date and duration of a NAV series.
+
+With the same amount invested on every SIP date, the units bought between two SIP
+dates are amount * (P[end] - P[start]), where P is the prefix sum of 1 / NAV. So the
+invested amount, units and final value of every (start x duration) window come from
+a few array lookups, and only the money-weighted return needs the flows themselves:
+each duration's windows are solved together, in chunks, by irr.xirr_batch.
+
+SIP dates are every NAV date (as in the flexi-cap backtest) or the first NAV date of
+each month. A window starting at SIP date s with duration D years buys on every SIP
+date before the first one at least D years later, and is valued at that date's NAV.
+
+Usage:
+    python -m growth_core.sip_windows ppfas_flexi_cap kotak_equity_opportunities --frequency monthly
+"""
+import argparse
+
+import numpy as np
+
+from growth_core.irr import xirr_batch, year_fractions
+
+FREQUENCIES = ('daily', 'monthly')
+
+def sip_dates(dates, frequency='daily'):
+    """Indices of the NAV dates a SIP buys on"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Unknown frequency {frequency!r}, expected one of {FREQUENCIES}")
+    if frequency == 'daily':
+        return np.arange(len(dates))
+    months = dates.astype('datetime64[M]')
+    return np.flatnonzero(np.concatenate(([True], months[1:] != months[:-1])))
+
+def window_ends(dates, years):
+    """For every date, the index of the first date at least `years` later (len(dates) if none)"""
+    months = dates.astype('datetime64[M]') + int(round(years * 12))
+    # Same day of month, clipped to the month's last day
+    day = np.minimum(dates - dates.astype('datetime64[M]').astype('datetime64[D]'),
+                     (months + 1).astype('datetime64[D]') - months.astype('datetime64[D]') - 1)
+    return np.searchsorted(dates, months.astype('datetime64[D]') + day)
+
+def _window_xirr(starts, lengths, times, amount, final_values, chunk_size):
+    """XIRR of -amount at times[s .. s+len-1] and +final at times[s+len], for every window"""
+    result = np.empty(len(starts))
+    offsets = np.arange(lengths.max() + 1)
+    for first in range(0, len(starts), chunk_size):
+        chunk = slice(first, first + chunk_size)
+        idx = np.minimum(starts[chunk, None] + offsets, len(times) - 1)
+        amounts = np.where(offsets < lengths[chunk, None], -amount, 0.0)
+        amounts[np.arange(len(idx)), lengths[chunk]] = final_values[chunk]
+        result[chunk] = xirr_batch(amounts, times[idx])
+    return result
+
+def rolling_sip(dates, navs, durations=(3, 5, 7, 10), amount=1000, frequency='daily', chunk_size=500):
+    """
+    Outcome of a SIP started on every SIP date, for each duration in years
+
+    Returns:
+        {duration: dict of arrays 'start_dates', 'end_dates', 'invested', 'final_value'
+        and 'xirr' (fraction), one entry per start with enough history}
+    """
+    buy = sip_dates(dates, frequency)
+    dates, navs = dates[buy], np.asarray(navs, dtype=float)[buy]
+    unit_prefix = np.concatenate(([0.0], np.cumsum(1 / navs)))
+    times = year_fractions(dates)
+
+    results = {}
+    for years in durations:
+        ends = window_ends(dates, years)
+        starts = np.flatnonzero(ends < len(dates))
+        ends = ends[starts]
+        lengths = ends - starts
+
+        final_values = amount * (unit_prefix[ends] - unit_prefix[starts]) * navs[ends]
+        results[years] = {
+            'start_dates': dates[starts],
+            'end_dates': dates[ends],
+            'invested': amount * lengths.astype(float),
+            'final_value': final_values,
+            'xirr': _window_xirr(starts, lengths, times, amount, final_values, chunk_size) if len(starts) else np.empty(0),
+        }
+    return results
+
+def sip_percentiles(results, percentiles=(5, 25, 50, 75, 95)):
+    """XIRR percentiles per duration, with the worst start and the share of windows losing money"""
+    summary = {}
+    for years, windows in results.items():
+        xirrs = windows['xirr']
+        if len(xirrs) == 0:
+            continue
+        worst = int(np.nanargmin(xirrs))
+        summary[years] = {
+            'windows': len(xirrs),
+            **{f"p{p}": float(np.nanpercentile(xirrs, p)) for p in percentiles},
+            'worst_start': str(windows['start_dates'][worst]),
+            'loss_rate': float(np.mean(windows['final_value'] < windows['invested'])),
+        }
+    return summary
+
+def main():
+    from growth_core.history import DATA_DIR
+    from growth_core.portfolio import HISTORICAL_ASSETS
+
+    parser = argparse.ArgumentParser(description="SIP XIRR distribution over every start date of a NAV series")
+    parser.add_argument('assets', nargs='*', default=['ppfas_flexi_cap', 'kotak_equity_opportunities'],
+                        help=', '.join(HISTORICAL_ASSETS))
+    parser.add_argument('--durations', type=float, nargs='+', default=[3, 5, 7, 10])
+    parser.add_argument('--frequency', choices=FREQUENCIES, default='daily')
+    args = parser.parse_args()
+
+    for name in args.assets:
+        dates, navs = HISTORICAL_ASSETS[name](DATA_DIR)
+        print(name)
+        for years, row in sip_percentiles(rolling_sip(dates, navs, args.durations, frequency=args.frequency)).items():
+            spread = '  '.join(f"{key} {value:.2%}" for key, value in row.items() if key.startswith('p'))
+            print(f"  {years:g}y ({row['windows']} starts): {spread}  "
+                  f"worst start {row['worst_start']}  losing {row['loss_rate']:.1%}")
+
+if __name__ == "__main__":
+    main()
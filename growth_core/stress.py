@@ -0,0 +1,189 @@
+"""
+Sequence-of-returns stress test on actual historical index paths.
+
+Every start month in the index history (e.g. ^BSESN from 1997) gets its own path:
+the realized 12-month index returns and the matching inflation for as many full years
+as the data covers, then the assumptions from the parameters (constant or scheduled,
+see growth_core.schedules) for the rest of the projection. All start months are
+simulated together, one array operation per year, with the same yearly steps as
+calculate_growth and get_final_corpus_val.
+
+Usage:
+    python -m growth_core.stress --ticker ^BSESN --min-years 10
+"""
+import argparse
+
+import numpy as np
+
+from growth_core.alignment import InflationIndex, monthly_closes
+from growth_core.history import DATA_DIR, load_ticker
+from growth_core.schedules import PerpetualYears, growth_series
+
+def historical_paths(ticker='^BSESN', min_years=10, data_dir=DATA_DIR):
+    """
+    Realized yearly returns and inflation for every start month with at least min_years of history
+
+    Returns:
+        dict with 'start_months', 'returns' and 'inflation' (n_starts x max_years, in %,
+        NaN past the end of each start's history) and 'years' (full years per start)
+    """
+    dates, values = load_ticker(ticker, data_dir)
+    months, closes = monthly_closes(dates, values)
+    price_level = InflationIndex.from_csv(months, 'interpolate', data_dir).level
+
+    available_years = (len(months) - 1 - np.arange(len(months))) // 12
+    starts = np.flatnonzero(available_years >= min_years)
+    if len(starts) == 0:
+        raise ValueError(f"No start month in {ticker} has {min_years} years of history")
+    max_years = int(available_years[starts].max())
+
+    # Month offsets of each year boundary, masked where a start runs out of history
+    offsets = starts[:, None] + 12 * np.arange(max_years + 1)[None, :]
+    valid = offsets < len(months)
+    offsets = np.minimum(offsets, len(months) - 1)
+
+    returns = (closes[offsets[:, 1:]] / closes[offsets[:, :-1]] - 1) * 100
+    inflation = (price_level[offsets[:, 1:]] / price_level[offsets[:, :-1]] - 1) * 100
+    returns[~valid[:, 1:]] = np.nan
+    inflation[~valid[:, 1:]] = np.nan
+
+    return {
+        'start_months': months[starts],
+        'returns': returns,
+        'inflation': inflation,
+        'years': available_years[starts],
+    }
+
+def _year_column(paths, name, year):
+    """Historical value for simulation year `year` (1-based), NaN where a start has no history left"""
+    values = paths[name]
+    if year > values.shape[1]:
+        return np.full(values.shape[0], np.nan)
+    return values[:, year - 1]
+
+def replay_growth(params, paths):
+    """
+    calculate_growth for every historical start at once
+
+    Returns:
+        (final_values, depletion_years) arrays, depletion year 0 where the portfolio survives
+    """
+    n = len(paths['start_months'])
+    growth_factor, withdrawal_factor = growth_series(params, params['projection_years'])
+    value = np.full(n, float(params['initial_portfolio']))
+    annual_withdrawal = params['initial_withdrawal'] / 100  # Convert lakhs to crores
+    big_withdrawal = params['big_withdrawal_amt']
+    depletion_years = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+
+    for year in range(1, params['projection_years'] + 1):
+        nominal = _year_column(paths, 'returns', year) / 100
+        inflation = _year_column(paths, 'inflation', year) / 100
+        # Realized growth where the start has history, the assumption's factor after it
+        real_growth = np.where(np.isnan(nominal), growth_factor[year - 1], 1 + ((1 + nominal) / (1 + inflation) - 1))
+
+        annual_withdrawal *= withdrawal_factor[year - 1]
+        big_withdrawal *= withdrawal_factor[year - 1]
+
+        withdrawal = 0.0
+        if year >= params['withdrawal_start_yr']:
+            withdrawal += annual_withdrawal
+        if (year % params['big_withdrawal_time'] == 0 and
+            year >= params['big_withdrawal_start_yr'] and
+            year >= params['withdrawal_start_yr']):
+            withdrawal += big_withdrawal
+
+        updated = np.maximum(0, value * real_growth) - withdrawal * (1 + params['tax_on_withdrawals'] / 100)
+        if params['generational_halving'] and year % params['halving_years'] == 0:
+            updated = updated / 2
+            updated -= updated * params['inheritance_tax'] / 100
+
+        value = np.where(alive, updated, value)
+        newly_depleted = alive & (value <= 0)
+        depletion_years[newly_depleted] = year
+        alive &= ~newly_depleted
+        if not alive.any():
+            break
+
+    return np.maximum(value, 0), depletion_years
+
+def replay_perpetual(amt, paths, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                     annual_return, inflation, years, fees, new_generation_time, kids, withdrawal_start_yr,
+                     india_maturity_yr, mature_returns, mature_inflation, schedules=None):
+    """
+    get_final_corpus_val for every historical start at once
+
+    Historical returns and inflation replace the assumptions (the PerpetualYears factors)
+    for the years they cover. Returns (final_values, depletion_years), depletion year 0
+    where the corpus survives.
+    """
+    plan = PerpetualYears(years, annual_withdrawal, decadal_withdrawal, withdrawal_increment, withdrawal_tax,
+                          annual_return, inflation, fees, new_generation_time, kids, withdrawal_start_yr,
+                          india_maturity_yr, mature_returns, mature_inflation, schedules)
+    n = len(paths['start_months'])
+    amt = np.full(n, float(amt))
+    depletion_years = np.zeros(n, dtype=np.int64)
+    alive = np.ones(n, dtype=bool)
+
+    for i, (fee, annual_outflow, decadal_outflow, split) in enumerate(zip(
+            plan.fee_factor, plan.annual_outflow, plan.decadal_outflow, plan.split)):
+        year_return = _year_column(paths, 'returns', i + 1)
+        year_inflation = _year_column(paths, 'inflation', i + 1)
+        history = ~np.isnan(year_return)
+
+        updated = amt * np.where(history, 1 + year_return / 100, plan.return_factor[i])
+        updated *= fee
+        updated /= np.where(history, 1 + year_inflation / 100, plan.inflation_factor[i])
+        updated -= annual_outflow
+        updated -= decadal_outflow
+        updated /= split
+
+        amt = np.where(alive, updated, amt)
+        newly_depleted = alive & (amt <= 0)
+        depletion_years[newly_depleted] = i + 1
+        alive &= ~newly_depleted
+        if not alive.any():
+            break
+
+    return amt, depletion_years
+
+def stress_summary(paths, final_values, depletion_years):
+    """Failure rate and worst historical start (earliest depletion, else lowest final value)"""
+    failed = depletion_years > 0
+    if failed.any():
+        candidates = np.flatnonzero(failed)
+        worst = candidates[np.argmin(depletion_years[candidates])]
+    else:
+        worst = int(np.argmin(final_values))
+
+    return {
+        'starts': int(len(final_values)),
+        'first_start': str(paths['start_months'][0]),
+        'last_start': str(paths['start_months'][-1]),
+        'failure_rate': float(failed.mean()),
+        'worst_start': str(paths['start_months'][worst]),
+        'worst_depletion_year': int(depletion_years[worst]) or None,
+        'worst_final_value': float(final_values[worst]),
+        'median_final_value': float(np.median(final_values)),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay dashboard scenarios over every historical start month")
+    parser.add_argument('--ticker', default='^BSESN')
+    parser.add_argument('--min-years', type=int, default=10, help="Minimum years of history per start month")
+    args = parser.parse_args()
+
+    # dashboard.py defaults
+    params = {
+        'nominal_return': 14.0, 'inflation': 7.0, 'withdrawal_increase': 0.0, 'initial_withdrawal': 30,
+        'projection_years': 1000, 'initial_portfolio': 36.0, 'big_withdrawal_time': 10, 'big_withdrawal_amt': 6,
+        'big_withdrawal_start_yr': 0, 'withdrawal_start_yr': 0, 'generational_halving': True, 'halving_years': 25,
+        'inheritance_tax': 0.0, 'tax_on_withdrawals': 15.0,
+    }
+    paths = historical_paths(args.ticker, args.min_years)
+    final_values, depletion_years = replay_growth(params, paths)
+    for name, value in stress_summary(paths, final_values, depletion_years).items():
+        print(f"{name}: {value}")
+
+if __name__ == "__main__":
+    main()
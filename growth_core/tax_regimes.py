@@ -0,0 +1,96 @@
+"""
+Income-tax regimes loaded from a slab config file.
+
+Each regime (e.g. "FY2025-26/new") lists its slab starts and marginal rates in lakhs,
+plus standard deduction, cess and the section 87A rebate (with the new regime's
+marginal relief, so tax never jumps at the rebate limit). The tax owed at every slab
+start is accumulated once when the regime is loaded, so tax for any income is a
+binary search for the slab followed by one multiply-add. All methods work on NumPy
+arrays, which keeps payroll-style runs over millions of incomes to a few vector ops.
+"""
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+
+DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tax_regimes.json')
+# The slabs expense_manager.calc_tax always used; the rebate is opt-in via 'FY2025-26/new'
+DEFAULT_REGIME = 'FY2025-26/new-without-rebate'
+
+class TaxRegime:
+    def __init__(self, name, slabs, standard_deduction=0.0, cess=0.0, rebate_limit=0.0, max_rebate=0.0,
+                 marginal_relief=False):
+        slabs = sorted(slabs)
+        if not slabs or slabs[0][0] != 0:
+            raise ValueError(f"Tax regime {name!r} must have a slab starting at 0")
+
+        self.name = name
+        self.slab_starts = np.array([start for start, _ in slabs], dtype=float)
+        self.rates = np.array([rate for _, rate in slabs], dtype=float)
+        self.standard_deduction = standard_deduction
+        self.cess = cess
+        self.rebate_limit = rebate_limit
+        self.max_rebate = max_rebate
+        self.marginal_relief = marginal_relief
+
+        # Tax owed on income up to each slab start
+        self.tax_at_slab_start = np.concatenate(([0.0], np.cumsum(np.diff(self.slab_starts) * self.rates[:-1])))
+
+    def taxable_income(self, salary):
+        return np.maximum(np.asarray(salary, dtype=float) - self.standard_deduction, 0.0)
+
+    def slab_tax(self, taxable):
+        """Tax from the slabs alone, before rebate and cess"""
+        idx = np.searchsorted(self.slab_starts, taxable, side='right') - 1
+        return self.tax_at_slab_start[idx] + (taxable - self.slab_starts[idx]) * self.rates[idx]
+
+    def tax(self, salary):
+        """Total tax incl. rebate and cess (lakhs) for a salary or an array of salaries (LPA)"""
+        taxable = self.taxable_income(salary)
+        tax = self.slab_tax(taxable)
+        if self.max_rebate:
+            rebated = np.maximum(tax - self.max_rebate, 0.0)
+            if self.marginal_relief:
+                # Just above the limit, tax is capped at the income over it
+                tax = np.minimum(tax, taxable - self.rebate_limit)
+            tax = np.where(taxable <= self.rebate_limit, rebated, tax)
+        tax = tax * (1 + self.cess / 100)
+        return tax if tax.ndim else float(tax)
+
+    def marginal_rate(self, salary):
+        idx = np.searchsorted(self.slab_starts, self.taxable_income(salary), side='right') - 1
+        return self.rates[idx] * (1 + self.cess / 100)
+
+    def __repr__(self):
+        return f"TaxRegime({self.name!r}, {len(self.rates)} slabs)"
+
+def load_tax_regimes(path=DEFAULT_CONFIG):
+    """All regimes in a config file, keyed by name"""
+    with open(path) as f:
+        config = json.load(f)
+    return {name: TaxRegime(name, **spec) for name, spec in config.items()}
+
+@lru_cache(maxsize=None)
+def _regimes(path):
+    return load_tax_regimes(path)
+
+def get_tax_regime(name=DEFAULT_REGIME, path=DEFAULT_CONFIG):
+    """A regime from the config file; the file is parsed once per process"""
+    regimes = _regimes(path)
+    if name not in regimes:
+        raise KeyError(f"Unknown tax regime {name!r}, available: {', '.join(sorted(regimes))}")
+    return regimes[name]
+
+def compare_regimes(salaries, names=None, path=DEFAULT_CONFIG):
+    """
+    Tax under each regime for an array of salaries
+
+    Returns:
+        (names, taxes, cheapest): taxes has shape (len(names),) + salaries.shape and
+        cheapest is the index into names of the lowest-tax regime for each salary
+    """
+    regimes = _regimes(path)
+    names = list(names or regimes)
+    taxes = np.stack([np.asarray(get_tax_regime(name, path).tax(salaries)) for name in names])
+    return names, taxes, taxes.argmin(axis=0)
@@ -1,10 +1,12 @@
-import wbdata
-import yfinance as yf
-import random
 from datetime import datetime, timedelta
 import numpy as np
 import pandas as pd
 
+from growth_core.alignment import InflationIndex
+from growth_core.profiling import profiled
+from growth_core.risk import band_coverage
+from growth_core.rng import RandomStreams, random_dates as random_dates_between
+
 def calculate_annual_return(start_date, num_years, data):
     
 
@@ -29,53 +31,30 @@ def calculate_annual_return(start_date, num_years, data):
 
     return annual_return.item()
 
-def generate_random_dates(start_date, end_of_start_date, num_dates):
-    random_dates = []
-
-    for _ in range(num_dates):
-        # Random number of days to add to the start date
-        random_days = random.randint(0, (end_of_start_date - start_date).days)
-        random_date = start_date + timedelta(days=random_days)
-        random_dates.append(random_date.strftime('%Y-%m-%d'))
-
-    random_dates = [datetime.strptime(date, "%Y-%m-%d") for date in random_dates]
-    return random_dates
+def generate_random_dates(start_date, end_of_start_date, num_dates, rng):
+    # All dates drawn in one call from the job's own stream
+    random_dates = random_dates_between(rng, start_date, end_of_start_date, num_dates)
+    return [datetime.strptime(str(date), "%Y-%m-%d") for date in random_dates]
 
 
 def check_standard_deviation_rule(returns_absolute):
-
-    returns = [x*100 for x in returns_absolute]
-    average_return = np.mean(returns)
-    std_deviation = np.std(returns)
-
-    # Check how many returns fall within each range
-    within_68 = sum((returns >= (average_return - std_deviation)) & (returns <= (average_return + std_deviation))) / len(returns)
-    within_95 = sum((returns >= (average_return - 2 * std_deviation)) & (returns <= (average_return + 2 * std_deviation))) / len(returns)
-    within_997 = sum((returns >= (average_return - 3 * std_deviation)) & (returns <= (average_return + 3 * std_deviation))) / len(returns)
+    # Share of returns within 1, 2 and 3 standard deviations, in one pass over an array
+    within, _ = band_coverage(np.asarray(returns_absolute, dtype=float))
+    within_68, within_95, within_997 = within
 
     # Print the results
     print(f"Percentage of simulated returns within 1 Std Dev (68%): {within_68 * 100:.2f}%")
     print(f"Percentage of simulated returns within 2 Std Dev (95%): {within_95 * 100:.2f}%")
     print(f"Percentage of simulated returns within 3 Std Dev (99.7%): {within_997 * 100:.2f}%")
 
-def calculate_avg_inflation_rate(start_date, num_years, data):
-    # Find the closest available index for the start date
-    start_idx = np.abs((data.index - start_date).total_seconds()).argmin()
+def calculate_avg_inflation_rate(start_date, num_years, inflation_index):
+    # Two lookups into the cumulative inflation index aligned to a daily calendar
+    start_idx = inflation_index.positions(np.datetime64(start_date.date()))
+    end_idx = inflation_index.positions(np.datetime64((start_date + timedelta(days=num_years * 365)).date()))
+    return inflation_index.annualized_inflation(start_idx, end_idx).item()
 
-    # Calculate the end date as 5 years from the start date
-    end_date = start_date + timedelta(days=num_years * 365)
-    
-    # Find the closest available index for the end date
-    end_idx = np.abs((data.index - end_date).total_seconds()).argmin()
-
-    # Get the start and end values from the dataset
-    inflation_rates = data.iloc[start_idx:end_idx].values
-    
-    avg_inflation_rate = np.prod([1 + r/100 for r in inflation_rates])**(1/len(inflation_rates)) - 1
-    
-    return avg_inflation_rate
-
-def do_simulation(num_years, ticker, num_random_dates):
+@profiled('do_simulation')
+def do_simulation(num_years, ticker, num_random_dates, seed=None):
     # Download data only once
     data = pd.read_csv(f"{ticker}_data.csv", index_col=0, parse_dates=True)
 
@@ -86,19 +65,21 @@ def do_simulation(num_years, ticker, num_random_dates):
         print("Error: Not enough data available for the specified number of years")
         return
 
-    # Information about the inflation rate
-    indicator = {"FP.CPI.TOTL.ZG": "Inflation (%)"}
-    inflation_data = pd.read_csv(f"inflation_data.csv", index_col=0, parse_dates=True)
+    # Inflation index on a daily calendar covering every window, built once
+    calendar = np.arange(np.datetime64(start_date.date()),
+                         np.datetime64((end_of_start_date + timedelta(days=num_years * 365)).date()) + 1)
+    inflation_index = InflationIndex.from_csv(calendar)
 
     # Generate random dates
-    random_dates = generate_random_dates(start_date, end_of_start_date, num_random_dates)
+    rng = RandomStreams(seed).stream(ticker, num_years)
+    random_dates = generate_random_dates(start_date, end_of_start_date, num_random_dates, rng)
     # Calculate the annual return for each random date
     annual_returns = []
     avg_inflation_rates = []
     for date in random_dates:
         annual_return = calculate_annual_return(date, num_years, data)
         annual_returns.append(annual_return)
-        avg_inflation_rate = calculate_avg_inflation_rate(date, num_years, inflation_data)
+        avg_inflation_rate = calculate_avg_inflation_rate(date, num_years, inflation_index)
         avg_inflation_rates.append(avg_inflation_rate)
 
     # Calculate the average annual return
@@ -111,6 +92,10 @@ def do_simulation(num_years, ticker, num_random_dates):
     print(f"Standard deviation of inflation rate: {np.std(avg_inflation_rates):.2%}")
 
 def download_data(ticker):
+    # Network clients are only needed here, keep them out of module import
+    import wbdata
+    import yfinance as yf
+
     if ticker=="inflation":
         indicator = {"FP.CPI.TOTL.ZG": "Inflation (%)"}
         data = wbdata.get_dataframe(indicator, country="IND", parse_dates=True)
@@ -122,6 +107,11 @@ def download_data(ticker):
     data = data["Close"]
     data.to_csv(f"{ticker}_data.csv")
 
+def refresh_data(ticker):
+    """Append only the rows newer than the last stored date, instead of re-downloading everything"""
+    from growth_core.data_refresh import refresh
+    return refresh(ticker)
+
 def main():
     for ticker in ["^BSESN", "^NSEI"]:
         for period in [5, 10, 15]:
@@ -2,6 +2,7 @@ import json
 df = json.load(open('parag parikh flexi cap.json'))
 
 import pandas as pd
+from growth_core.irr import xirr
 df = pd.DataFrame(df)[["navDate","navValue"]]
 df["navDate"] = pd.to_datetime(df["navDate"])
 def show_plot(df):
@@ -63,5 +64,8 @@ for i in range(len(df)):
         sip_units = sip / current_nav
         sip_units_owned += sip_units
 final_value = sip_units_owned * df["navValue"].iloc[-1] + sip_held
-cagr = (final_value / (sip * len(df))) ** (245 / len(df)) - 1
-print(f"Annualized Return: {cagr:.2%}")
\ No newline at end of file
+
+# Money-weighted return: sip paid in on every NAV date, the holdings valued on the last one
+cash_flows = [-sip] * len(df) + [final_value]
+flow_dates = list(df["navDate"].values) + [df["navDate"].values[-1]]
+print(f"Annualized Return (XIRR): {xirr(cash_flows, flow_dates):.2%}")
\ No newline at end of file